@@ -6,12 +6,20 @@ struct CLIOptions {
     var namePrefix: String = "Hi-Print"
     var timeout: TimeInterval = 12
     var paceMs: Int = 12
+    var rawJPEG: Bool = false
+    var sessionPath: String?
+    var ownerPID: Int32?
+}
+
+struct CLIError: Error {
+    let message: String
 }
 
 enum Command {
     case scan
     case status
     case print(path: String)
+    case serve
     case help
 }
 
@@ -36,6 +44,8 @@ func run() {
         runStatus(options: options)
     case .print(let path):
         runPrint(path: path, options: options)
+    case .serve:
+        runServe(options: options)
     }
 }
 
@@ -52,6 +62,12 @@ func parseArguments(_ args: ArraySlice<String>) -> (Command, CLIOptions) {
             if let value = iterator.next(), let t = TimeInterval(value) { opts.timeout = t }
         case "--pace":
             if let value = iterator.next(), let pace = Int(value) { opts.paceMs = pace }
+        case "--raw-jpeg":
+            opts.rawJPEG = true
+        case "--session":
+            if let value = iterator.next() { opts.sessionPath = value }
+        case "--owner-pid":
+            if let value = iterator.next(), let pid = Int32(value) { opts.ownerPID = pid }
         case "-h", "--help":
             return (.help, opts)
         default:
@@ -73,6 +89,8 @@ func parseArguments(_ args: ArraySlice<String>) -> (Command, CLIOptions) {
             return (.print(path: remaining[1]), opts)
         }
         return (.help, opts)
+    case "serve":
+        return (opts.sessionPath == nil ? .help : .serve, opts)
     default:
         return (.help, opts)
     }
@@ -85,12 +103,23 @@ func printUsage() {
     Usage:
       printdock scan [--prefix "Hi-Print"] [--timeout 12]
       printdock status [--prefix "Hi-Print"] [--timeout 12]
-      printdock print <imagePath> [--prefix "Hi-Print"] [--timeout 12] [--pace 12]
+      printdock print <imagePath> [--prefix "Hi-Print"] [--timeout 12] [--pace 12] [--raw-jpeg]
+      printdock serve --session <dir> [--owner-pid <pid>] [--prefix "Hi-Print"] [--timeout 12] [--pace 12]
 
     Options:
       --prefix   Device name prefix to match (default: Hi-Print)
       --timeout  Seconds to wait for connect/status (default: 12; print completion waits at least 90)
       --pace     Milliseconds between BLE packets when printing (default: 12)
+      --raw-jpeg Send a pre-encoded 640x1024 JPEG as-is instead of re-encoding it
+      --session  serve: directory polled for <seq>.cmd.json commands; replies go to <seq>.reply.json
+      --owner-pid serve: exit once this process is gone
+
+    serve keeps one printer connection open across commands:
+      {"cmd": "status"}
+      {"cmd": "print", "path": "/abs/page.jpg", "raw_jpeg": true, "pace": 12, "timeout": 90}
+      {"cmd": "quit"}
+    Each reply is {"ok": true|false, "lines": [...], "error": "..."} with the same lines the
+    one-shot commands print.
     """
     print(usage)
 }
@@ -118,10 +147,7 @@ func runStatus(options: CLIOptions) {
 
     let gotStatus = waitForStatus(client, timeout: options.timeout)
     if let status = client.lastStatus, gotStatus {
-        print("STATUS \(status.rawHex)")
-        print("PHASE \(status.phaseCodeHex) \(status.phaseLabel)")
-        print("ISSUE \(status.issueCodeHex) \(status.issueLabel)")
-        print("READY \(status.isReadyForNextJob)")
+        statusLines(status).forEach { print($0) }
         client.disconnect()
         exit(0)
     }
@@ -137,19 +163,17 @@ func runPrint(path: String, options: CLIOptions) {
         exit(1)
     }
 
-    guard let image = NSImage(contentsOf: url) else {
-        printError("Unable to load image: \(path)")
-        exit(1)
-    }
-
-    let pipeline = ImagePipeline()
     let jpegData: Data
     do {
-        jpegData = try pipeline.makePrintableJPEG(from: image, offset: .zero, zoom: 1.0, quality: 0.98)
+        jpegData = try loadPrintPayload(url: url, rawJPEG: options.rawJPEG)
+    } catch let error as CLIError {
+        printError(error.message)
+        exit(1)
     } catch {
-        printError("Image processing failed: \(error.localizedDescription)")
+        printError(error.localizedDescription)
         exit(1)
     }
+    print("PAYLOAD_BYTES \(jpegData.count)")
 
     let client = HiPrintBLEClient(targetNamePrefix: options.namePrefix)
     client.connect()
@@ -157,7 +181,9 @@ func runPrint(path: String, options: CLIOptions) {
         printError("Failed to connect.")
         exit(1)
     }
+    print("DEVICE \(client.deviceName ?? "unknown")")
 
+    let sendStarted = Date()
     let start = client.send(jpeg: jpegData, paceMs: options.paceMs, timeout: max(options.timeout, 90))
     switch start {
     case .started:
@@ -169,6 +195,7 @@ func runPrint(path: String, options: CLIOptions) {
     }
 
     let completed = waitForPrint(client, timeout: max(options.timeout, 90))
+    print("TRANSFER_MS \(elapsedMs(since: sendStarted))")
     if completed {
         print("PRINT_DONE")
         client.disconnect()
@@ -179,6 +206,154 @@ func runPrint(path: String, options: CLIOptions) {
     exit(1)
 }
 
+func statusLines(_ status: PrinterStatus) -> [String] {
+    [
+        "STATUS \(status.rawHex)",
+        "PHASE \(status.phaseCodeHex) \(status.phaseLabel)",
+        "ISSUE \(status.issueCodeHex) \(status.issueLabel)",
+        "READY \(status.isReadyForNextJob)",
+    ]
+}
+
+func loadPrintPayload(url: URL, rawJPEG: Bool) throws -> Data {
+    let pipeline = ImagePipeline()
+    if rawJPEG {
+        do {
+            return try pipeline.validatedPrintableJPEG(Data(contentsOf: url))
+        } catch {
+            throw CLIError(message: "Raw JPEG rejected: \(error.localizedDescription)")
+        }
+    }
+    guard let image = NSImage(contentsOf: url) else {
+        throw CLIError(message: "Unable to load image: \(url.path)")
+    }
+    do {
+        return try pipeline.makePrintableJPEG(from: image, offset: .zero, zoom: 1.0, quality: 0.98)
+    } catch {
+        throw CLIError(message: "Image processing failed: \(error.localizedDescription)")
+    }
+}
+
+// MARK: - serve
+
+func runServe(options: CLIOptions) {
+    guard let sessionPath = options.sessionPath else {
+        printUsage()
+        exit(1)
+    }
+    let session = URL(fileURLWithPath: sessionPath, isDirectory: true)
+    setvbuf(stdout, nil, _IOLBF, 0)
+
+    // Start scanning right away so the first command finds a warm connection.
+    let client = HiPrintBLEClient(targetNamePrefix: options.namePrefix)
+    client.connect()
+    writeJSON(["pid": Int(getpid())], to: session.appendingPathComponent("ready.json"))
+    print("SERVING \(session.path)")
+
+    var lastOwnerCheck = Date.distantPast
+    var serving = true
+    while serving {
+        RunLoop.current.run(mode: .default, before: Date().addingTimeInterval(0.05))
+        if let owner = options.ownerPID, Date().timeIntervalSince(lastOwnerCheck) >= 1 {
+            lastOwnerCheck = Date()
+            if kill(owner, 0) != 0 && errno == ESRCH {
+                print("OWNER_GONE \(owner)")
+                break
+            }
+        }
+        guard let commandURL = nextServeCommand(in: session) else { continue }
+        let (reply, keepServing) = handleServeCommand(commandURL, client: client, options: options)
+        serving = keepServing
+        let replyName = commandURL.lastPathComponent.replacingOccurrences(of: ".cmd.json", with: ".reply.json")
+        writeJSON(reply, to: session.appendingPathComponent(replyName))
+        try? FileManager.default.removeItem(at: commandURL)
+    }
+
+    client.disconnect()
+    exit(0)
+}
+
+func nextServeCommand(in session: URL) -> URL? {
+    guard let names = try? FileManager.default.contentsOfDirectory(atPath: session.path) else { return nil }
+    guard let first = names.filter({ $0.hasSuffix(".cmd.json") }).sorted().first else { return nil }
+    return session.appendingPathComponent(first)
+}
+
+func handleServeCommand(_ url: URL, client: HiPrintBLEClient, options: CLIOptions) -> ([String: Any], Bool) {
+    guard let data = try? Data(contentsOf: url),
+          let command = (try? JSONSerialization.jsonObject(with: data)) as? [String: Any],
+          let name = command["cmd"] as? String else {
+        return (["ok": false, "lines": [String](), "error": "Unreadable command"], true)
+    }
+    let timeout = (command["timeout"] as? Double) ?? options.timeout
+
+    switch name {
+    case "quit":
+        return (["ok": true, "lines": [String]()], false)
+    case "status":
+        guard ensureConnected(client, timeout: timeout) else {
+            return (["ok": false, "lines": [String](), "error": "Failed to connect."], true)
+        }
+        // Status is polled every second; wait for a reading taken after this request.
+        guard waitForStatus(client, newerThan: Date(), timeout: timeout), let status = client.lastStatus else {
+            return (["ok": false, "lines": [String](), "error": "No status received."], true)
+        }
+        return (["ok": true, "lines": statusLines(status)], true)
+    case "print":
+        guard let path = command["path"] as? String else {
+            return (["ok": false, "lines": [String](), "error": "print needs a path"], true)
+        }
+        let jpegData: Data
+        do {
+            jpegData = try loadPrintPayload(url: URL(fileURLWithPath: path), rawJPEG: (command["raw_jpeg"] as? Bool) ?? false)
+        } catch let error as CLIError {
+            return (["ok": false, "lines": [String](), "error": error.message], true)
+        } catch {
+            return (["ok": false, "lines": [String](), "error": error.localizedDescription], true)
+        }
+        var lines = ["PAYLOAD_BYTES \(jpegData.count)"]
+        guard ensureConnected(client, timeout: options.timeout) else {
+            return (["ok": false, "lines": lines, "error": "Failed to connect."], true)
+        }
+        lines.append("DEVICE \(client.deviceName ?? "unknown")")
+        let pace = (command["pace"] as? Int) ?? options.paceMs
+        let sendStarted = Date()
+        if case .rejected(let reason) = client.send(jpeg: jpegData, paceMs: pace, timeout: max(timeout, 90)) {
+            return (["ok": false, "lines": lines, "error": "Print rejected: \(reason)"], true)
+        }
+        let completed = waitForPrint(client, timeout: max(timeout, 90))
+        lines.append("TRANSFER_MS \(elapsedMs(since: sendStarted))")
+        guard completed else {
+            return (["ok": false, "lines": lines, "error": "Print failed or timed out."], true)
+        }
+        lines.append("PRINT_DONE")
+        return (["ok": true, "lines": lines], true)
+    default:
+        return (["ok": false, "lines": [String](), "error": "Unknown command: \(name)"], true)
+    }
+}
+
+func elapsedMs(since start: Date) -> Int {
+    Int(Date().timeIntervalSince(start) * 1000)
+}
+
+func ensureConnected(_ client: HiPrintBLEClient, timeout: TimeInterval) -> Bool {
+    switch client.connectionState {
+    case .connected:
+        return true
+    case .scanning, .connecting:
+        break
+    default:
+        client.connect()
+    }
+    return waitForConnection(client, timeout: timeout)
+}
+
+func writeJSON(_ object: [String: Any], to url: URL) {
+    guard let data = try? JSONSerialization.data(withJSONObject: object, options: [.sortedKeys]) else { return }
+    try? data.write(to: url, options: .atomic)
+}
+
 func waitForConnection(_ client: HiPrintBLEClient, timeout: TimeInterval) -> Bool {
     let deadline = Date().addingTimeInterval(timeout)
     while Date() < deadline {
@@ -205,6 +380,16 @@ func waitForStatus(_ client: HiPrintBLEClient, timeout: TimeInterval) -> Bool {
     return false
 }
 
+func waitForStatus(_ client: HiPrintBLEClient, newerThan since: Date, timeout: TimeInterval) -> Bool {
+    let deadline = Date().addingTimeInterval(timeout)
+    while Date() < deadline {
+        RunLoop.current.run(mode: .default, before: Date().addingTimeInterval(0.05))
+        if let status = client.lastStatus, status.updatedAt >= since { return true }
+        if case .failed = client.connectionState { return false }
+    }
+    return false
+}
+
 func waitForPrint(_ client: HiPrintBLEClient, timeout: TimeInterval) -> Bool {
     let deadline = Date().addingTimeInterval(timeout)
     var lastBucket = -1
@@ -26,6 +26,28 @@ public struct ImagePipeline {
         return jpg
     }
 
+    /// Checks that `data` is already a page-sized JPEG so it can be sent without re-encoding.
+    public func validatedPrintableJPEG(_ data: Data) throws -> Data {
+        guard data.count > 2, data[data.startIndex] == 0xFF, data[data.startIndex + 1] == 0xD8 else {
+            throw NSError(domain: "PrintDock", code: 3, userInfo: [NSLocalizedDescriptionKey: "Not a JPEG file"])
+        }
+        guard data.count <= 0xFFFFFF,
+              let source = CGImageSourceCreateWithData(data as CFData, nil),
+              let props = CGImageSourceCopyPropertiesAtIndex(source, 0, nil) as? [CFString: Any],
+              let width = props[kCGImagePropertyPixelWidth] as? Int,
+              let height = props[kCGImagePropertyPixelHeight] as? Int else {
+            throw NSError(domain: "PrintDock", code: 3, userInfo: [NSLocalizedDescriptionKey: "Unreadable JPEG"])
+        }
+        guard width == HiPrintConstants.imageWidth, height == HiPrintConstants.imageHeight else {
+            throw NSError(
+                domain: "PrintDock",
+                code: 4,
+                userInfo: [NSLocalizedDescriptionKey: "JPEG is \(width)x\(height), expected \(HiPrintConstants.imageWidth)x\(HiPrintConstants.imageHeight)"]
+            )
+        }
+        return data
+    }
+
     private func renderToTarget(_ image: CGImage, targetSize: CGSize, offset: CGSize, zoom: Double) -> CGImage {
         let width = targetSize.width
         let height = targetSize.height
@@ -21,6 +21,22 @@ final class ImagePipelineTests: XCTestCase {
         XCTAssertEqual(height, HiPrintConstants.imageHeight)
     }
 
+    func testValidatedPrintableJPEGAcceptsPageSizedJPEG() throws {
+        let pipeline = ImagePipeline()
+        let data = try pipeline.makePrintableJPEG(from: makeTestImage(size: CGSize(width: 1200, height: 800)))
+        XCTAssertEqual(try pipeline.validatedPrintableJPEG(data), data)
+    }
+
+    func testValidatedPrintableJPEGRejectsOtherSizesAndFormats() throws {
+        let pipeline = ImagePipeline()
+        let rep = try XCTUnwrap(makeTestImage(size: CGSize(width: 320, height: 512)).representations.first as? NSBitmapImageRep)
+        let smallJPEG = try XCTUnwrap(rep.representation(using: .jpeg, properties: [:]))
+        XCTAssertThrowsError(try pipeline.validatedPrintableJPEG(smallJPEG))
+
+        let png = try XCTUnwrap(rep.representation(using: .png, properties: [:]))
+        XCTAssertThrowsError(try pipeline.validatedPrintableJPEG(png))
+    }
+
     private func makeTestImage(size: CGSize) -> NSImage {
         let rep = NSBitmapImageRep(
             bitmapDataPlanes: nil,
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Benchmark the compiled keyword matcher against the per-keyword substring scan.
+
+Runs offline on synthetic headlines and keyword lists, e.g.:
+
+    ./skills/surprise-print/benchmarks/bench_keywords.py --headlines 1000 10000 100000 --keywords 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fetch_news_digest import HEAVY_DOWNRANK_KEYWORDS  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+
+FILLER = (
+    "the city council said on monday that new plans for the river park will open next spring "
+    "after a long review of costs and community feedback from local residents and business owners"
+).split()
+
+# (keyword, headline, should match): plural and word-boundary behaviour the speedup must not change.
+BOUNDARY_CASES = [
+    ("war", "Wars end after talks", True),
+    ("war", "Market wares on sale", False),
+    ("war", "Warship launched", False),
+    ("crash", "Crashes close the highway", True),
+    ("tax", "New taxes approved", True),
+    ("space", "Spaces open downtown", True),
+    ("space", "Aerospace firm expands", False),
+    ("diplom*", "Diplomats meet", True),
+]
+
+# Inflected headlines the substring scan down-ranks as heavy; the digest's matcher must too.
+HEAVY_CASES = [
+    "City bombing kills 12",
+    "Flooding displaces thousands",
+    "Man murdered in park",
+    "Documents leaked",
+    "Deadly storm hits coast",
+    "Police shooting under review",
+    "Investigators question witnesses",
+]
+
+
+def check_boundaries() -> list[str]:
+    """Return a description of every boundary or heavy-headline case the matcher gets wrong."""
+    failures = []
+    for keyword, headline, expected in BOUNDARY_CASES:
+        matched = bool(KeywordMatcher({"case": [keyword]}).match(headline))
+        if matched != expected:
+            failures.append(f"{keyword!r} vs {headline!r}: matched={matched}, expected {expected}")
+
+    heavy = {"heavy": sorted(HEAVY_DOWNRANK_KEYWORDS)}
+    baseline = {"heavy": [kw.rstrip("*") for kw in heavy["heavy"]]}
+    matcher = KeywordMatcher(heavy)
+    for headline in HEAVY_CASES:
+        if substring_scan([headline], baseline) and not matcher.match(headline):
+            failures.append(f"heavy {headline!r}: substring scan matches, matcher does not")
+    return failures
+
+
+def make_keywords(count: int, rng: random.Random) -> list[str]:
+    keywords: set[str] = set()
+    while len(keywords) < count:
+        length = rng.randint(4, 10)
+        keywords.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(keywords)
+
+
+def make_headlines(count: int, keywords: list[str], rng: random.Random) -> list[str]:
+    headlines = []
+    for _ in range(count):
+        words = rng.sample(FILLER, 9)
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        headlines.append(" ".join(words).capitalize())
+    return headlines
+
+
+def substring_scan(headlines: list[str], categories: dict[str, list[str]]) -> int:
+    hits = 0
+    for headline in headlines:
+        lowered = headline.lower()
+        for keywords in categories.values():
+            for kw in keywords:
+                if kw in lowered:
+                    hits += 1
+    return hits
+
+
+def matcher_scan(headlines: list[str], matcher: KeywordMatcher) -> int:
+    hits = 0
+    for headline in headlines:
+        for found in matcher.match(headline).values():
+            hits += len(found)
+    return hits
+
+
+def split_categories(keywords: list[str], parts: int = 9) -> dict[str, list[str]]:
+    return {f"category-{i}": keywords[i::parts] for i in range(parts)}
+
+
+def run(headline_counts: list[int], keyword_counts: list[int], max_naive_ops: int, seed: int) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+    for keyword_count in keyword_counts:
+        rng = random.Random(seed)
+        keywords = make_keywords(keyword_count, rng)
+        categories = split_categories(keywords)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher(categories)
+        build_sec = time.perf_counter() - start
+
+        for headline_count in headline_counts:
+            headlines = make_headlines(headline_count, keywords, random.Random(seed + headline_count))
+
+            start = time.perf_counter()
+            matched = matcher_scan(headlines, matcher)
+            matcher_sec = time.perf_counter() - start
+
+            naive_sec: float | None = None
+            if headline_count * keyword_count <= max_naive_ops:
+                start = time.perf_counter()
+                substring_scan(headlines, categories)
+                naive_sec = time.perf_counter() - start
+
+            results.append(
+                {
+                    "headlines": headline_count,
+                    "keywords": keyword_count,
+                    "build_sec": round(build_sec, 4),
+                    "matcher_sec": round(matcher_sec, 4),
+                    "substring_sec": round(naive_sec, 4) if naive_sec is not None else None,
+                    "matcher_hits": matched,
+                    "headlines_per_sec": round(headline_count / matcher_sec) if matcher_sec else None,
+                }
+            )
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark headline keyword matching")
+    parser.add_argument("--headlines", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--keywords", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument(
+        "--max-naive-ops",
+        type=int,
+        default=50_000_000,
+        help="Skip the substring baseline when headlines x keywords exceeds this (default: 50M)",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Optional path for machine-readable results")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    failures = check_boundaries()
+    if failures:
+        print("Keyword boundary cases failed:\n" + "\n".join(failures), file=sys.stderr)
+        return 1
+    results = run(args.headlines, args.keywords, args.max_naive_ops, args.seed)
+
+    print(f"{'headlines':>10} {'keywords':>9} {'build s':>9} {'matcher s':>10} {'substring s':>12} {'hl/s':>10}")
+    for row in results:
+        naive = f"{row['substring_sec']:.3f}" if row["substring_sec"] is not None else "skipped"
+        print(
+            f"{row['headlines']:>10} {row['keywords']:>9} {row['build_sec']:>9.3f} "
+            f"{row['matcher_sec']:>10.3f} {naive:>12} {row['headlines_per_sec']:>10}"
+        )
+
+    if args.json:
+        out_path = Path(args.json)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
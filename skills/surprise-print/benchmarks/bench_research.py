@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the surprise-print research stage.
+
+Times each research step separately against synthetic corpora and a local
+stand-in server, so no network is needed:
+
+- ``fetch_items`` (cold and revalidated through the HTTP cache)
+- item ingest: parse time and retained memory per item, against the old dict-per-item layout
+- ``dedupe_and_select``, ``detect_themes``, ``top_terms``, ``build_payload``
+- ``pick_on_this_day`` (live and from the local index) and ``pick_random_summary`` (live and pooled)
+
+Results go to a JSON file; ``--compare`` checks them against an earlier run:
+
+    ./skills/surprise-print/benchmarks/bench_research.py --out results.json
+    ./skills/surprise-print/benchmarks/bench_research.py --compare results.json --sizes 10 1000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+import corpus  # noqa: E402
+import fetch_news_digest  # noqa: E402
+import fetch_surprise_fact  # noqa: E402
+from http_cache import HTTPCache  # noqa: E402
+from http_transport import TRANSPORT, stats_delta  # noqa: E402
+from news_items import NewsItem  # noqa: E402
+from onthisday_index import OnThisDayIndex  # noqa: E402
+from standin_server import StandInConfig, StandInServer  # noqa: E402
+
+DEFAULT_SIZES = [10, 1_000, 10_000, 100_000]
+# Slowdowns beyond this ratio against the baseline are reported as regressions.
+REGRESSION_RATIO = 1.25
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Median wall time of ``repeat`` calls, plus the last result."""
+    samples: list[float] = []
+    result: Any = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def repeats_for(size: int, requested: int) -> int:
+    return 1 if size >= 100_000 else requested
+
+
+def record(results: list[dict[str, Any]], bench: str, size: int, seconds: float, **extra: Any) -> None:
+    row = {
+        "bench": bench,
+        "size": size,
+        "seconds": round(seconds, 6),
+        "us_per_item": round(seconds * 1e6 / max(1, size), 3),
+        **extra,
+    }
+    results.append(row)
+    details = " ".join(f"{k}={v}" for k, v in extra.items())
+    print(f"{bench:<28} {size:>9} {seconds:>10.4f}s {row['us_per_item']:>10.2f} us/item {details}")
+
+
+def bench_fetch(results: list[dict[str, Any]], sizes: list[int], max_size: int, repeat: int, latency_ms: float) -> None:
+    config = StandInConfig(latency_ms=latency_ms)
+    with StandInServer(config) as server, tempfile.TemporaryDirectory() as cache_dir:
+        for size in sizes:
+            if size > max_size:
+                continue
+            feeds = server.feed_urls(items=max(1, size // len(corpus.FEEDS)))
+            reps = repeats_for(size, repeat)
+
+            fetch_news_digest.HTTP_CACHE = HTTPCache(enabled=False)
+            fetch_news_digest.PARSED_FEEDS.clear()
+            before = TRANSPORT.stats()
+            seconds, (items, missing) = time_call(lambda: fetch_news_digest.fetch_items(feeds, deadline=300), reps)
+            wire = stats_delta(before, TRANSPORT.stats())
+            record(
+                results,
+                "fetch_items.cold",
+                size,
+                seconds,
+                items=len(items),
+                missing=len(missing),
+                connections=wire["connections"],
+                reused=wire["reused"],
+                wire_bytes=wire["wire_bytes"],
+                decoded_bytes=wire["decoded_bytes"],
+            )
+
+            fetch_news_digest.HTTP_CACHE = HTTPCache(directory=Path(cache_dir) / str(size), max_bytes=1 << 34)
+            fetch_news_digest.fetch_items(feeds, deadline=300)
+            seconds, (items, missing) = time_call(lambda: fetch_news_digest.fetch_items(feeds, deadline=300), reps)
+            record(results, "fetch_items.revalidated", size, seconds, items=len(items), missing=len(missing))
+
+
+class ChunkReader:
+    """File-like view over a chunk iterator, so a large RSS body is never held whole."""
+
+    def __init__(self, chunks: Any) -> None:
+        self._chunks = iter(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        return next(self._chunks, b"")
+
+
+def parse_rss(size: int) -> list[NewsItem]:
+    cutoff = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+    return list(fetch_news_digest.iter_feed_items(ChunkReader(corpus.iter_rss_chunks(size, "top")), "top", cutoff))
+
+
+def copy_str(value: str) -> str:
+    return (value + " ")[:-1]
+
+
+def retained_bytes(build: Callable[[], Any]) -> tuple[int, Any]:
+    """Bytes still allocated after ``build()`` returns, with its result kept alive."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def bench_items(results: list[dict[str, Any]], sizes: list[int], repeat: int) -> None:
+    for size in sizes:
+        seconds, items = time_call(lambda: parse_rss(size), repeats_for(size, repeat))
+        del items
+        item_bytes, items = retained_bytes(lambda: parse_rss(size))
+        # The old dict-per-item layout holding the same data, every string its own copy
+        # as the parser used to produce them.
+        dict_bytes, dicts = retained_bytes(
+            lambda: [
+                {
+                    "title": copy_str(item.title),
+                    "source": copy_str(item.source),
+                    "link": copy_str(item.link),
+                    "published_utc": item.published_utc,
+                    "published_ts": item.published_ts,
+                    "feed": copy_str(item.feed),
+                }
+                for item in items
+            ]
+        )
+        count = max(1, len(items))
+        record(
+            results,
+            "ingest.parse",
+            size,
+            seconds,
+            items=len(items),
+            retained_mib=round(item_bytes / 2**20, 1),
+            bytes_per_item=round(item_bytes / count),
+            dict_bytes_per_item=round(dict_bytes / count),
+        )
+        del items, dicts
+
+
+def bench_selection(results: list[dict[str, Any]], sizes: list[int], repeat: int) -> None:
+    for size in sizes:
+        items = [NewsItem.from_dict(item) for item in corpus.make_items(size)]
+        headlines = [item.title for item in items]
+        reps = repeats_for(size, repeat)
+
+        seconds, selected = time_call(lambda: fetch_news_digest.dedupe_and_select(items, max_items=12), reps)
+        record(results, "dedupe_and_select", size, seconds)
+
+        seconds, _ = time_call(lambda: fetch_news_digest.detect_themes(headlines), reps)
+        record(results, "detect_themes", size, seconds)
+
+        seconds, _ = time_call(lambda: fetch_news_digest.top_terms(headlines), reps)
+        record(results, "top_terms", size, seconds)
+
+        seconds, _ = time_call(lambda: fetch_news_digest.build_payload(selected), repeat)
+        record(results, "build_payload", len(selected), seconds, corpus_size=size)
+
+
+def bench_wikipedia(results: list[dict[str, Any]], sizes: list[int], repeat: int, latency_ms: float) -> None:
+    config = StandInConfig(latency_ms=latency_ms)
+    original = (fetch_surprise_fact.ON_THIS_DAY_URL, fetch_surprise_fact.RANDOM_SUMMARY_URL)
+    fetch_surprise_fact.HTTP_CACHE = HTTPCache(enabled=False)
+    try:
+        with StandInServer(config) as server, tempfile.TemporaryDirectory() as index_dir:
+            fetch_surprise_fact.RANDOM_SUMMARY_URL = f"{server.base_url}/api/rest_v1/page/random/summary"
+            seconds, _ = time_call(lambda: fetch_surprise_fact.pick_random_summary(seed=1), repeat)
+            record(results, "pick_random_summary", 1, seconds)
+
+            pool_path = Path(index_dir) / "summary-pool.sqlite"
+            fetch_surprise_fact.refill_pool(pool_path, target=repeat + 20)
+            fetch_surprise_fact.HTTP_CACHE = HTTPCache(enabled=False)
+            seconds, _ = time_call(lambda: fetch_surprise_fact.pick_random_summary_pooled(1, pool_path), repeat)
+            record(results, "pick_random_summary.pooled", 1, seconds)
+
+            for size in sizes:
+                if size > 100_000:
+                    continue
+                fetch_surprise_fact.ON_THIS_DAY_URL = (
+                    f"{server.base_url}/api/rest_v1/feed/onthisday/events/{{month}}/{{day}}?items={size}"
+                )
+                seconds, _ = time_call(lambda: fetch_surprise_fact.pick_on_this_day(7, 20, seed=1), repeats_for(size, repeat))
+                record(results, "pick_on_this_day", size, seconds)
+
+                index_path = Path(index_dir) / f"onthisday-{size}.sqlite"
+                with OnThisDayIndex(index_path) as index:
+                    index.store_day(7, 20, fetch_surprise_fact.fetch_day_candidates(7, 20))
+                seconds, _ = time_call(
+                    lambda: fetch_surprise_fact.pick_on_this_day_indexed(7, 20, 1, index_path), repeat
+                )
+                record(results, "pick_on_this_day.indexed", size, seconds)
+    finally:
+        fetch_surprise_fact.ON_THIS_DAY_URL, fetch_surprise_fact.RANDOM_SUMMARY_URL = original
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list[dict[str, Any]], baseline_path: Path) -> int:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    previous = {(row["bench"], row["size"]): row["seconds"] for row in baseline.get("results", [])}
+    regressions = 0
+    print(f"\nComparison with {baseline_path} ({baseline.get('meta', {}).get('git_revision', '?')}):")
+    for row in results:
+        before = previous.get((row["bench"], row["size"]))
+        if not before:
+            continue
+        ratio = row["seconds"] / before
+        flag = "REGRESSION" if ratio > REGRESSION_RATIO else ""
+        regressions += bool(flag)
+        print(f"{row['bench']:<28} {row['size']:>9} {before:>10.4f}s -> {row['seconds']:>10.4f}s  x{ratio:.2f} {flag}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the surprise-print research stage offline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Corpus sizes (10 to 1000000)")
+    parser.add_argument("--fetch-max", type=int, default=100_000, help="Largest corpus served over HTTP (default: 100000)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stand-in server latency per request")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats per measurement below 100k items (median wins)")
+    parser.add_argument(
+        "--only",
+        choices=["fetch", "items", "selection", "wikipedia"],
+        nargs="+",
+        default=["fetch", "items", "selection", "wikipedia"],
+    )
+    parser.add_argument("--out", help="Write machine-readable results here")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero if any bench regressed")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    sizes = sorted(set(args.sizes))
+    results: list[dict[str, Any]] = []
+
+    print(f"{'bench':<28} {'size':>9} {'time':>11} {'per item':>18}")
+    if "fetch" in args.only:
+        bench_fetch(results, sizes, args.fetch_max, args.repeat, args.latency_ms)
+    if "items" in args.only:
+        bench_items(results, sizes, args.repeat)
+    if "selection" in args.only:
+        bench_selection(results, sizes, args.repeat)
+    if "wikipedia" in args.only:
+        bench_wikipedia(results, sizes, args.repeat, args.latency_ms)
+
+    payload = {
+        "meta": {
+            "timestamp_utc": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "latency_ms": args.latency_ms,
+        },
+        "results": results,
+    }
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+    regressions = compare(results, Path(args.compare)) if args.compare else 0
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+"""Synthetic corpora for the research-stage benchmarks.
+
+Everything is generated from a seed so runs are repeatable across versions.
+Headlines mix neutral filler with words from the real keyword tables, and a
+share of them are reworded copies of earlier ones to exercise near-duplicate
+clustering.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import email.utils
+import json
+import random
+from typing import Any, Iterator
+from xml.sax.saxutils import escape
+
+SUBJECTS = [
+    "NASA", "City council", "Researchers", "Local team", "Startup", "Museum", "Orchestra", "Farmers",
+    "Central bank", "Engineers", "Students", "Volunteers", "Astronomers", "Film festival", "League",
+]
+VERBS = [
+    "unveils", "launches", "celebrates", "announces", "wins", "opens", "reports", "plans", "tests",
+    "discovers", "expands", "restores", "debuts", "records", "builds",
+]
+OBJECTS = [
+    "space telescope", "robot design", "music award", "market rally", "new stadium", "wildlife park",
+    "climate study", "art exhibit", "chip factory", "science prize", "trade deal", "film premiere",
+    "health program", "record harvest", "championship trophy", "flood defenses", "software platform",
+]
+PLACES = [
+    "in Ohio", "in Texas", "near Denver", "in Seattle", "across Europe", "in Tokyo", "on the coast",
+    "downtown", "this weekend", "after long review", "for the first time", "despite delays",
+]
+SOURCES = [
+    "Associated Press", "Reuters", "The Verge", "BBC", "NPR", "Space.com", "ESPN", "Variety",
+    "Bloomberg", "CNN", "The Guardian", "Ars Technica", "Local News 5", "Science Daily",
+]
+FEEDS = ["top", "world", "business", "technology", "science", "entertainment", "sports"]
+NEAR_DUPLICATE_RATE = 0.15
+
+
+def make_titles(count: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    titles: list[str] = []
+    for i in range(count):
+        if titles and rng.random() < NEAR_DUPLICATE_RATE:
+            words = rng.choice(titles).split()
+            words[rng.randrange(len(words))] = rng.choice(["new", "big", "first", "major", "latest"])
+            titles.append(" ".join(words))
+            continue
+        titles.append(
+            f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(PLACES)} #{i}"
+        )
+    return titles
+
+
+def make_items(count: int, seed: int = 1, now: dt.datetime | None = None) -> list[dict[str, Any]]:
+    """Items shaped like ``fetch_news_digest.fetch_items`` output."""
+    rng = random.Random(seed)
+    now = now or dt.datetime.now(dt.timezone.utc)
+    items: list[dict[str, Any]] = []
+    for i, title in enumerate(make_titles(count, seed)):
+        published = now - dt.timedelta(seconds=rng.randrange(0, 30 * 3600))
+        items.append(
+            {
+                "title": title,
+                "source": rng.choice(SOURCES),
+                "link": f"https://news.example.invalid/articles/{seed}/{i}",
+                "published_utc": published.isoformat(),
+                "published_ts": published.timestamp(),
+                "feed": FEEDS[i % len(FEEDS)],
+            }
+        )
+    return items
+
+
+def iter_rss_chunks(
+    count: int,
+    feed: str,
+    seed: int = 1,
+    now: dt.datetime | None = None,
+    max_age_hours: float = 48.0,
+) -> Iterator[bytes]:
+    """Google-News-style RSS, newest first, spread over ``max_age_hours``."""
+    now = now or dt.datetime.now(dt.timezone.utc)
+    titles = make_titles(count, seed)
+    rng = random.Random(seed)
+    step = max_age_hours * 3600 / max(1, count)
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        f"<title>{escape(feed)} - Google News</title><link>https://news.google.com</link>"
+    ).encode("utf-8")
+    batch: list[str] = []
+    for i, title in enumerate(titles):
+        published = now - dt.timedelta(seconds=i * step)
+        batch.append(
+            "<item>"
+            f"<title>{escape(title)} - {escape(rng.choice(SOURCES))}</title>"
+            f"<link>https://news.example.invalid/{feed}/{seed}/{i}</link>"
+            f"<pubDate>{email.utils.format_datetime(published)}</pubDate>"
+            "<description>synthetic</description>"
+            "</item>"
+        )
+        if len(batch) >= 500:
+            yield "".join(batch).encode("utf-8")
+            batch = []
+    batch.append("</channel></rss>")
+    yield "".join(batch).encode("utf-8")
+
+
+def make_rss(count: int, feed: str, seed: int = 1, now: dt.datetime | None = None) -> bytes:
+    return b"".join(iter_rss_chunks(count, feed, seed, now))
+
+
+def make_onthisday(count: int, month: int, day: int, seed: int = 1) -> bytes:
+    """Wikipedia ``feed/onthisday/events`` JSON."""
+    rng = random.Random(seed * 1000 + month * 40 + day)
+    events = []
+    for i, title in enumerate(make_titles(count, seed)):
+        page = title.split("#")[0].strip().replace(" ", "_")
+        events.append(
+            {
+                "text": f"{title} in an event long remembered by historians of the region.",
+                "year": rng.randint(1500, 2020),
+                "pages": [
+                    {
+                        "title": page,
+                        "normalizedtitle": page.replace("_", " "),
+                        "content_urls": {"desktop": {"page": f"https://en.wikipedia.org/wiki/{page}_{i}"}},
+                    }
+                ],
+            }
+        )
+    return json.dumps({"events": events}).encode("utf-8")
+
+
+def make_random_summary(seed: int) -> bytes:
+    """Wikipedia ``page/random/summary`` JSON."""
+    rng = random.Random(seed)
+    title = f"{rng.choice(SUBJECTS)} {rng.choice(OBJECTS)}".title()
+    extract = (
+        f"{title} is a subject described in this synthetic summary number {seed}. "
+        f"It is often associated with {rng.choice(OBJECTS)} {rng.choice(PLACES)}."
+    )
+    return json.dumps(
+        {
+            "title": title,
+            "extract": extract,
+            "content_urls": {"desktop": {"page": f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"}},
+        }
+    ).encode("utf-8")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Local HTTP stand-in for Google News RSS and the Wikipedia REST endpoints.
+
+Serves synthetic responses so the research stage can be benchmarked with no
+network:
+
+- ``/rss/<feed>`` — RSS feed (``?items=N`` overrides the default size; ``?gl=XX`` picks an edition,
+  unless ``--shared-editions`` serves every edition the same stories)
+- ``/api/rest_v1/feed/onthisday/events/<month>/<day>``
+- ``/api/rest_v1/page/random/summary``
+
+Latency and failure rate are configurable. Responses carry an ETag and honor
+``If-None-Match`` so conditional GETs can be measured too. RSS and
+on-this-day bodies are gzip-encoded when the client accepts it (``--no-gzip``
+turns that off) and connections are kept alive.
+
+    ./skills/surprise-print/benchmarks/standin_server.py --port 8765 --items 200 --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import http.server
+import itertools
+import random
+import threading
+import time
+import urllib.parse
+import zlib
+from typing import Any
+
+import corpus
+
+FEED_NAMES = ["top", "world", "business", "technology", "science", "entertainment", "sports"]
+
+
+class StandInConfig:
+    def __init__(
+        self,
+        items: int = 100,
+        latency_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 1,
+        gzip: bool = True,
+        shared_editions: bool = False,
+    ) -> None:
+        self.items = items
+        self.gzip = gzip
+        self.shared_editions = shared_editions
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self._bodies: dict[tuple[Any, ...], tuple[bytes, str]] = {}
+        self._summary_counter = itertools.count()
+
+    def body(self, key: tuple[Any, ...], build: Any) -> tuple[bytes, str]:
+        with self.lock:
+            cached = self._bodies.get(key)
+        if cached is None:
+            data = build()
+            cached = (data, '"' + hashlib.sha1(data).hexdigest()[:16] + '"')
+            with self.lock:
+                self._bodies[key] = cached
+        return cached
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.rng.random() < self.failure_rate
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        config = self.server.config
+        with config.lock:
+            config.requests += 1
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000.0)
+        if config.should_fail():
+            self._send(503, b"synthetic failure", "text/plain")
+            return
+
+        parsed = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        parts = [p for p in parsed.path.split("/") if p]
+
+        if len(parts) == 2 and parts[0] == "rss":
+            feed = parts[1]
+            count = int(query.get("items", [config.items])[0])
+            # Each edition (?gl=GB, ...) gets its own headlines, or with shared_editions the same
+            # stories and links, as Google News does for stories that run in several editions.
+            edition = "" if config.shared_editions else query.get("gl", [""])[0]
+            seed = config.seed + (FEED_NAMES.index(feed) if feed in FEED_NAMES else 0) + zlib.crc32(edition.encode())
+            key = ("rss", feed, count, edition)
+            body, etag = config.body(key, lambda: corpus.make_rss(count, feed, seed=seed))
+            self._send_compressible(key, body, "application/rss+xml; charset=utf-8", etag)
+        elif parts[:5] == ["api", "rest_v1", "feed", "onthisday", "events"] and len(parts) == 7:
+            month, day = int(parts[5]), int(parts[6])
+            count = int(query.get("items", [config.items])[0])
+            body, etag = config.body(
+                ("onthisday", month, day, count),
+                lambda: corpus.make_onthisday(count, month, day, seed=config.seed),
+            )
+            self._send_compressible(("onthisday", month, day, count), body, "application/json; charset=utf-8", etag)
+        elif parts == ["api", "rest_v1", "page", "random", "summary"]:
+            body = corpus.make_random_summary(config.seed * 1_000_000 + next(config._summary_counter))
+            self._send(200, body, "application/json; charset=utf-8")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _send_compressible(self, key: tuple[Any, ...], body: bytes, content_type: str, etag: str) -> None:
+        config = self.server.config
+        if config.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            encoded, _ = config.body(("gzip", *key), lambda: gzip.compress(body, compresslevel=6))
+            self._send(200, encoded, content_type, etag, encoding="gzip")
+        else:
+            self._send(200, body, content_type, etag)
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: str,
+        etag: str | None = None,
+        encoding: str | None = None,
+    ) -> None:
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.config.lock:
+            self.server.config.bytes_sent += len(body)
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, config: StandInConfig, host: str = "127.0.0.1", port: int = 0) -> None:
+        super().__init__((host, port), StandInHandler)
+        self.config = config
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def feed_urls(self, items: int | None = None) -> dict[str, str]:
+        suffix = f"?items={items}" if items is not None else ""
+        return {name: f"{self.base_url}/rss/{name}{suffix}" for name in FEED_NAMES}
+
+    def __enter__(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve synthetic RSS/Wikipedia responses for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--items", type=int, default=100, help="Default items per feed / on-this-day payload")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-gzip", action="store_true", help="Never gzip-encode responses")
+    parser.add_argument("--shared-editions", action="store_true", help="Serve the same stories in every ?gl= edition")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    server = StandInServer(
+        StandInConfig(
+            items=args.items,
+            latency_ms=args.latency_ms,
+            failure_rate=args.failure_rate,
+            seed=args.seed,
+            gzip=not args.no_gzip,
+            shared_editions=args.shared_editions,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Serving stand-in feeds at {server.base_url}/rss/<feed> and Wikipedia at {server.base_url}/api/rest_v1/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
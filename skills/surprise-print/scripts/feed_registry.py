@@ -0,0 +1,110 @@
+"""Feed registry for the news digest: which feeds to read and how to schedule them.
+
+A registry file is JSON, either a list of feeds or an object with optional
+``defaults`` and a ``feeds`` list::
+
+    {
+      "defaults": {"refresh_sec": 900, "timeout": 8},
+      "feeds": [
+        {"name": "top", "url": "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en", "priority": 10},
+        {"name": "science", "url": "https://...", "weight": 3},
+        {"name": "uk-tech", "url": "https://...", "weight": 2, "refresh_sec": 3600}
+      ]
+    }
+
+``weight`` is the ranking boost for the feed's headlines and breaks
+scheduling ties; ``priority`` decides which feeds are fetched first when the
+latency budget cannot cover them all. ``refresh_sec`` is how long a fetched
+feed counts as fresh and is read from the cache with no request; ``timeout``
+is its socket timeout (default: the digest's ``--feed-timeout``).
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+from pathlib import Path
+from typing import Any, Iterable, Mapping, NamedTuple
+
+DEFAULT_REFRESH_SEC = 300.0
+
+FIELDS = ("name", "url", "weight", "refresh_sec", "timeout", "priority")
+
+
+class FeedSpec(NamedTuple):
+    name: str
+    url: str
+    weight: float = 0.0
+    refresh_sec: float = DEFAULT_REFRESH_SEC
+    timeout: float | None = None
+    priority: int = 0
+
+
+def registry_from_urls(feeds: Mapping[str, str], weights: Mapping[str, float] | None = None) -> list[FeedSpec]:
+    """Wrap a plain ``{name: url}`` mapping with default scheduling settings."""
+    return [FeedSpec(name, url, weight=float((weights or {}).get(name, 0))) for name, url in feeds.items()]
+
+
+def _number(entry: dict[str, Any], field: str, where: str) -> float | None:
+    value = entry.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}: '{field}' must be a number")
+    if field != "weight" and field != "priority" and value < 0:
+        raise ValueError(f"{where}: '{field}' must not be negative")
+    return float(value)
+
+
+def _spec(entry: Any, defaults: dict[str, Any], where: str) -> FeedSpec:
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where}: each feed must be a JSON object")
+    merged = {**defaults, **entry}
+    unknown = sorted(set(merged) - set(FIELDS))
+    if unknown:
+        raise ValueError(f"{where}: unknown field(s) {', '.join(unknown)}")
+    name, url = merged.get("name"), merged.get("url")
+    if not isinstance(name, str) or not name or not isinstance(url, str) or not url:
+        raise ValueError(f"{where}: 'name' and 'url' are required strings")
+
+    weight = _number(merged, "weight", where)
+    refresh = _number(merged, "refresh_sec", where)
+    timeout = _number(merged, "timeout", where)
+    priority = _number(merged, "priority", where)
+    return FeedSpec(
+        name=name,
+        url=url,
+        weight=weight if weight is not None else 0.0,
+        refresh_sec=refresh if refresh is not None else DEFAULT_REFRESH_SEC,
+        timeout=timeout or None,
+        priority=int(priority or 0),
+    )
+
+
+def load_registry(path: Path | str) -> list[FeedSpec]:
+    """Load and validate a registry file; raises ``ValueError`` on bad content."""
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    defaults: dict[str, Any] = {}
+    if isinstance(raw, dict):
+        defaults = raw.get("defaults") or {}
+        if not isinstance(defaults, dict) or {"name", "url"} & set(defaults):
+            raise ValueError(f"Feed registry 'defaults' must be an object without name/url: {path}")
+        raw = raw.get("feeds")
+    if not isinstance(raw, list) or not raw:
+        raise ValueError(f"Feed registry must list at least one feed: {path}")
+
+    specs = [_spec(entry, defaults, f"{path} feed #{idx + 1}") for idx, entry in enumerate(raw)]
+    duplicates = sorted(name for name, count in collections.Counter(s.name for s in specs).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Feed registry has duplicate names: {', '.join(duplicates)}")
+    return specs
+
+
+def schedule_order(specs: Iterable[FeedSpec], fresh: set[str] | None = None) -> list[FeedSpec]:
+    """Fetch order: fresh (cache-only) feeds, then by priority and weight, then file order."""
+    fresh = fresh or set()
+    ranked = sorted(
+        enumerate(specs),
+        key=lambda pair: (pair[1].name not in fresh, -pair[1].priority, -pair[1].weight, pair[0]),
+    )
+    return [spec for _, spec in ranked]
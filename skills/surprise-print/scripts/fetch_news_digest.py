@@ -1,18 +1,50 @@
 #!/usr/bin/env python3
-"""Build a same-day news digest from Google News RSS and craft an image prompt."""
+"""Build a same-day news digest from Google News RSS and craft an image prompt.
+
+``--locales en-US,en-GB,en-IN --out-dir DIR`` builds one digest per Google
+News edition from a single shared fetch pass. Scoring and selection then run
+per locale on a process pool whose workers receive the compiled keyword
+matcher once. Each locale gets ``DIR/<locale>/fact.json``, and
+``DIR/manifest.json`` lists them all.
+"""
 
 from __future__ import annotations
 
 import argparse
 import collections
+import concurrent.futures
+import contextlib
 import datetime as dt
 import email.utils
+import hashlib
+import heapq
 import json
+import os
 import re
-import urllib.request
+import sys
+import time
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Iterator
+
+from atomic_json import write_json_atomic
+from feed_registry import FeedSpec, load_registry, registry_from_urls, schedule_order
+from headline_store import DEFAULT_REPEAT_WINDOW_DAYS, DEFAULT_STORE_PATH, HeadlineStore
+from http_cache import DEFAULT_CACHE_ROOT, CacheStream, HTTPCache, add_cache_arguments, cache_from_args
+from http_transport import TRANSPORT, stats_delta
+from keyword_matcher import KeywordMatcher, load_keyword_file
+from near_duplicates import cluster_titles
+from news_items import NewsItem
+from news_locales import (
+    DEFAULT_LOCALE,
+    Locale,
+    feed_locale,
+    localize_registry,
+    localize_url,
+    parse_locale,
+    parse_locales,
+)
+from run_trace import profiled, span
 
 FEEDS: dict[str, str] = {
     "top": "https://news.google.com/rss?hl=en-US&gl=US&ceid=US:en",
@@ -24,15 +56,35 @@ FEEDS: dict[str, str] = {
     "sports": "https://news.google.com/rss/headlines/section/topic/SPORTS?hl=en-US&gl=US&ceid=US:en",
 }
 
+# Per-feed socket timeout and the overall budget for one fetch pass, in seconds.
+FEED_TIMEOUT_SEC = 10.0
+FETCH_DEADLINE_SEC = 25.0
+WINDOW_HOURS = 36
+MAX_FETCH_WORKERS = 8
+# A network feed is not started with less than this much of the budget left.
+MIN_FEED_BUDGET_SEC = 0.5
+BUDGET_SKIPPED = "skipped: latency budget exhausted"
+
+STREAM_CHUNK_BYTES = 16 * 1024
+
+HTTP_CACHE = HTTPCache()
+
+# Parsed items per (feed, url), reused when the feed revalidates with a 304.
+# Only pays off in --watch mode, where the process outlives one fetch pass.
+PARSED_FEEDS: dict[tuple[str, str], list[NewsItem]] = {}
+
+WATCH_DIR = DEFAULT_CACHE_ROOT / "digest"
+DEFAULT_WATCH_INTERVAL_SEC = 600.0
+
 THEME_KEYWORDS: dict[str, list[str]] = {
     "geopolitics": [
-        "war", "conflict", "border", "sanction", "summit", "treaty", "diplom", "election", "government", "minister",
+        "war", "conflict", "border", "sanction", "summit", "treaty", "diplom*", "election", "government", "minister",
     ],
     "economy": [
         "market", "stocks", "inflation", "jobs", "economy", "trade", "tariff", "rate", "earnings", "gdp", "recession",
     ],
     "technology": [
-        "ai", "artificial intelligence", "chip", "software", "cyber", "robot", "startup", "app", "platform", "data",
+        "ai", "artificial intelligence", "chip", "software", "cyber*", "robot*", "startup", "app", "platform", "data",
     ],
     "science": [
         "science", "research", "study", "discovery", "space", "nasa", "astronomy", "biology", "physics", "medicine",
@@ -80,7 +132,7 @@ FUN_BOOST_KEYWORDS = {
     "art",
     "music",
     "film",
-    "robot",
+    "robot*",
     "science",
     "wildlife",
     "design",
@@ -90,37 +142,45 @@ FUN_BOOST_KEYWORDS = {
     "victory",
 }
 
+# Matched as whole words, so "war" does not hit "award"; stems (``*``) cover the
+# inflections a substring scan would catch ("bombing", "flooded", "murdered", "leaked").
 HEAVY_DOWNRANK_KEYWORDS = {
-    "killed",
-    "killing",
+    "kill*",
     "dead",
-    "death",
+    "deadly",
+    "death*",
     "dies",
-    "murder",
-    "massacre",
-    "shooting",
-    "airstrike",
-    "missile",
-    "bomb",
+    "died",
+    "murder*",
+    "massacre*",
+    "shoot*",
+    "airstrike*",
+    "missile*",
+    "bomb*",
     "war",
-    "hostage",
-    "earthquake",
-    "flood",
-    "wildfire",
-    "hurricane",
-    "disaster",
-    "investigation",
+    "hostage*",
+    "earthquake*",
+    "flood*",
+    "wildfire*",
+    "hurricane*",
+    "disaster*",
+    "disastrous",
+    "investigat*",
+    "alleged",
     "allegedly",
-    "lawsuit",
-    "scandal",
+    "lawsuit*",
+    "scandal*",
     "epstein",
-    "mishap",
+    "mishap*",
     "crime",
-    "leak",
-    "curse",
+    "leak*",
+    "curse*",
 }
 
-FUN_FEED_BOOST = {
+# Applied to headlines that already went into a print within the repeat window.
+REPEAT_PENALTY = 8
+
+FUN_FEED_BOOST: dict[str, float] = {
     "science": 3,
     "technology": 3,
     "entertainment": 4,
@@ -128,6 +188,13 @@ FUN_FEED_BOOST = {
     "business": 1,
 }
 
+# The feeds a digest reads; configure() swaps in a --feeds registry file.
+FEED_REGISTRY: list[FeedSpec] = registry_from_urls(FEEDS, FUN_FEED_BOOST)
+
+# Editions to build; with --locales, the feed names each locale reads from FEED_REGISTRY.
+LOCALES: list[Locale] = [parse_locale(DEFAULT_LOCALE)]
+LOCALE_FEEDS: dict[str, list[str]] = {}
+
 STOPWORDS = {
     "the", "and", "for", "with", "from", "that", "this", "after", "over", "into", "about", "amid", "under",
     "more", "than", "new", "its", "their", "his", "her", "are", "was", "were", "will", "would", "can",
@@ -157,17 +224,36 @@ MOTIF_EXCLUDE = {
 }
 
 
-def fetch_xml(url: str) -> ET.Element:
-    req = urllib.request.Request(
+def build_matcher(extra: dict[str, list[str]] | None = None) -> KeywordMatcher:
+    categories: dict[str, list[str]] = {
+        "fun": sorted(FUN_BOOST_KEYWORDS),
+        "heavy": sorted(HEAVY_DOWNRANK_KEYWORDS),
+    }
+    for theme, keywords in THEME_KEYWORDS.items():
+        categories[f"theme:{theme}"] = list(keywords)
+    for category, keywords in (extra or {}).items():
+        categories[category] = categories.get(category, []) + list(keywords)
+    return KeywordMatcher(categories)
+
+
+# Built once at import; main() rebuilds it if operator keywords are supplied.
+KEYWORDS = build_matcher()
+
+
+@contextlib.contextmanager
+def open_feed(url: str, timeout: float = FEED_TIMEOUT_SEC, max_age: float = 0.0) -> Iterator[CacheStream]:
+    with HTTP_CACHE.open(
         url,
         headers={
             "User-Agent": "Codex-Surprise-Print/1.0 (news digest)",
             "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8",
         },
-    )
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        data = resp.read()
-    return ET.fromstring(data)
+        timeout=timeout,
+        max_age=max_age,
+    ) as opened:
+        if opened.origin == "stale":
+            print(f"warning: serving cached copy of {url} ({opened.age_sec / 60:.0f} min old)", file=sys.stderr)
+        yield opened
 
 
 def parse_title(raw: str) -> tuple[str, str]:
@@ -193,107 +279,223 @@ def normalize_key(title: str) -> str:
     return re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
 
 
-def score_item_for_fun(item: dict[str, Any]) -> int:
-    title = item["title"].lower()
-    score = FUN_FEED_BOOST.get(item["feed"], 0)
-
-    for kw in FUN_BOOST_KEYWORDS:
-        if kw in title:
-            score += 2
-
-    for kw in HEAVY_DOWNRANK_KEYWORDS:
-        if kw in title:
-            score -= 6
-
+def score_item_for_fun(item: NewsItem) -> float:
+    hits = KEYWORDS.match(item.title)
+    score = FUN_FEED_BOOST.get(item.feed, 0)
+    score += 2 * len(hits.get("fun", ()))
+    score -= 6 * len(hits.get("heavy", ()))
+    if item.printed_recently:
+        score -= REPEAT_PENALTY
     return score
 
 
-def fetch_items() -> list[dict[str, Any]]:
-    items: list[dict[str, Any]] = []
-    now = dt.datetime.now(dt.timezone.utc)
-    cutoff = now - dt.timedelta(hours=36)
+def iter_feed_items(stream: IO[bytes], feed_name: str, cutoff: dt.datetime) -> Iterator[NewsItem]:
+    """Incrementally parse RSS ``<item>`` elements from ``stream``.
+
+    Items are yielded as soon as their closing tag arrives and are detached
+    from the tree afterwards, so memory stays flat regardless of feed size.
+    Items older than ``cutoff`` are skipped, but the whole feed is read:
+    Google News topic feeds are not sorted by date.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    channel: ET.Element | None = None
+
+    while True:
+        chunk = stream.read(STREAM_CHUNK_BYTES)
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+
+        for event, node in parser.read_events():
+            if event == "start":
+                if node.tag == "channel":
+                    channel = node
+                continue
+            if node.tag != "item":
+                continue
 
-    for feed_name, url in FEEDS.items():
-        root = fetch_xml(url)
-        for node in root.findall("./channel/item"):
             raw_title = (node.findtext("title") or "").strip()
+            link = (node.findtext("link") or "").strip()
+            raw_date = (node.findtext("pubDate") or "").strip()
+            node.clear()
+            if channel is not None:
+                channel.remove(node)
+
             if not raw_title:
                 continue
-            title, source = parse_title(raw_title)
-            link = (node.findtext("link") or "").strip()
-            published = parse_date((node.findtext("pubDate") or "").strip())
+            published = parse_date(raw_date)
             if published < cutoff:
                 continue
-            items.append(
-                {
-                    "title": title,
-                    "source": source,
-                    "link": link,
-                    "published_utc": published.isoformat(),
-                    "published_ts": published.timestamp(),
-                    "feed": feed_name,
-                }
+
+            title, source = parse_title(raw_title)
+            yield NewsItem(title, source, link, published.timestamp(), feed_name)
+
+        if not chunk:
+            return
+
+
+def fetch_feed(
+    feed_name: str,
+    url: str,
+    cutoff: dt.datetime,
+    timeout: float,
+    refresh_sec: float = 0.0,
+) -> list[NewsItem]:
+    memo_key = (feed_name, url)
+    with span("research.feed", parent="research.fetch_items", feed=feed_name) as attrs:
+        with open_feed(url, timeout=timeout, max_age=refresh_sec) as opened:
+            attrs["origin"] = opened.origin
+            if opened.origin in ("revalidated", "fresh") and memo_key in PARSED_FEEDS:
+                cutoff_ts = cutoff.timestamp()
+                items = [item for item in PARSED_FEEDS[memo_key] if item.published_ts >= cutoff_ts]
+                attrs["items"] = len(items)
+                return items
+            items = list(iter_feed_items(opened.stream, feed_name, cutoff))
+        PARSED_FEEDS[memo_key] = items
+        attrs["items"] = len(items)
+        return items
+
+
+def fetch_items(
+    feeds: dict[str, str] | list[FeedSpec] | None = None,
+    feed_timeout: float = FEED_TIMEOUT_SEC,
+    deadline: float = FETCH_DEADLINE_SEC,
+) -> tuple[list[NewsItem], dict[str, str]]:
+    """Fetch feeds under a latency budget, most valuable first.
+
+    Feeds still within their refresh interval are read from the cache with no
+    request. The rest start in priority/weight order on a bounded pool, each
+    only while at least ``MIN_FEED_BUDGET_SEC`` of the ``deadline`` remains,
+    so wall-clock time stays bounded however long the feed list grows.
+    Returns the items gathered when the budget ran out (best effort), plus a
+    mapping of feed name to failure reason for the feeds that gave none;
+    feeds never started are reported as ``BUDGET_SKIPPED``.
+    """
+    specs = FEED_REGISTRY if feeds is None else feeds
+    if isinstance(specs, dict):
+        specs = registry_from_urls(specs, FUN_FEED_BOOST)
+    started = time.monotonic()
+    now = dt.datetime.now(dt.timezone.utc)
+    cutoff = now - dt.timedelta(hours=WINDOW_HOURS)
+
+    fresh = set()
+    for spec in specs:
+        age = HTTP_CACHE.age(spec.url) if spec.refresh_sec > 0 else None
+        if age is not None and age <= spec.refresh_sec:
+            fresh.add(spec.name)
+    pending = collections.deque(schedule_order(specs, fresh))
+
+    by_feed: dict[str, list[NewsItem]] = {}
+    missing: dict[str, str] = {}
+    running: dict[concurrent.futures.Future[list[NewsItem]], FeedSpec] = {}
+    workers = max(1, min(MAX_FETCH_WORKERS, len(pending)))
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed")
+
+    def start_more() -> None:
+        while pending and len(running) < workers:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining < MIN_FEED_BUDGET_SEC:
+                return
+            spec = pending.popleft()
+            timeout = min(spec.timeout or feed_timeout, remaining)
+            running[pool.submit(fetch_feed, spec.name, spec.url, cutoff, timeout, spec.refresh_sec)] = spec
+
+    try:
+        start_more()
+        while running:
+            remaining = deadline - (time.monotonic() - started)
+            done, _ = concurrent.futures.wait(
+                running, timeout=max(0.0, remaining), return_when=concurrent.futures.FIRST_COMPLETED
             )
+            if not done:
+                break
+            for future in done:
+                spec = running.pop(future)
+                try:
+                    by_feed[spec.name] = future.result()
+                except Exception as exc:
+                    missing[spec.name] = f"{type(exc).__name__}: {exc}"
+            start_more()
+    finally:
+        # Stragglers are bounded by their socket timeout; don't block on them here.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for spec in running.values():
+        missing[spec.name] = f"deadline of {deadline:g}s exceeded"
+    for spec in pending:
+        missing[spec.name] = BUDGET_SKIPPED
+
+    # Keep registry order stable so ranking ties resolve the same way every run.
+    items = [item for spec in specs if spec.name in by_feed for item in by_feed[spec.name]]
+    return items, {spec.name: missing[spec.name] for spec in specs if spec.name in missing}
+
+
+def dedupe_and_select(items: list[NewsItem], max_items: int) -> list[NewsItem]:
+    """Pick up to ``max_items`` headlines, most fun first, without sorting the corpus.
+
+    Exact repeats keep their newest copy, near-duplicate clusters keep their
+    best-ranked member, and the top of what remains is popped off a heap.
+    Scores live in a list parallel to the items rather than on copies of them.
+    Ties resolve by input order, which matches the newest-first order the
+    headline store returns.
+    """
+    newest: dict[str, int] = {}
+    for idx, item in enumerate(items):
+        key = normalize_key(item.title)
+        if not key:
+            continue
+        current = newest.get(key)
+        if current is None or item.published_ts > items[current].published_ts:
+            newest[key] = idx
 
-    return items
+    deduped = [items[idx] for idx in sorted(newest.values())]
+    scores = [score_item_for_fun(item) for item in deduped]
 
+    # Collapse syndicated rewrites of the same story to their best-ranked version.
+    best_in_cluster: dict[int, int] = {}
+    for idx, cluster in enumerate(cluster_titles([item.title for item in deduped])):
+        current = best_in_cluster.get(cluster)
+        if current is None or (scores[idx], deduped[idx].published_ts) > (scores[current], deduped[current].published_ts):
+            best_in_cluster[cluster] = idx
 
-def dedupe_and_select(items: list[dict[str, Any]], max_items: int) -> list[dict[str, Any]]:
-    items_sorted = sorted(items, key=lambda x: x["published_ts"], reverse=True)
+    heap = [(-scores[idx], -deduped[idx].published_ts, idx) for idx in best_in_cluster.values()]
+    heapq.heapify(heap)
 
-    deduped: list[dict[str, Any]] = []
-    seen: set[str] = set()
-    for item in items_sorted:
-        key = normalize_key(item["title"])
-        if not key or key in seen:
-            continue
-        seen.add(key)
-        deduped.append(item)
-
-    scored = [
-        {
-            **item,
-            "fun_score": score_item_for_fun(item),
-        }
-        for item in deduped
-    ]
-    ranked = sorted(scored, key=lambda x: (x["fun_score"], x["published_ts"]), reverse=True)
-
-    selected: list[dict[str, Any]] = []
+    selected: list[NewsItem] = []
+    passed_over: list[NewsItem] = []
     per_source: collections.Counter[str] = collections.Counter()
 
-    for item in ranked:
-        if len(selected) >= max_items:
-            break
-        if item["fun_score"] < -5:
-            continue
-        source = item["source"]
-        if per_source[source] >= 2:
+    while heap and len(selected) < max_items:
+        idx = heapq.heappop(heap)[2]
+        item = deduped[idx]
+        if scores[idx] < -5 or per_source[item.source] >= 2:
+            passed_over.append(item)
             continue
         selected.append(item)
-        per_source[source] += 1
+        per_source[item.source] += 1
 
-    if len(selected) < max_items:
-        for item in ranked:
-            if len(selected) >= max_items:
-                break
-            if item in selected:
-                continue
-            selected.append(item)
+    # Fill any remaining slots in rank order: first the items skipped above,
+    # then whatever is still on the heap.
+    for item in passed_over:
+        if len(selected) >= max_items:
+            break
+        selected.append(item)
+    while heap and len(selected) < max_items:
+        selected.append(deduped[heapq.heappop(heap)[2]])
 
     return selected
 
 
 def detect_themes(headlines: list[str]) -> list[str]:
     scores: collections.Counter[str] = collections.Counter()
-    text_blobs = [h.lower() for h in headlines]
+    theme_categories = [c for c in KEYWORDS.categories if c.startswith("theme:")]
 
-    for blob in text_blobs:
-        for theme, keywords in THEME_KEYWORDS.items():
-            for kw in keywords:
-                if kw in blob:
-                    scores[theme] += 1
-                    break
+    for headline in headlines:
+        hits = KEYWORDS.match(headline)
+        for category in theme_categories:
+            if category in hits:
+                scores[category[len("theme:"):]] += 1
 
     ranked = [theme for theme, _ in scores.most_common()]
     if not ranked:
@@ -353,13 +555,13 @@ def compose_motifs(themes: list[str], extracted: list[str], limit: int = 7) -> l
     return motifs[:limit]
 
 
-def build_prompt(themes: list[str], motifs: list[str]) -> str:
+def build_prompt(themes: list[str], motifs: list[str], region: str = "U.S.") -> str:
     theme_labels = [THEME_LABELS.get(t, t) for t in themes]
     motifs_text = ", ".join(motifs) if motifs else "celebration, discovery, motion, confetti, bright city lights"
     themes_text = ", ".join(theme_labels)
 
     return (
-        "Create a vertical editorial illustration that captures today's U.S. news atmosphere across multiple stories with an uplifting, playful tone. "
+        f"Create a vertical editorial illustration that captures today's {region} news atmosphere across multiple stories with an uplifting, playful tone. "
         f"Primary themes: {themes_text}. "
         f"Symbolic motifs: {motifs_text}. "
         "Visual direction: whimsical magazine-cover collage, bright optimistic palette, expressive shapes, dynamic but coherent composition, "
@@ -368,8 +570,13 @@ def build_prompt(themes: list[str], motifs: list[str]) -> str:
     )
 
 
-def build_payload(selected: list[dict[str, Any]]) -> dict[str, Any]:
-    headlines = [item["title"] for item in selected]
+def build_payload(
+    selected: list[NewsItem],
+    missing_feeds: dict[str, str] | None = None,
+    locale: Locale | None = None,
+) -> dict[str, Any]:
+    locale = locale or LOCALES[0]
+    headlines = [item.title for item in selected]
     themes = detect_themes(headlines)
     extracted_motifs = top_terms(headlines)
     motifs = compose_motifs(themes, extracted_motifs)
@@ -384,55 +591,366 @@ def build_payload(selected: list[dict[str, Any]]) -> dict[str, Any]:
         "fact": theme_sentence,
         "theme_summary": theme_sentence,
         "source_title": "Google News RSS (multiple publishers)",
-        "source_url": FEEDS["top"],
-        "prompt": build_prompt(themes, motifs),
+        "source_url": localize_url(FEEDS["top"], locale),
+        "prompt": build_prompt(themes, motifs, locale.label),
         "tone": "uplifting-playful",
         "themes": themes,
         "motifs": motifs,
         "headline_count": len(selected),
-        "headlines": [
-            {
-                "title": item["title"],
-                "source": item["source"],
-                "published_utc": item["published_utc"],
-                "link": item["link"],
-                "feed": item["feed"],
-            }
-            for item in selected
+        "headlines": [item.as_headline() for item in selected],
+        "missing_feeds": [
+            {"feed": feed_name, "reason": reason} for feed_name, reason in (missing_feeds or {}).items()
         ],
         "mode": "news-digest",
+        "locale": locale.code,
         "date": dt.datetime.now(dt.timezone.utc).date().isoformat(),
         "as_of_utc": dt.datetime.now(dt.timezone.utc).isoformat(),
     }
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Fetch daily news digest for surprise-print")
     parser.add_argument("--max-items", type=int, default=12)
     parser.add_argument("--out")
-    return parser.parse_args()
+    parser.add_argument(
+        "--feed-timeout",
+        type=float,
+        default=FEED_TIMEOUT_SEC,
+        help=f"Per-feed network timeout in seconds (default: {FEED_TIMEOUT_SEC:g})",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=FETCH_DEADLINE_SEC,
+        help=f"Overall fetch budget in seconds; late feeds are reported as missing (default: {FETCH_DEADLINE_SEC:g})",
+    )
+    parser.add_argument(
+        "--feeds",
+        default=os.environ.get("SURPRISE_PRINT_FEEDS"),
+        help="JSON feed registry with per-feed weight, refresh_sec, timeout and priority "
+        "(env SURPRISE_PRINT_FEEDS; default: the built-in Google News sections)",
+    )
+    parser.add_argument(
+        "--locales",
+        help="Comma-separated Google News editions, e.g. en-US,en-GB,en-IN (default: en-US). "
+        "More than one needs --out-dir",
+    )
+    parser.add_argument("--out-dir", help="Write <out-dir>/<locale>/fact.json per locale plus <out-dir>/manifest.json")
+    parser.add_argument(
+        "--keywords-file",
+        help='JSON file of extra keywords per category, e.g. {"fun": [...], "heavy": [...], "theme:science": [...]}',
+    )
+    parser.add_argument(
+        "--store",
+        default=str(DEFAULT_STORE_PATH),
+        help=f"SQLite headline store for incremental ingest and repeat tracking (default: {DEFAULT_STORE_PATH})",
+    )
+    parser.add_argument("--no-store", action="store_true", help="Select from this run's fetch only")
+    parser.add_argument(
+        "--repeat-window-days",
+        type=float,
+        default=DEFAULT_REPEAT_WINDOW_DAYS,
+        help=f"Down-rank headlines printed within this many days (default: {DEFAULT_REPEAT_WINDOW_DAYS:g})",
+    )
+    # Accepted for older callers; selecting a digest never records it as printed.
+    parser.add_argument("--no-record", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--record-printed",
+        metavar="FACT_JSON",
+        help="Record the headlines of a digest as printed, then exit (run it after the print succeeds)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=f"Stay resident and refresh the digest every --interval seconds (default --out: {WATCH_DIR / 'latest.json'})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL_SEC,
+        help=f"Polling interval for --watch in seconds (default: {DEFAULT_WATCH_INTERVAL_SEC:g})",
+    )
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def fetch_pass(args: argparse.Namespace) -> tuple[list[NewsItem], dict[str, str]]:
+    with span("research.fetch_items") as attrs:
+        transport_before = TRANSPORT.stats()
+        items, missing_feeds = fetch_items(feed_timeout=args.feed_timeout, deadline=args.deadline)
+        skipped = [name for name, reason in missing_feeds.items() if reason == BUDGET_SKIPPED]
+        attrs.update(items=len(items), missing=sorted(set(missing_feeds) - set(skipped)), skipped=len(skipped))
+        attrs.update(stats_delta(transport_before, TRANSPORT.stats()))
+    for feed_name, reason in missing_feeds.items():
+        if reason != BUDGET_SKIPPED:
+            print(f"warning: feed '{feed_name}' missing: {reason}", file=sys.stderr)
+    if skipped:
+        print(f"warning: {len(skipped)} lower-priority feed(s) skipped to stay within {args.deadline:g}s", file=sys.stderr)
+    return items, missing_feeds
+
+
+def window_items(args: argparse.Namespace, store: HeadlineStore | None, items: list[NewsItem]) -> list[NewsItem]:
+    """This fetch's items, or with a store, everything it holds from the selection window."""
+    if store is None:
+        return items
+    with span("research.store") as attrs:
+        attrs["new_items"] = store.ingest(
+            items, [normalize_key(item.title) for item in items], [feed_locale(item.feed) for item in items]
+        )
+        window_start = dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=WINDOW_HOURS)
+        items = store.recent(window_start.timestamp(), repeat_window_days=args.repeat_window_days)
+        attrs["window_items"] = len(items)
+    return items
 
 
-def main() -> int:
-    args = parse_args()
-    max_items = max(5, min(args.max_items, 25))
+def locale_items(items: list[NewsItem], missing_feeds: dict[str, str], locale: Locale) -> tuple[list[NewsItem], dict[str, str]]:
+    """The items and missing feeds that belong to one locale's digest."""
+    # Without --locales, still leave out other editions' headlines that a --locales run stored.
+    names = set(LOCALE_FEEDS[locale.code]) if LOCALE_FEEDS else {spec.name for spec in FEED_REGISTRY}
+    return (
+        [item for item in items if item.feed in names],
+        {name: reason for name, reason in missing_feeds.items() if name in names},
+    )
+
+
+def select_payload(
+    items: list[NewsItem],
+    max_items: int,
+    missing_feeds: dict[str, str],
+    locale: Locale,
+) -> dict[str, Any]:
+    with span("research.select", candidates=len(items), locale=locale.code):
+        selected = dedupe_and_select(items, max_items=max_items)
+    with span("research.build_payload", locale=locale.code):
+        return build_payload(selected, missing_feeds, locale)
 
-    try:
-        items = fetch_items()
-    except Exception as exc:
-        raise SystemExit(f"Failed to fetch RSS feeds: {exc}")
 
+def _init_locale_worker(keywords: KeywordMatcher, boosts: dict[str, float]) -> None:
+    # Workers get the parent's matcher and feed weights once instead of per task.
+    global KEYWORDS, FUN_FEED_BOOST
+    KEYWORDS = keywords
+    FUN_FEED_BOOST = boosts
+
+
+def run_digest(args: argparse.Namespace, store: HeadlineStore | None) -> dict[str, Any]:
+    if len(LOCALES) > 1:
+        raise SystemExit("Several --locales need --out-dir (one fact.json per locale)")
+    max_items = effective_max_items(args.max_items)
+    items, missing_feeds = fetch_pass(args)
+    items, missing_feeds = locale_items(window_items(args, store, items), missing_feeds, LOCALES[0])
     if not items:
         raise SystemExit("No news items were fetched.")
 
-    selected = dedupe_and_select(items, max_items=max_items)
-    payload = build_payload(selected)
+    return select_payload(items, max_items, missing_feeds, LOCALES[0])
+
+
+def run_locales(args: argparse.Namespace, store: HeadlineStore | None, out_dir: Path) -> dict[str, Any]:
+    """One fetch pass, then a digest per locale selected in parallel; returns the manifest."""
+    max_items = effective_max_items(args.max_items)
+    items, missing_feeds = fetch_pass(args)
+    items = window_items(args, store, items)
+    jobs = {locale.code: (locale, *locale_items(items, missing_feeds, locale)) for locale in LOCALES}
+
+    payloads: dict[str, dict[str, Any]] = {}
+    errors: dict[str, str] = {}
+    workers = max(1, min(len(jobs), os.cpu_count() or 1))
+    with span("research.locales", locales=len(jobs), workers=workers):
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_locale_worker, initargs=(KEYWORDS, FUN_FEED_BOOST)
+        ) as pool:
+            futures = {
+                code: pool.submit(select_payload, locale_list, max_items, locale_missing, locale)
+                for code, (locale, locale_list, locale_missing) in jobs.items()
+                if locale_list
+            }
+            for code, (_, locale_list, _) in jobs.items():
+                if not locale_list:
+                    errors[code] = "no news items were fetched"
+                    continue
+                try:
+                    payloads[code] = futures[code].result()
+                except Exception as exc:
+                    errors[code] = f"{type(exc).__name__}: {exc}"
+
+    entries = []
+    for locale in LOCALES:
+        payload = payloads.get(locale.code)
+        entry: dict[str, Any] = {"locale": locale.code}
+        if payload is None:
+            entry["error"] = errors[locale.code]
+            print(f"warning: locale {locale.code}: {entry['error']}", file=sys.stderr)
+        else:
+            fact_path = out_dir / locale.code / "fact.json"
+            write_json_atomic(fact_path, payload)
+            entry.update(
+                fact=str(fact_path),
+                headline_count=payload["headline_count"],
+                themes=payload["themes"],
+                missing_feeds=len(payload["missing_feeds"]),
+            )
+        entries.append(entry)
+
+    manifest = {
+        "mode": "news-digest",
+        "as_of_utc": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "fetched_items": len(items),
+        "feeds": len(FEED_REGISTRY),
+        "locales": entries,
+    }
+    write_json_atomic(out_dir / "manifest.json", manifest)
+    if not payloads:
+        raise SystemExit("No news items were fetched.")
+    return manifest
+
+
+def record_printed(store: HeadlineStore, payload: dict[str, Any]) -> None:
+    """Count a digest's headlines as printed; call only once the print has gone through."""
+    keys = [normalize_key(item["title"]) for item in payload.get("headlines", [])]
+    store.record_prints(keys, run_id=str(payload.get("as_of_utc", "")))
+
+
+def effective_max_items(requested: int) -> int:
+    return max(5, min(requested, 25))
+
+
+def watch_state_path(out_path: Path) -> Path:
+    """Where a watcher writing ``out_path`` reports its polls: always in WATCH_DIR, so runners find it."""
+    if out_path.resolve() == (WATCH_DIR / "latest.json").resolve():
+        return WATCH_DIR / "watch-state.json"
+    return WATCH_DIR / f"watch-state-{hashlib.sha1(str(out_path.resolve()).encode()).hexdigest()[:12]}.json"
+
+
+def digest_signature(payload: dict[str, Any]) -> tuple[Any, ...]:
+    return (
+        tuple(normalize_key(item["title"]) for item in payload["headlines"]),
+        tuple(payload["themes"]),
+    )
+
+
+def watch(args: argparse.Namespace, store: HeadlineStore | None) -> int:
+    """Poll feeds forever, rewriting the digest only when its selection or themes change.
+
+    The watch state (see ``watch_state_path``) is refreshed after every poll
+    with the digest path and headline count, so readers can tell a live
+    watcher from a stale file and skip one built with other settings.
+    """
+    out_path = Path(args.out) if args.out else WATCH_DIR / "latest.json"
+    state_path = watch_state_path(out_path)
+    last_signature: tuple[Any, ...] | None = None
+    last_change_utc: str | None = None
+    if out_path.exists():
+        try:
+            last_signature = digest_signature(json.loads(out_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, KeyError):
+            last_signature = None
+
+    print(f"watching {len(FEED_REGISTRY)} feeds every {args.interval:g}s -> {out_path}", file=sys.stderr)
+    while True:
+        started = time.monotonic()
+        try:
+            with span("research.watch_poll"):
+                payload = run_digest(args, store)
+        except (Exception, SystemExit) as exc:
+            print(f"warning: digest poll failed: {exc}", file=sys.stderr)
+        else:
+            signature = digest_signature(payload)
+            if signature != last_signature:
+                write_json_atomic(out_path, payload)
+                last_signature = signature
+                last_change_utc = payload["as_of_utc"]
+                print(f"digest updated: {', '.join(payload['themes'])}", file=sys.stderr)
+            write_json_atomic(
+                state_path,
+                {
+                    "pid": os.getpid(),
+                    "digest": str(out_path.resolve()),
+                    "max_items": effective_max_items(args.max_items),
+                    "interval_sec": args.interval,
+                    "last_poll_utc": dt.datetime.now(dt.timezone.utc).isoformat(),
+                    "last_change_utc": last_change_utc,
+                },
+            )
+
+        try:
+            time.sleep(max(1.0, args.interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            return 0
+
+
+def configure(args: argparse.Namespace) -> None:
+    global HTTP_CACHE, KEYWORDS, FEED_REGISTRY, FUN_FEED_BOOST, LOCALES, LOCALE_FEEDS
+
+    HTTP_CACHE = cache_from_args(args)
+    if args.feeds:
+        try:
+            FEED_REGISTRY = load_registry(args.feeds)
+        except (OSError, ValueError) as exc:
+            raise SystemExit(f"Cannot load feed registry {args.feeds}: {exc}") from exc
+        FUN_FEED_BOOST = {spec.name: spec.weight for spec in FEED_REGISTRY}
+    if args.locales:
+        try:
+            LOCALES = parse_locales(args.locales)
+        except ValueError as exc:
+            raise SystemExit(f"Invalid --locales: {exc}") from exc
+        FEED_REGISTRY, LOCALE_FEEDS = localize_registry(FEED_REGISTRY, LOCALES)
+        FUN_FEED_BOOST = {spec.name: spec.weight for spec in FEED_REGISTRY}
+    KEYWORDS = build_matcher(load_keyword_file(args.keywords_file)) if args.keywords_file else build_matcher()
+
+
+def open_store(args: argparse.Namespace) -> HeadlineStore | None:
+    return None if args.no_store else HeadlineStore(args.store)
+
+
+def digest_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    """One-shot digest as the CLI would produce it; also used in-process by the orchestrator."""
+    configure(args)
+    store = open_store(args)
+    try:
+        with span("research.news_digest"), profiled("research.news_digest"):
+            return run_digest(args, store)
+    finally:
+        if store is not None:
+            store.close()
+
+
+def main() -> int:
+    args = parse_args()
 
+    if args.out_dir:
+        if args.watch or args.record_printed:
+            raise SystemExit("--out-dir cannot be combined with --watch or --record-printed")
+        configure(args)
+        store = open_store(args)
+        try:
+            with span("research.news_digest", locales=len(LOCALES)), profiled("research.news_digest"):
+                manifest = run_locales(args, store, Path(args.out_dir))
+        finally:
+            if store is not None:
+                store.close()
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+        return 0
+
+    if args.record_printed or args.watch:
+        configure(args)
+        store = open_store(args)
+        try:
+            if args.record_printed:
+                if store is None:
+                    raise SystemExit("--record-printed needs the headline store")
+                record_printed(store, json.loads(Path(args.record_printed).read_text(encoding="utf-8")))
+                return 0
+            try:
+                return watch(args, store)
+            except KeyboardInterrupt:
+                return 0
+        finally:
+            if store is not None:
+                store.close()
+
+    payload = digest_from_args(args)
     output = json.dumps(payload, indent=2, ensure_ascii=False)
     if args.out:
-        out_path = Path(args.out)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(output + "\n", encoding="utf-8")
+        write_json_atomic(Path(args.out), payload)
 
     print(output)
     return 0
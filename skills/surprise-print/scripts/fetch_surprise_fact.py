@@ -8,14 +8,23 @@ import datetime as dt
 import json
 import random
 import re
+import subprocess
 import sys
 import urllib.error
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
+from http_cache import HTTPCache, add_cache_arguments, cache_from_args
+from onthisday_index import DEFAULT_INDEX_PATH, DEFAULT_REFRESH_AGE_DAYS, OnThisDayIndex
+from run_trace import profiled, span
+from summary_pool import DEFAULT_POOL_PATH, DEFAULT_POOL_TARGET, LOW_WATER, SummaryPool
+
 ON_THIS_DAY_URL = "https://en.wikipedia.org/api/rest_v1/feed/onthisday/events/{month}/{day}"
 RANDOM_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/random/summary"
+PREFETCH_WORKERS = 8
+MIN_ONE_LINER_CHARS = 25
+REFILL_MAX_ROUNDS = 4
 
 FALLBACK_FACTS = [
     {
@@ -42,16 +51,22 @@ FALLBACK_FACTS = [
 ]
 
 
-def fetch_json(url: str) -> dict[str, Any]:
-    req = urllib.request.Request(
+HTTP_CACHE = HTTPCache()
+
+
+def fetch_json(url: str, conditional: bool = True) -> dict[str, Any]:
+    result = HTTP_CACHE.fetch(
         url,
         headers={
             "User-Agent": "Codex-Surprise-Print/1.0 (research + art workflow)",
             "Accept": "application/json",
         },
+        timeout=20,
+        conditional=conditional,
     )
-    with urllib.request.urlopen(req, timeout=20) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    if result.origin == "stale":
+        print(f"warning: serving cached copy of {url} ({result.age_sec / 60:.0f} min old)", file=sys.stderr)
+    return json.loads(result.body.decode("utf-8"))
 
 
 def clean_text(value: str) -> str:
@@ -68,8 +83,7 @@ def build_prompt_from_fact(fact: str) -> str:
     )
 
 
-def pick_on_this_day(month: int, day: int, seed: int | None) -> dict[str, Any]:
-    payload = fetch_json(ON_THIS_DAY_URL.format(month=month, day=day))
+def on_this_day_candidates(payload: dict[str, Any]) -> list[dict[str, Any]]:
     events: list[dict[str, Any]] = payload.get("events", [])
     candidates: list[dict[str, Any]] = []
 
@@ -101,23 +115,101 @@ def pick_on_this_day(month: int, day: int, seed: int | None) -> dict[str, Any]:
                 "prompt": build_prompt_from_fact(fact),
             }
         )
+    return candidates
+
 
+def fetch_day_candidates(month: int, day: int) -> list[dict[str, Any]]:
+    return on_this_day_candidates(fetch_json(ON_THIS_DAY_URL.format(month=month, day=day)))
+
+
+def choose_on_this_day(candidates: list[dict[str, Any]], month: int, day: int, seed: int | None) -> dict[str, Any]:
     if not candidates:
         raise RuntimeError("No viable on-this-day events returned")
-
     rng = random.Random(seed if seed is not None else month * 100 + day)
-    return rng.choice(candidates)
+    return dict(rng.choice(candidates))
 
 
-def pick_random_summary(seed: int | None) -> dict[str, Any]:
-    payload = fetch_json(RANDOM_SUMMARY_URL)
+def pick_on_this_day(month: int, day: int, seed: int | None) -> dict[str, Any]:
+    return choose_on_this_day(fetch_day_candidates(month, day), month, day, seed)
+
+
+def pick_on_this_day_indexed(
+    month: int,
+    day: int,
+    seed: int | None,
+    index_path: Path,
+    refresh_age_days: float = DEFAULT_REFRESH_AGE_DAYS,
+) -> dict[str, Any]:
+    """Pick from the local index, falling back to (and filling it from) the live feed."""
+    with OnThisDayIndex(index_path) as index:
+        picked = index.pick(month, day, seed)
+        if picked is not None:
+            if index.stale_days(refresh_age_days, include_missing=False) and index.claim_refresh():
+                start_background_refresh(index_path, refresh_age_days)
+            return picked
+
+        candidates = fetch_day_candidates(month, day)
+        index.store_day(month, day, candidates)
+        return choose_on_this_day(candidates, month, day, seed)
+
+
+def spawn_detached(*args: str) -> None:
+    """Run this script again with ``args`` in a detached process so this run is not delayed."""
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), *args],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as exc:
+        print(f"warning: could not start background {args[0]}: {exc}", file=sys.stderr)
+
+
+def start_background_refresh(index_path: Path, refresh_age_days: float) -> None:
+    spawn_detached("--prefetch", "--index", str(index_path), "--refresh-age-days", str(refresh_age_days), "--stale-only")
+
+
+def prefetch_index(
+    index_path: Path,
+    refresh_age_days: float,
+    workers: int = PREFETCH_WORKERS,
+    include_missing: bool = True,
+) -> dict[str, Any]:
+    """Fetch every missing or stale day into the index; returns a small report."""
+    global HTTP_CACHE
+
+    # 366 full payloads would flush the feed cache; the index is the cache here.
+    HTTP_CACHE = HTTPCache(enabled=False)
+    failed: dict[str, str] = {}
+    with OnThisDayIndex(index_path) as index:
+        todo = index.stale_days(refresh_age_days, include_missing=include_missing)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(fetch_day_candidates, month, day): (month, day) for month, day in todo}
+            for future in as_completed(futures):
+                month, day = futures[future]
+                try:
+                    index.store_day(month, day, future.result())
+                except (urllib.error.URLError, TimeoutError, ValueError, RuntimeError) as exc:
+                    failed[f"{month:02d}-{day:02d}"] = str(exc)
+        report = {"fetched": len(todo) - len(failed), "failed": failed, **index.stats()}
+    return report
+
+
+def summary_candidate(payload: dict[str, Any]) -> dict[str, Any] | None:
+    """Turn a page summary into a fact candidate, or None if it fails the quality filters."""
     title = clean_text(str(payload.get("title", "Wikipedia")))
     extract = clean_text(str(payload.get("extract", "")))
     if len(extract) < 40:
-        raise RuntimeError("Random summary is too short")
+        return None
+    if payload.get("type") == "disambiguation" or title.startswith("List of"):
+        return None
 
     lines = re.split(r"(?<=[.!?])\s+", extract)
     one_liner = lines[0] if lines else extract
+    if len(one_liner) < MIN_ONE_LINER_CHARS:
+        return None
     fact = f"{title}: {one_liner}"
 
     source_url = ""
@@ -128,7 +220,7 @@ def pick_random_summary(seed: int | None) -> dict[str, Any]:
     if not source_url:
         source_url = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
 
-    candidate = {
+    return {
         "headline": f"Random wonder: {title}",
         "fact": fact,
         "source_title": title,
@@ -136,6 +228,8 @@ def pick_random_summary(seed: int | None) -> dict[str, Any]:
         "prompt": build_prompt_from_fact(fact),
     }
 
+
+def apply_seed_style(candidate: dict[str, Any], seed: int | None) -> dict[str, Any]:
     # Optional deterministic variation path if a seed is supplied.
     if seed is not None:
         rng = random.Random(seed)
@@ -147,45 +241,167 @@ def pick_random_summary(seed: int | None) -> dict[str, Any]:
             ]
         )
         candidate["prompt"] = f"{candidate['prompt']} {style_suffix}"
-
     return candidate
 
 
+def pick_random_summary(seed: int | None) -> dict[str, Any]:
+    # Every response differs, so only keep the last one around as a stale-on-error fallback.
+    candidate = summary_candidate(fetch_json(RANDOM_SUMMARY_URL, conditional=False))
+    if candidate is None:
+        raise RuntimeError("Random summary is too short")
+    return apply_seed_style(candidate, seed)
+
+
+def pick_random_summary_pooled(seed: int | None, pool_path: Path, pool_target: int = DEFAULT_POOL_TARGET) -> dict[str, Any]:
+    """Pop from the local pool, falling back to a live fetch when it is empty."""
+    with SummaryPool(pool_path) as pool:
+        candidate = pool.pop(seed)
+        if len(pool) < LOW_WATER and pool.claim_refill():
+            spawn_detached("--refill-pool", "--pool", str(pool_path), "--pool-target", str(pool_target))
+    if candidate is None:
+        return pick_random_summary(seed)
+    return apply_seed_style(candidate, seed)
+
+
+def fetch_summary_candidate() -> dict[str, Any] | None:
+    return summary_candidate(fetch_json(RANDOM_SUMMARY_URL, conditional=False))
+
+
+def refill_pool(pool_path: Path, target: int = DEFAULT_POOL_TARGET, workers: int = PREFETCH_WORKERS) -> dict[str, Any]:
+    """Fetch random summaries in parallel until the pool holds ``target`` valid ones."""
+    global HTTP_CACHE
+
+    # Random summaries never repeat, so caching them would only churn the cache.
+    HTTP_CACHE = HTTPCache(enabled=False)
+    fetched = rejected = errors = 0
+    with SummaryPool(pool_path) as pool, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Each round asks for the shortfall; repeated titles and rejects shrink the yield, so cap the rounds.
+        for _ in range(REFILL_MAX_ROUNDS):
+            missing = target - len(pool)
+            if missing <= 0:
+                break
+            candidates = []
+            for future in as_completed([executor.submit(fetch_summary_candidate) for _ in range(missing)]):
+                try:
+                    candidate = future.result()
+                except (urllib.error.URLError, TimeoutError, ValueError) as exc:
+                    errors += 1
+                    last_error = str(exc)
+                    continue
+                fetched += 1
+                if candidate is None:
+                    rejected += 1
+                else:
+                    candidates.append(candidate)
+            pool.add(candidates)
+            if errors and not candidates:
+                print(f"warning: refill stopped after errors: {last_error}", file=sys.stderr)
+                break
+        size = len(pool)
+    return {"fetched": fetched, "rejected": rejected, "errors": errors, "pool_size": size, "target": target}
+
+
 def fallback(seed: int | None) -> dict[str, Any]:
     rng = random.Random(seed if seed is not None else 0)
-    return rng.choice(FALLBACK_FACTS)
+    return dict(rng.choice(FALLBACK_FACTS))
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Fetch a surprise fact for the surprise-print skill")
     parser.add_argument("--mode", choices=["on-this-day", "random-summary"], default="on-this-day")
     parser.add_argument("--month", type=int, help="Month for on-this-day mode")
     parser.add_argument("--day", type=int, help="Day for on-this-day mode")
     parser.add_argument("--seed", type=int, help="Optional random seed")
     parser.add_argument("--out", help="Optional JSON output path")
-    return parser.parse_args()
+    parser.add_argument(
+        "--index",
+        default=str(DEFAULT_INDEX_PATH),
+        help="On-this-day index (default: skills/surprise-print/.cache/onthisday.sqlite)",
+    )
+    parser.add_argument("--no-index", action="store_true", help="Always fetch on-this-day events live")
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Fill the on-this-day index for all 366 days (only missing or stale days) and exit",
+    )
+    parser.add_argument(
+        "--stale-only",
+        action="store_true",
+        help="With --prefetch, only refresh days already in the index",
+    )
+    parser.add_argument("--prefetch-workers", type=int, default=PREFETCH_WORKERS, help="Parallel fetches for --prefetch")
+    parser.add_argument(
+        "--refresh-age-days",
+        type=float,
+        default=DEFAULT_REFRESH_AGE_DAYS,
+        help="Refetch index days older than this (default: 30)",
+    )
+    parser.add_argument(
+        "--pool",
+        default=str(DEFAULT_POOL_PATH),
+        help="Random summary pool (default: skills/surprise-print/.cache/summary-pool.sqlite)",
+    )
+    parser.add_argument("--no-pool", action="store_true", help="Always fetch random summaries live")
+    parser.add_argument("--refill-pool", action="store_true", help="Fill the random summary pool up to --pool-target and exit")
+    parser.add_argument(
+        "--pool-target",
+        type=int,
+        default=DEFAULT_POOL_TARGET,
+        help=f"Summaries to keep pooled (default: {DEFAULT_POOL_TARGET})",
+    )
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
 
 
-def main() -> int:
-    args = parse_args()
+def fact_from_args(args: argparse.Namespace) -> dict[str, Any]:
+    """Pick a fact as the CLI would; also used in-process by the orchestrator."""
+    global HTTP_CACHE
+
+    HTTP_CACHE = cache_from_args(args)
     today = dt.date.today()
     month = args.month or today.month
     day = args.day or today.day
 
-    try:
-        if args.mode == "on-this-day":
-            result = pick_on_this_day(month, day, args.seed)
-            result["mode"] = "on-this-day"
-            result["date"] = f"{month:02d}-{day:02d}"
-        else:
-            result = pick_random_summary(args.seed)
-            result["mode"] = "random-summary"
+    with span("research.fact", mode=args.mode) as attrs, profiled("research.fact"):
+        try:
+            if args.mode == "on-this-day":
+                if args.no_index:
+                    result = pick_on_this_day(month, day, args.seed)
+                else:
+                    result = pick_on_this_day_indexed(month, day, args.seed, Path(args.index), args.refresh_age_days)
+                result["mode"] = "on-this-day"
+                result["date"] = f"{month:02d}-{day:02d}"
+            else:
+                if args.no_pool:
+                    result = pick_random_summary(args.seed)
+                else:
+                    result = pick_random_summary_pooled(args.seed, Path(args.pool), args.pool_target)
+                result["mode"] = "random-summary"
+                result["date"] = today.isoformat()
+        except (urllib.error.URLError, TimeoutError, RuntimeError) as exc:
+            result = fallback(args.seed)
+            result["mode"] = "fallback"
             result["date"] = today.isoformat()
-    except (urllib.error.URLError, TimeoutError, RuntimeError) as exc:
-        result = fallback(args.seed)
-        result["mode"] = "fallback"
-        result["date"] = today.isoformat()
-        result["warning"] = f"Research fallback used: {exc}"
+            result["warning"] = f"Research fallback used: {exc}"
+        attrs["result_mode"] = result["mode"]
+    return result
+
+
+def main() -> int:
+    args = parse_args()
+    if args.prefetch:
+        report = prefetch_index(
+            Path(args.index), args.refresh_age_days, args.prefetch_workers, include_missing=not args.stale_only
+        )
+        print(json.dumps(report, indent=2))
+        return 1 if report["failed"] and not report["fetched"] else 0
+
+    if args.refill_pool:
+        report = refill_pool(Path(args.pool), args.pool_target, args.prefetch_workers)
+        print(json.dumps(report, indent=2))
+        return 0 if report["pool_size"] else 1
+
+    result = fact_from_args(args)
 
     payload = json.dumps(result, indent=2, ensure_ascii=False)
     if args.out:
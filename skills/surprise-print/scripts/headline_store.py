@@ -0,0 +1,133 @@
+"""Local SQLite store of fetched headlines and the ones already used in prints.
+
+Each digest run ingests only headlines it has not seen before (keyed by the
+normalized title, with links also checked), then selects from the indexed
+recent window instead of the raw fetch. Both checks are per edition: a story
+that runs in several Google News editions is kept once for each, so every
+locale's digest can select it. Headlines used in a print within the last few
+days are flagged so selection can push repeats down.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable
+
+from http_cache import DEFAULT_CACHE_ROOT
+from news_items import NewsItem
+
+DEFAULT_STORE_PATH = DEFAULT_CACHE_ROOT / "headlines.sqlite"
+DEFAULT_REPEAT_WINDOW_DAYS = 3.0
+# Headlines older than this are dropped on ingest; selection never looks that far back.
+RETENTION_DAYS = 14.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS headlines (
+    key TEXT NOT NULL,
+    edition TEXT NOT NULL DEFAULT '',
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    source TEXT NOT NULL,
+    feed TEXT NOT NULL,
+    published_ts REAL NOT NULL,
+    first_seen_ts REAL NOT NULL,
+    PRIMARY KEY (key, edition)
+);
+CREATE INDEX IF NOT EXISTS idx_headlines_published ON headlines(published_ts);
+CREATE INDEX IF NOT EXISTS idx_headlines_feed ON headlines(feed);
+CREATE INDEX IF NOT EXISTS idx_headlines_source ON headlines(source);
+CREATE INDEX IF NOT EXISTS idx_headlines_link ON headlines(link);
+
+CREATE TABLE IF NOT EXISTS prints (
+    key TEXT NOT NULL,
+    printed_ts REAL NOT NULL,
+    run_id TEXT NOT NULL,
+    PRIMARY KEY (key, run_id)
+);
+CREATE INDEX IF NOT EXISTS idx_prints_printed ON prints(printed_ts);
+"""
+
+
+class HeadlineStore:
+    def __init__(self, path: Path | str = DEFAULT_STORE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(headlines)")}
+        if columns and "edition" not in columns:
+            # Stores from before editions: the headlines are only a feed cache, so rebuild them.
+            self.conn.execute("DROP TABLE headlines")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "HeadlineStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def ingest(self, items: Iterable[NewsItem], keys: Iterable[str], editions: Iterable[str] | None = None) -> int:
+        """Insert items not seen before in their edition; returns how many were new.
+
+        ``keys`` are the normalized titles and ``editions`` the locale codes
+        (``""`` for feeds every locale shares) matching ``items`` one-to-one.
+        """
+        items = list(items)
+        editions = [""] * len(items) if editions is None else editions
+        now = time.time()
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO headlines (key, edition, link, title, source, feed, published_ts, first_seen_ts)
+                SELECT ?, ?, ?, ?, ?, ?, ?, ?
+                WHERE ? = '' OR NOT EXISTS (SELECT 1 FROM headlines WHERE link = ? AND edition = ?)
+                """,
+                (
+                    (
+                        key, edition, item.link, item.title, item.source, item.feed, item.published_ts, now,
+                        item.link, item.link, edition,
+                    )
+                    for item, key, edition in zip(items, keys, editions)
+                    if key
+                ),
+            )
+            new_rows = self.conn.total_changes - before
+            cutoff = now - RETENTION_DAYS * 86400
+            self.conn.execute("DELETE FROM headlines WHERE published_ts < ?", (cutoff,))
+            self.conn.execute("DELETE FROM prints WHERE printed_ts < ?", (cutoff,))
+        return new_rows
+
+    def recent(self, since_ts: float, repeat_window_days: float = DEFAULT_REPEAT_WINDOW_DAYS) -> list[NewsItem]:
+        """Headlines published since ``since_ts``, flagged if printed within the repeat window."""
+        printed_since = time.time() - repeat_window_days * 86400
+        rows = self.conn.execute(
+            """
+            SELECT h.title, h.source, h.link, h.feed, h.published_ts,
+                   EXISTS (
+                       SELECT 1 FROM prints p WHERE p.key = h.key AND p.printed_ts >= ?
+                   ) AS printed_recently
+            FROM headlines h
+            WHERE h.published_ts >= ?
+            ORDER BY h.published_ts DESC
+            """,
+            (printed_since, since_ts),
+        )
+        return [
+            NewsItem(title, source, link, published_ts, feed, bool(printed_recently))
+            for title, source, link, feed, published_ts, printed_recently in rows
+        ]
+
+    def record_prints(self, keys: Iterable[str], run_id: str) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO prints (key, printed_ts, run_id) VALUES (?, ?, ?)",
+                ((key, now, run_id) for key in keys if key),
+            )
@@ -0,0 +1,272 @@
+"""On-disk HTTP response cache shared by the surprise-print research scripts.
+
+Responses are keyed by URL. Each entry keeps the body plus its ETag and
+Last-Modified validators, so repeat fetches go out as conditional GETs and a
+304 reuses the stored body. When the network fails, the last good copy is
+served as long as it was validated within ``max_stale`` seconds. Requests go
+through the shared keep-alive transport in ``http_transport``; bodies are
+cached decoded.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+from pathlib import Path
+from typing import IO, Any, Iterator, NamedTuple
+
+from http_transport import TRANSPORT, Transport
+
+SKILL_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_ROOT = Path(os.environ.get("SURPRISE_PRINT_CACHE_DIR") or SKILL_ROOT / ".cache")
+DEFAULT_MAX_STALE_SEC = 12 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# A caller that stops reading early still gets the body cached if no more
+# than this much is left to read; larger remainders are abandoned.
+DEFAULT_DRAIN_BYTES = 512 * 1024
+
+
+class CacheResult(NamedTuple):
+    body: bytes
+    # "network" (fresh 200), "revalidated" (304), "fresh" (within max_age, no request)
+    # or "stale" (network failed, cached copy served).
+    origin: str
+    age_sec: float
+
+
+class CacheStream(NamedTuple):
+    stream: IO[bytes]
+    origin: str
+    age_sec: float
+
+
+class _RecordingReader:
+    """Pass-through reader that spools everything it reads to a temp file."""
+
+    def __init__(self, source: IO[bytes], spool: IO[bytes] | None) -> None:
+        self._source = source
+        self._spool = spool
+        self.complete = False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._source.read(size)
+        if self._spool is not None:
+            self._spool.write(data)
+        if not data or size < 0:
+            self.complete = True
+        return data
+
+
+class HTTPCache:
+    def __init__(
+        self,
+        directory: Path | str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_stale: float = DEFAULT_MAX_STALE_SEC,
+        enabled: bool = True,
+        transport: Transport | None = None,
+    ) -> None:
+        self.directory = Path(directory) if directory else DEFAULT_CACHE_ROOT / "http"
+        self.transport = transport or TRANSPORT
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.enabled = enabled
+        self._evict_lock = threading.Lock()
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def _load(self, url: str) -> tuple[dict[str, Any], Path] | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            size = body_path.stat().st_size
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("size") != size:
+            return None
+        return meta, body_path
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _store(
+        self,
+        url: str,
+        headers: Any,
+        spooled: Path | None = None,
+        previous: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a response; ``spooled`` is a temp file holding a new body to move into place."""
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag") or (previous or {}).get("etag"),
+            "last_modified": headers.get("Last-Modified") or (previous or {}).get("last_modified"),
+            "validated_at": time.time(),
+            "size": spooled.stat().st_size if spooled else (previous or {}).get("size", 0),
+        }
+        if spooled:
+            os.replace(spooled, body_path)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        if spooled:
+            self.evict()
+
+    @contextlib.contextmanager
+    def open(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = 20,
+        conditional: bool = True,
+        drain_limit: int = DEFAULT_DRAIN_BYTES,
+        max_age: float = 0.0,
+    ) -> Iterator[CacheStream]:
+        """GET ``url`` through the cache and yield a readable body stream.
+
+        A network body is spooled to disk as it is read and only committed to
+        the cache once complete. Callers may stop early: up to ``drain_limit``
+        unread bytes are drained so the body can still be cached, anything
+        longer is dropped.
+        ``conditional=False`` skips validators (for endpoints such as random
+        summaries where every response differs) but still records the body
+        as a stale-on-error fallback.
+        A cached body validated within ``max_age`` seconds is served as
+        "fresh" without any request.
+        """
+        request_headers = dict(headers or {})
+        cached = self._load(url) if self.enabled else None
+        if cached and max_age > 0:
+            age = time.time() - float(cached[0].get("validated_at", 0))
+            if 0 <= age <= max_age:
+                with cached[1].open("rb") as body:
+                    yield CacheStream(body, "fresh", age)
+                return
+        if cached and conditional:
+            meta = cached[0]
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        fallback: tuple[str, float] | None = None
+        try:
+            resp = self.transport.open(url, headers=request_headers, timeout=timeout)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 304 and cached and conditional:
+                self._store(url, exc.headers, previous=cached[0])
+                fallback = ("revalidated", 0.0)
+            elif exc.code < 500 and exc.code != 429:
+                raise
+            else:
+                fallback = ("stale", self._stale_age_or_raise(cached, exc))
+        except (urllib.error.URLError, TimeoutError, OSError) as exc:
+            fallback = ("stale", self._stale_age_or_raise(cached, exc))
+
+        if fallback is not None:
+            assert cached is not None
+            with cached[1].open("rb") as body:
+                yield CacheStream(body, *fallback)
+            return
+
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(resp)
+            spool_path: Path | None = None
+            spool: IO[bytes] | None = None
+            if self.enabled:
+                try:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+                    spool_path = Path(tmp)
+                    spool = stack.enter_context(os.fdopen(fd, "wb"))
+                    stack.callback(spool_path.unlink, missing_ok=True)
+                except OSError:
+                    spool_path = spool = None
+            reader = _RecordingReader(resp, spool)
+            yield CacheStream(reader, "network", 0.0)  # type: ignore[arg-type]
+            drained = 0
+            while spool is not None and not reader.complete and drained <= drain_limit:
+                drained += len(reader.read(64 * 1024))
+            if reader.complete and spool is not None and spool_path is not None:
+                spool.close()
+                try:
+                    self._store(url, resp.headers, spooled=spool_path)
+                except OSError:
+                    pass
+
+    def fetch(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = 20,
+        conditional: bool = True,
+    ) -> CacheResult:
+        """Like :meth:`open` but reads the whole body."""
+        with self.open(url, headers=headers, timeout=timeout, conditional=conditional) as opened:
+            body = opened.stream.read()
+        return CacheResult(body, opened.origin, opened.age_sec)
+
+    def age(self, url: str) -> float | None:
+        """Seconds since ``url`` was last fetched or revalidated, or None if it is not cached."""
+        cached = self._load(url) if self.enabled else None
+        if cached is None:
+            return None
+        return max(0.0, time.time() - float(cached[0].get("validated_at", 0)))
+
+    def _stale_age_or_raise(self, cached: tuple[dict[str, Any], Path] | None, exc: Exception) -> float:
+        if cached:
+            age = max(0.0, time.time() - float(cached[0].get("validated_at", 0)))
+            if age <= self.max_stale:
+                return age
+        raise exc
+
+    def evict(self) -> None:
+        """Drop least recently validated entries until the cache fits ``max_bytes``."""
+        with self._evict_lock:
+            entries: list[tuple[float, int, Path, Path]] = []
+            total = 0
+            for meta_path in self.directory.glob("*.json"):
+                body_path = meta_path.with_suffix(".body")
+                try:
+                    size = body_path.stat().st_size
+                    validated = float(json.loads(meta_path.read_text(encoding="utf-8")).get("validated_at", 0))
+                except (OSError, ValueError):
+                    continue
+                entries.append((validated, size, meta_path, body_path))
+                total += size
+
+            entries.sort()
+            while entries and total > self.max_bytes:
+                _, size, meta_path, body_path = entries.pop(0)
+                meta_path.unlink(missing_ok=True)
+                body_path.unlink(missing_ok=True)
+                total -= size
+
+
+def add_cache_arguments(parser: Any) -> None:
+    parser.add_argument("--cache-dir", help=f"HTTP cache directory (default: {DEFAULT_CACHE_ROOT / 'http'})")
+    parser.add_argument(
+        "--max-stale",
+        type=float,
+        default=DEFAULT_MAX_STALE_SEC,
+        help=f"Serve cached responses up to this many seconds old when the network fails (default: {DEFAULT_MAX_STALE_SEC})",
+    )
+    parser.add_argument("--no-http-cache", action="store_true", help="Bypass the on-disk HTTP cache")
+
+
+def cache_from_args(args: Any) -> HTTPCache:
+    return HTTPCache(directory=args.cache_dir, max_stale=args.max_stale, enabled=not args.no_http_cache)
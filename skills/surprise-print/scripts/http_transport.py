@@ -0,0 +1,275 @@
+"""Keep-alive, compressed HTTP transport shared by the research fetches.
+
+Connections are pooled per (scheme, host, port), so the seven Google News
+feeds reuse a handful of TLS sessions instead of handshaking for each one.
+Requests advertise ``Accept-Encoding: gzip, deflate`` and bodies are
+decompressed incrementally as callers read. Transient failures (connection
+errors, 429/502/503/504) are retried with bounded exponential backoff, all
+within the one ``timeout`` given to ``open``. Each attempt gets only the time
+that remains, a backoff that would overrun it ends the retries, and a
+timed-out attempt is not retried. Errors are raised as ``urllib.error``
+exceptions so callers keep their existing handling.
+
+``TRANSPORT.stats()`` reports bytes on the wire next to decoded bytes.
+"""
+
+from __future__ import annotations
+
+import http.client
+import io
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from typing import Any
+
+MAX_IDLE_PER_HOST = 8
+MAX_REDIRECTS = 5
+RETRIES = 2
+BACKOFF_BASE_SEC = 0.25
+BACKOFF_MAX_SEC = 2.0
+RETRY_STATUSES = {429, 502, 503, 504}
+READ_CHUNK_BYTES = 16 * 1024
+
+
+class _Decoder:
+    def __init__(self, encoding: str) -> None:
+        encoding = encoding.strip().lower()
+        if encoding in ("gzip", "x-gzip"):
+            self._z: Any = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            self._z = zlib.decompressobj(zlib.MAX_WBITS)
+        else:
+            self._z = None
+        self._deflate = encoding == "deflate"
+        self._started = False
+
+    def decode(self, data: bytes) -> bytes:
+        if self._z is None:
+            return data
+        if self._deflate and not self._started and data:
+            self._started = True
+            try:
+                return self._z.decompress(data)
+            except zlib.error:
+                # Some servers send raw deflate without the zlib header.
+                self._z = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._z.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush() if self._z is not None else b""
+
+
+class Response(io.RawIOBase):
+    """Decoded response body; returns its connection to the pool once fully read."""
+
+    def __init__(self, transport: "Transport", key: tuple[str, str, int], conn: Any, resp: http.client.HTTPResponse, url: str) -> None:
+        super().__init__()
+        self._transport = transport
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.url = url
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.headers
+        self._decoder = _Decoder(resp.headers.get("Content-Encoding", ""))
+        self._buffer = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> None:
+        try:
+            raw = self._resp.read(READ_CHUNK_BYTES)
+        except (http.client.HTTPException, OSError) as exc:
+            self._release(reuse=False)
+            raise urllib.error.URLError(exc) from exc
+        if raw:
+            decoded = self._decoder.decode(raw)
+            self._transport._count(len(raw), len(decoded))
+            self._buffer += decoded
+        else:
+            tail = self._decoder.flush()
+            self._transport._count(0, len(tail))
+            self._buffer += tail
+            self._eof = True
+            self._release(reuse=not self._resp.will_close)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            while not self._eof:
+                self._fill()
+            data, self._buffer = self._buffer, b""
+            return data
+        while len(self._buffer) < size and not self._eof:
+            self._fill()
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def _release(self, reuse: bool) -> None:
+        if self._conn is not None:
+            self._transport._release(self._key, self._conn, reuse)
+            self._conn = None
+
+    def close(self) -> None:
+        # An unread remainder would corrupt the next request on this connection.
+        self._release(reuse=self._eof and not self._resp.will_close)
+        super().close()
+
+
+class Transport:
+    def __init__(self, max_idle_per_host: int = MAX_IDLE_PER_HOST, retries: int = RETRIES) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.retries = retries
+        self._idle: dict[tuple[str, str, int], list[Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "connections": 0, "reused": 0, "retries": 0, "wire_bytes": 0, "decoded_bytes": 0}
+        self._ssl_context = ssl.create_default_context()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, wire: int, decoded: int) -> None:
+        with self._lock:
+            self._stats["wire_bytes"] += wire
+            self._stats["decoded_bytes"] += decoded
+
+    def _acquire(self, key: tuple[str, str, int], timeout: float) -> tuple[Any, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                self._stats["reused"] += 1
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.timeout = timeout
+                return conn, True
+            self._stats["connections"] += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, key: tuple[str, str, int], conn: Any, reuse: bool) -> None:
+        if reuse:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+    def open(self, url: str, headers: dict[str, str] | None = None, timeout: float = 20) -> Any:
+        """GET ``url`` and return a readable response with ``status`` and ``headers``.
+
+        Raises ``urllib.error.HTTPError`` for 304 and >= 400 like ``urlopen``
+        and ``urllib.error.URLError`` for transport failures.
+        """
+        request_headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive", **(headers or {})}
+        scheme = urllib.parse.urlsplit(url).scheme
+        if urllib.request.getproxies().get(scheme) and not urllib.request.proxy_bypass(urllib.parse.urlsplit(url).hostname or ""):
+            # Proxied setups keep urllib's proxy handling; no pooling there.
+            request_headers.pop("Accept-Encoding")
+            return urllib.request.urlopen(urllib.request.Request(url, headers=request_headers), timeout=timeout)
+
+        # One budget for the whole call: redirects, retries and backoff all come out of it.
+        deadline = time.monotonic() + timeout
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._open_with_retries(url, request_headers, deadline)
+            if response.status in (301, 302, 303, 307, 308) and response.headers.get("Location"):
+                location = urllib.parse.urljoin(url, response.headers["Location"])
+                response.read()
+                response.close()
+                url = location
+                continue
+            if response.status == 304 or response.status >= 400:
+                body = response.read()
+                response.close()
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+            return response
+        raise urllib.error.URLError(f"too many redirects: {url}")
+
+    def _open_with_retries(self, url: str, headers: dict[str, str], deadline: float) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise urllib.error.URLError(f"unsupported scheme: {scheme}")
+        key = (scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+            conn, reused = self._acquire(key, remaining)
+            with self._lock:
+                self._stats["requests"] += 1
+            try:
+                conn.request("GET", path, headers={"Host": parts.netloc, **headers})
+                resp = conn.getresponse()
+            except (http.client.HTTPException, OSError) as exc:
+                conn.close()
+                if reused and isinstance(exc, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)):
+                    # The server closed an idle keep-alive connection; retry at once on a fresh one.
+                    continue
+                if isinstance(exc, (socket.timeout, TimeoutError)):
+                    # A hung server would just hang again; keep the caller's timeout a hard limit.
+                    raise
+                delay = self._delay(attempt, None)
+                if attempt >= self.retries or time.monotonic() + delay >= deadline:
+                    raise urllib.error.URLError(exc) from exc
+                self._backoff(delay)
+                attempt += 1
+                continue
+
+            response = Response(self, key, conn, resp, url)
+            delay = self._delay(attempt, resp.headers.get("Retry-After"))
+            if resp.status in RETRY_STATUSES and attempt < self.retries and time.monotonic() + delay < deadline:
+                response.read()
+                response.close()
+                self._backoff(delay)
+                attempt += 1
+                continue
+            return response
+
+    @staticmethod
+    def _delay(attempt: int, retry_after: str | None) -> float:
+        delay = BACKOFF_BASE_SEC * (2**attempt)
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        return min(BACKOFF_MAX_SEC, delay)
+
+    def _backoff(self, delay: float) -> None:
+        with self._lock:
+            self._stats["retries"] += 1
+        time.sleep(delay)
+
+
+def stats_delta(before: dict[str, int], after: dict[str, int]) -> dict[str, int]:
+    return {key: after[key] - before.get(key, 0) for key in after}
+
+
+# One pool per process, shared by the feed and Wikipedia fetches.
+TRANSPORT = Transport()
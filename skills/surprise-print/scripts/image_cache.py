@@ -0,0 +1,155 @@
+"""Content-addressed cache of generated images and their print-ready files.
+
+An entry is keyed by a hash of everything sent to the image generator
+(prompt, model, size, quality, constraints, ...). It holds the generated PNG
+plus, per placement/encode setting, the 640x1024 page and the budgeted JPEG
+with its encode report. Hits are hard-linked into the run directory (copied
+if the link fails), so repeated runs in a day or seeded fact runs skip the
+image API entirely. Entries unused for ``max_age_days`` are dropped, then
+the least recently used ones until the cache fits ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from http_cache import DEFAULT_CACHE_ROOT
+
+DEFAULT_IMAGE_CACHE_DIR = DEFAULT_CACHE_ROOT / "images"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30.0
+IMAGE_NAME = "image.png"
+META_NAME = "meta.json"
+REPORT_NAME = "encode.json"
+
+
+def content_key(**fields: Any) -> str:
+    """Stable hash of the given fields; key order and JSON spacing don't matter."""
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class ImageCache:
+    def __init__(
+        self,
+        directory: Path | str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        enabled: bool = True,
+    ) -> None:
+        self.directory = Path(directory) if directory else DEFAULT_IMAGE_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.enabled = enabled
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def entry(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    @contextlib.contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Serialize work on one key within this process (batch jobs with identical requests)."""
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            yield
+
+    def restore(self, key: str, image_out: Path) -> bool:
+        """Link the cached image for ``key`` to ``image_out``; False on a miss."""
+        if not self.enabled:
+            return False
+        entry = self.entry(key)
+        cached = entry / IMAGE_NAME
+        if not cached.is_file():
+            return False
+        link_or_copy(cached, image_out)
+        with contextlib.suppress(OSError):
+            os.utime(entry)
+        return True
+
+    def store(self, key: str, image: Path, inputs: dict[str, Any]) -> None:
+        """Publish ``image`` under ``key``, replacing any previous entry."""
+        self._publish(self.entry(key), {IMAGE_NAME: image}, {META_NAME: {"key": key, "created_ts": time.time(), **inputs}})
+        self.evict()
+
+    def restore_derived(self, key: str, variant: str, outputs: dict[str, Path]) -> dict[str, Any] | None:
+        """Link the print-ready files of one ``variant`` to ``outputs``; returns the stored report."""
+        if not self.enabled:
+            return None
+        variant_dir = self.entry(key) / "derived" / variant
+        try:
+            report = json.loads((variant_dir / REPORT_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not all((variant_dir / name).is_file() for name in outputs):
+            return None
+        for name, out in outputs.items():
+            link_or_copy(variant_dir / name, out)
+        with contextlib.suppress(OSError):
+            os.utime(self.entry(key))
+        return report
+
+    def store_derived(self, key: str, variant: str, files: dict[str, Path], report: dict[str, Any]) -> None:
+        """Attach print-ready files to an existing image entry; ignored if the image is not cached."""
+        entry = self.entry(key)
+        if not (entry / IMAGE_NAME).is_file():
+            return
+        self._publish(entry / "derived" / variant, files, {REPORT_NAME: report})
+
+    def _publish(self, target: Path, files: dict[str, Path], documents: dict[str, Any]) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=".staging-"))
+        try:
+            for name, src in files.items():
+                link_or_copy(src, staging / name)
+            for name, document in documents.items():
+                (staging / name).write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+            # Publish the whole entry at once so a concurrent run never sees half of it.
+            shutil.rmtree(target, ignore_errors=True)
+            try:
+                os.replace(staging, target)
+            except OSError:
+                if not target.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def evict(self) -> None:
+        """Drop entries unused for ``max_age_days``, then least recently used ones over ``max_bytes``."""
+        entries: list[tuple[float, int, Path]] = []
+        for entry in self.directory.glob("??/*"):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                used = entry.stat().st_mtime
+                size = sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+            except OSError:
+                continue
+            entries.append((used, size, entry))
+
+        cutoff = time.time() - self.max_age_days * 86400
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for used, size, entry in entries:
+            if used >= cutoff and total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
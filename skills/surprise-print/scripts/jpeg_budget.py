@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Encode the 640x1024 print page as a JPEG under a byte or send-time budget.
+
+BLE transfer time is one packet per ``--pace`` ms: a 10-byte header packet
+plus one packet per 200 payload bytes (`HiPrintPacketizer`). This encoder
+binary-searches JPEG quality for both 4:4:4 and 4:2:0 chroma subsampling with
+optimized Huffman tables, and keeps the highest-quality candidate that fits.
+`printdock print --raw-jpeg` then sends the file as-is.
+
+    ./skills/surprise-print/scripts/jpeg_budget.py surprise_print_ready.png out.jpg --max-send-sec 6 --pace 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import sys
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image
+
+from print_prep import TARGET_HEIGHT, TARGET_WIDTH
+
+PACKET_DATA_BYTES = 200
+HEADER_PACKETS = 1
+DEFAULT_MAX_BYTES = 160 * 1024
+MIN_QUALITY = 60
+MAX_QUALITY = 95
+# Pillow subsampling values: 0 = 4:4:4, 2 = 4:2:0.
+SUBSAMPLING = {0: "4:4:4", 2: "4:2:0"}
+
+
+class EncodeReport(NamedTuple):
+    bytes: int
+    quality: int
+    subsampling: str
+    packets: int
+    send_sec: float
+    pace_ms: int
+    budget_bytes: int
+    within_budget: bool
+
+
+def predicted_packets(size: int, packet_data_bytes: int = PACKET_DATA_BYTES) -> int:
+    return HEADER_PACKETS + math.ceil(size / packet_data_bytes)
+
+
+def predicted_send_sec(size: int, pace_ms: int) -> float:
+    return predicted_packets(size) * max(0, pace_ms) / 1000.0
+
+
+def budget_from_send_time(max_send_sec: float, pace_ms: int) -> int:
+    """Largest payload whose packets fit in ``max_send_sec`` at ``pace_ms``."""
+    if pace_ms <= 0:
+        return sys.maxsize
+    packets = int(max_send_sec * 1000 // pace_ms) - HEADER_PACKETS
+    return max(0, packets) * PACKET_DATA_BYTES
+
+
+def _encode(image: Image.Image, quality: int, subsampling: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, subsampling=subsampling, optimize=True)
+    return buffer.getvalue()
+
+
+def _best_for_subsampling(image: Image.Image, budget: int, subsampling: int) -> tuple[int, bytes] | None:
+    """Highest quality in [MIN_QUALITY, MAX_QUALITY] that fits, or None."""
+    low, high = MIN_QUALITY, MAX_QUALITY
+    best: tuple[int, bytes] | None = None
+    while low <= high:
+        quality = (low + high) // 2
+        data = _encode(image, quality, subsampling)
+        if len(data) <= budget:
+            best = (quality, data)
+            low = quality + 1
+        else:
+            high = quality - 1
+    return best
+
+
+def encode(image: Image.Image, budget: int = DEFAULT_MAX_BYTES, pace_ms: int = 12) -> tuple[bytes, EncodeReport]:
+    """Return JPEG bytes for ``image`` and a report; falls back to the smallest encode if nothing fits."""
+    if image.size != (TARGET_WIDTH, TARGET_HEIGHT):
+        raise ValueError(f"Expected a {TARGET_WIDTH}x{TARGET_HEIGHT} page, got {image.size[0]}x{image.size[1]}")
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    candidates = []
+    for subsampling in SUBSAMPLING:
+        found = _best_for_subsampling(image, budget, subsampling)
+        if found is not None:
+            candidates.append((found[0], -len(found[1]), subsampling, found[1]))
+
+    if candidates:
+        # Highest quality wins; at equal quality the smaller file (fewer packets).
+        quality, _, subsampling, data = max(candidates)
+    else:
+        quality, subsampling = MIN_QUALITY, 2
+        data = _encode(image, quality, subsampling)
+
+    report = EncodeReport(
+        bytes=len(data),
+        quality=quality,
+        subsampling=SUBSAMPLING[subsampling],
+        packets=predicted_packets(len(data)),
+        send_sec=round(predicted_send_sec(len(data), pace_ms), 3),
+        pace_ms=pace_ms,
+        budget_bytes=budget,
+        within_budget=len(data) <= budget,
+    )
+    return data, report
+
+
+def encode_file(src: Path, dst: Path, budget: int = DEFAULT_MAX_BYTES, pace_ms: int = 12) -> EncodeReport:
+    with Image.open(src) as image:
+        data, report = encode(image, budget, pace_ms)
+    dst.write_bytes(data)
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Encode a 640x1024 page as a JPEG under a transfer budget")
+    parser.add_argument("src", help="640x1024 source image (e.g. surprise_print_ready.png)")
+    parser.add_argument("dst", help="Output JPEG")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES, help="Payload budget in bytes (default: 160 KiB)")
+    parser.add_argument("--max-send-sec", type=float, help="Send-time budget; overrides --max-bytes when tighter")
+    parser.add_argument("--pace", type=int, default=12, help="BLE pace in milliseconds (default: 12)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    budget = args.max_bytes
+    if args.max_send_sec is not None:
+        budget = min(budget, budget_from_send_time(args.max_send_sec, args.pace))
+    try:
+        report = encode_file(Path(args.src), Path(args.dst), budget, args.pace)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(json.dumps(report._asdict(), indent=2))
+    return 0 if report.within_budget else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
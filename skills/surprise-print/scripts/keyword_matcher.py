@@ -0,0 +1,129 @@
+"""Single-pass, word-boundary keyword matching for headline scoring.
+
+All keyword categories are compiled into one regular expression whose
+alternations are factored through a character trie, so matching cost grows
+with headline length rather than with the number of keywords.
+
+Keyword syntax:
+- ``"space"`` matches the whole word ``space`` and its plural (``spaces``),
+  but not ``spacecraft`` or ``aerospace``. Only words ending in s, x, z, ch
+  or sh take an ``-es`` plural (``crash`` matches ``crashes``; ``war`` does
+  not match ``wares``).
+- ``"artificial intelligence"`` matches the phrase with any whitespace between words.
+- ``"diplom*"`` matches any word starting with ``diplom`` (``diplomat``, ``diplomacy``).
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict[str, Any]) -> str:
+        is_end = "" in node
+        alternatives = [
+            (r"\s+" if ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted(node.items())
+            if ch
+        ]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and not is_end:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if is_end else group
+
+    return build(trie)
+
+
+def _takes_es(word: str) -> bool:
+    return word.endswith(("s", "x", "z", "ch", "sh"))
+
+
+def _normalize_keyword(keyword: str) -> str:
+    return re.sub(r"\s+", " ", keyword.strip().lower())
+
+
+class KeywordMatcher:
+    """Match many keyword categories against text in one regex scan."""
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]) -> None:
+        self.categories: dict[str, list[str]] = {}
+        self._words: dict[str, list[str]] = {}
+        self._stems: dict[str, list[str]] = {}
+
+        for category, keywords in categories.items():
+            normalized = sorted({_normalize_keyword(kw) for kw in keywords if kw.strip()})
+            self.categories[category] = normalized
+            for keyword in normalized:
+                if keyword.endswith("*"):
+                    self._stems.setdefault(keyword[:-1], []).append(category)
+                else:
+                    self._words.setdefault(keyword, []).append(category)
+
+        branches: list[str] = []
+        plain = [word for word in self._words if not _takes_es(word)]
+        sibilant = [word for word in self._words if _takes_es(word)]
+        if plain:
+            branches.append(rf"(?P<word>{_trie_pattern(plain)})s?\b")
+        if sibilant:
+            branches.append(rf"(?P<es_word>{_trie_pattern(sibilant)})(?:es)?\b")
+        if self._stems:
+            branches.append(rf"(?P<stem>{_trie_pattern(self._stems)})\w*")
+        self.pattern = re.compile(r"\b(?:" + "|".join(branches) + ")") if branches else None
+
+    def __len__(self) -> int:
+        return len(self._words) + len(self._stems)
+
+    def match(self, text: str) -> dict[str, list[str]]:
+        """Return ``{category: [keywords hit]}`` for every category with at least one hit.
+
+        Each keyword is reported once, in order of first appearance; stems are
+        reported with their trailing ``*``.
+        """
+        hits: dict[str, list[str]] = {}
+        if self.pattern is None:
+            return hits
+
+        seen: set[str] = set()
+        for found in self.pattern.finditer(text.lower()):
+            if found.lastgroup != "stem":
+                keyword = re.sub(r"\s+", " ", found.group(found.lastgroup))
+                owners = self._words[keyword]
+            else:
+                stem = found.group("stem")
+                keyword = stem + "*"
+                owners = self._stems[re.sub(r"\s+", " ", stem)]
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            for category in owners:
+                hits.setdefault(category, []).append(keyword)
+        return hits
+
+
+def load_keyword_file(path: Path | str) -> dict[str, list[str]]:
+    """Load operator-supplied keywords from JSON.
+
+    The file maps category names to keyword lists, for example
+    ``{"fun": ["robotics"], "heavy": ["recall"], "theme:science": ["telescope*"]}``.
+    """
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError(f"Keyword file must contain a JSON object: {path}")
+    categories: dict[str, list[str]] = {}
+    for category, keywords in raw.items():
+        if not isinstance(keywords, list) or not all(isinstance(kw, str) for kw in keywords):
+            raise ValueError(f"Keywords for '{category}' must be a list of strings")
+        categories[str(category)] = keywords
+    return categories
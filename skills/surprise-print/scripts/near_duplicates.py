@@ -0,0 +1,75 @@
+"""MinHash/LSH clustering of near-duplicate headlines.
+
+The same story syndicated across feeds usually differs by a word or two
+("NASA launches Mars rover in..." vs "NASA launches Mars rover on..."). Each
+title is reduced to a MinHash signature over its words and word pairs; LSH
+banding only compares titles that share a band, so clustering runs in
+roughly linear time.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import re
+import struct
+from typing import Sequence
+
+NUM_BANDS = 8
+ROWS_PER_BAND = 4
+NUM_HASHES = NUM_BANDS * ROWS_PER_BAND
+# Estimated Jaccard similarity at or above which two titles are the same story.
+SIMILARITY_THRESHOLD = 0.5
+# Bound on members compared per LSH bucket, so a degenerate bucket stays linear.
+MAX_BUCKET_COMPARISONS = 16
+
+_EMPTY_SIGNATURE = (0xFFFFFFFF,) * NUM_HASHES
+
+
+def shingles(title: str) -> set[str]:
+    words = re.sub(r"[^a-z0-9]+", " ", title.lower()).split()
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+@functools.lru_cache(maxsize=65536)
+def _shingle_hashes(shingle: str) -> tuple[int, ...]:
+    # One extendable-output digest yields NUM_HASHES independent 32-bit hash values.
+    return struct.unpack(f"<{NUM_HASHES}I", hashlib.shake_128(shingle.encode("utf-8")).digest(4 * NUM_HASHES))
+
+
+def signature(title_shingles: set[str]) -> tuple[int, ...]:
+    if not title_shingles:
+        return _EMPTY_SIGNATURE
+    return tuple(map(min, zip(*map(_shingle_hashes, title_shingles))))
+
+
+def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def cluster_titles(titles: Sequence[str], threshold: float = SIMILARITY_THRESHOLD) -> list[int]:
+    """Return a cluster id per title; near-duplicates share the id of their earliest member."""
+    signatures = [signature(shingles(title)) for title in titles]
+    parent = list(range(len(titles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(NUM_BANDS):
+        start = band * ROWS_PER_BAND
+        buckets: dict[tuple[int, ...], list[int]] = {}
+        for idx, sig in enumerate(signatures):
+            members = buckets.setdefault(sig[start : start + ROWS_PER_BAND], [])
+            for other in members[:MAX_BUCKET_COMPARISONS]:
+                root_a, root_b = find(other), find(idx)
+                if root_a == root_b:
+                    break
+                if similarity(signatures[other], sig) >= threshold:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+                    break
+            members.append(idx)
+
+    return [find(i) for i in range(len(titles))]
@@ -0,0 +1,62 @@
+"""Compact in-memory representation of fetched headlines.
+
+Large aggregated feeds produce hundreds of thousands of items per pass, so
+each one is a ``__slots__`` record instead of a dict: no per-item hash
+table, the publish time kept once as a float (the ISO form is derived on
+demand), and the heavily repeated source and feed names interned so every
+item shares one string object.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from typing import Any
+
+
+class NewsItem:
+    __slots__ = ("title", "source", "link", "published_ts", "feed", "printed_recently")
+
+    def __init__(
+        self,
+        title: str,
+        source: str,
+        link: str,
+        published_ts: float,
+        feed: str,
+        printed_recently: bool = False,
+    ) -> None:
+        self.title = title
+        self.source = sys.intern(source)
+        self.link = link
+        self.published_ts = published_ts
+        self.feed = sys.intern(feed)
+        self.printed_recently = printed_recently
+
+    @property
+    def published_utc(self) -> str:
+        return dt.datetime.fromtimestamp(self.published_ts, dt.timezone.utc).isoformat()
+
+    @classmethod
+    def from_dict(cls, item: dict[str, Any]) -> "NewsItem":
+        return cls(
+            item["title"],
+            item["source"],
+            item["link"],
+            item["published_ts"],
+            item["feed"],
+            bool(item.get("printed_recently")),
+        )
+
+    def as_headline(self) -> dict[str, Any]:
+        """The digest's ``headlines`` entry for this item."""
+        return {
+            "title": self.title,
+            "source": self.source,
+            "published_utc": self.published_utc,
+            "link": self.link,
+            "feed": self.feed,
+        }
+
+    def __repr__(self) -> str:
+        return f"NewsItem({self.title!r}, source={self.source!r}, feed={self.feed!r}, published_ts={self.published_ts})"
@@ -0,0 +1,111 @@
+"""Locales (Google News editions) for the news digest.
+
+A locale is written like ``en-GB`` or ``fr-FR``: a language, a dash, then a
+two-letter region. It becomes the ``hl``/``gl``/``ceid`` query parameters of
+every Google News feed URL (``hl=en-GB&gl=GB&ceid=GB:en``). Feeds without
+those parameters are not locale-specific. They are fetched once and feed
+every locale.
+
+For several locales, ``localize_registry`` returns one combined registry for
+a single fetch pass. Localized feeds are renamed ``<feed>@<locale>``, and the
+result maps each locale to the feed names its digest reads.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from feed_registry import FeedSpec
+
+DEFAULT_LOCALE = "en-US"
+LOCALE_PARAMS = ("hl", "gl", "ceid")
+
+# How the image prompt names each region's news; other regions use their code.
+REGION_LABELS = {
+    "US": "U.S.",
+    "GB": "U.K.",
+    "IE": "Irish",
+    "CA": "Canadian",
+    "AU": "Australian",
+    "NZ": "New Zealand",
+    "IN": "Indian",
+    "SG": "Singapore",
+    "ZA": "South African",
+    "DE": "German",
+    "FR": "French",
+    "ES": "Spanish",
+    "IT": "Italian",
+    "NL": "Dutch",
+    "JP": "Japanese",
+    "BR": "Brazilian",
+    "MX": "Mexican",
+}
+
+
+class Locale(NamedTuple):
+    code: str
+    language: str
+    region: str
+
+    @property
+    def label(self) -> str:
+        return REGION_LABELS.get(self.region, self.region)
+
+    def query(self) -> dict[str, str]:
+        return {"hl": self.code, "gl": self.region, "ceid": f"{self.region}:{self.language}"}
+
+
+def parse_locale(text: str) -> Locale:
+    match = re.fullmatch(r"([A-Za-z]{2,3})[-_]([A-Za-z]{2})", text.strip())
+    if not match:
+        raise ValueError(f"locale '{text}' must look like en-GB (language-REGION)")
+    language, region = match.group(1).lower(), match.group(2).upper()
+    return Locale(f"{language}-{region}", language, region)
+
+
+def parse_locales(text: str) -> list[Locale]:
+    """Comma-separated locale list, duplicates dropped, order kept."""
+    locales: dict[str, Locale] = {}
+    for part in text.split(","):
+        if part.strip():
+            locale = parse_locale(part)
+            locales.setdefault(locale.code, locale)
+    if not locales:
+        raise ValueError("no locales given")
+    return list(locales.values())
+
+
+def localize_url(url: str, locale: Locale) -> str:
+    """``url`` with its edition parameters set to ``locale``; unchanged if it has none."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(key in LOCALE_PARAMS for key, _ in query):
+        return url
+    wanted = locale.query()
+    localized = [(key, wanted[key]) if key in wanted else (key, value) for key, value in query]
+    return urlunsplit(parts._replace(query=urlencode(localized, safe=":")))
+
+
+def feed_locale(feed_name: str) -> str:
+    """The locale code of a feed ``localize_registry`` renamed, or ``""`` for one every locale shares."""
+    return feed_name.rpartition("@")[2] if "@" in feed_name else ""
+
+
+def localize_registry(specs: list[FeedSpec], locales: list[Locale]) -> tuple[list[FeedSpec], dict[str, list[str]]]:
+    """One registry covering every locale, plus the feed names each locale reads."""
+    combined: dict[str, FeedSpec] = {}
+    names_by_url: dict[str, str] = {}
+    feeds_by_locale: dict[str, list[str]] = {locale.code: [] for locale in locales}
+    # Feed-major order, so under a tight budget every locale gets its top feeds before anyone's extras.
+    for spec in specs:
+        for locale in locales:
+            url = localize_url(spec.url, locale)
+            name = names_by_url.get(url)
+            if name is None:
+                name = spec.name if url == spec.url else f"{spec.name}@{locale.code}"
+                combined[name] = spec._replace(name=name, url=url)
+                names_by_url[url] = name
+            feeds_by_locale[locale.code].append(name)
+    return list(combined.values()), feeds_by_locale
@@ -0,0 +1,150 @@
+"""Local SQLite index of pre-filtered on-this-day candidates for all 366 days.
+
+`fetch_surprise_fact.py --prefetch` fills it from Wikipedia. `on-this-day`
+mode then picks from it with two primary-key lookups (the day's candidate
+count, then one row) and needs no network. Days older than the refresh age
+are re-fetched incrementally in a background process.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from http_cache import DEFAULT_CACHE_ROOT
+
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_ROOT / "onthisday.sqlite"
+# Entries older than this are refreshed in the background; they are still served meanwhile.
+DEFAULT_REFRESH_AGE_DAYS = 30.0
+# Don't launch another background refresh while one started this recently.
+REFRESH_COOLDOWN_SEC = 600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    fetched_ts REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (month, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS candidates (
+    month INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    headline TEXT NOT NULL,
+    fact TEXT NOT NULL,
+    source_title TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    PRIMARY KEY (month, day, idx)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+CANDIDATE_FIELDS = ("headline", "fact", "source_title", "source_url", "prompt")
+
+
+def all_days() -> Iterator[tuple[int, int]]:
+    """Every (month, day) of a leap year, so 02-29 is included."""
+    day = dt.date(2000, 1, 1)
+    while day.year == 2000:
+        yield day.month, day.day
+        day += dt.timedelta(days=1)
+
+
+class OnThisDayIndex:
+    def __init__(self, path: Path | str = DEFAULT_INDEX_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "OnThisDayIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def day_info(self, month: int, day: int) -> tuple[int, float] | None:
+        """Return (candidate count, fetched_ts) for a day, or None if never fetched."""
+        row = self.conn.execute("SELECT count, fetched_ts FROM days WHERE month = ? AND day = ?", (month, day)).fetchone()
+        return (row["count"], row["fetched_ts"]) if row else None
+
+    def pick(self, month: int, day: int, seed: int | None) -> dict[str, Any] | None:
+        """Pick one candidate the same way `pick_on_this_day` picks from a live payload."""
+        info = self.day_info(month, day)
+        if not info or info[0] <= 0:
+            return None
+        rng = random.Random(seed if seed is not None else month * 100 + day)
+        idx = rng.randrange(info[0])
+        row = self.conn.execute(
+            f"SELECT {', '.join(CANDIDATE_FIELDS)} FROM candidates WHERE month = ? AND day = ? AND idx = ?",
+            (month, day, idx),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def store_day(self, month: int, day: int, candidates: list[dict[str, Any]]) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM candidates WHERE month = ? AND day = ?", (month, day))
+            self.conn.executemany(
+                f"INSERT INTO candidates (month, day, idx, {', '.join(CANDIDATE_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (month, day, idx, *(str(c.get(field, "")) for field in CANDIDATE_FIELDS))
+                    for idx, c in enumerate(candidates)
+                ),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO days (month, day, fetched_ts, count) VALUES (?, ?, ?, ?)",
+                (month, day, time.time(), len(candidates)),
+            )
+
+    def stale_days(
+        self,
+        max_age_days: float,
+        days: Iterable[tuple[int, int]] | None = None,
+        include_missing: bool = True,
+    ) -> list[tuple[int, int]]:
+        """Days fetched longer than ``max_age_days`` ago, plus never-fetched days unless excluded."""
+        cutoff = time.time() - max_age_days * 86400
+        fetched = {
+            (row["month"], row["day"]): row["fetched_ts"]
+            for row in self.conn.execute("SELECT month, day, fetched_ts FROM days")
+        }
+        return [
+            key
+            for key in (days or all_days())
+            if (key in fetched and fetched[key] < cutoff) or (key not in fetched and include_missing)
+        ]
+
+    def claim_refresh(self, cooldown_sec: float = REFRESH_COOLDOWN_SEC) -> bool:
+        """Record a background refresh start; False if another one started within the cooldown."""
+        now = time.time()
+        with self.conn:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'refresh_started_ts'").fetchone()
+            if row and now - float(row["value"]) < cooldown_sec:
+                return False
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('refresh_started_ts', ?)",
+                (str(now),),
+            )
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS days, COALESCE(SUM(count), 0) AS candidates, MIN(fetched_ts) AS oldest FROM days"
+        ).fetchone()
+        return {"days": row["days"], "candidates": row["candidates"], "oldest_fetched_ts": row["oldest"]}
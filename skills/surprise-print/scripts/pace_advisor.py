@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Pick the BLE ``--pace`` from the outcomes of earlier prints.
+
+Every print (direct, batch or spooled) appends one record to
+``.cache/pace-history.jsonl``. The record holds the pace, the payload size,
+the transfer time and the outcome, parsed from printdock's output
+(``DEVICE``, ``PAYLOAD_BYTES``, ``TRANSFER_MS``, ``PRINT_DONE``). When
+``--pace`` is not given, the runner asks ``advise`` for one:
+
+- With no history it uses the safe default (12 ms).
+- It otherwise uses the lowest pace with clean prints above the most recent
+  failed transfer. Failures are remembered for a week.
+- After ``PROBE_AFTER`` clean prints in a row at that pace, it tries one
+  step faster.
+- A failed transfer backs off to the next step above the failed pace.
+
+Connect failures, rejections and printer-not-ready errors say nothing about
+the pace and are recorded without counting. History is kept per printer
+(the ``DEVICE`` line) and host.
+
+    ./skills/surprise-print/scripts/pace_advisor.py show
+    ./skills/surprise-print/scripts/pace_advisor.py ingest output/surprise-print/20250101-* --pace 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+from http_cache import DEFAULT_CACHE_ROOT
+
+DEFAULT_HISTORY_PATH = DEFAULT_CACHE_ROOT / "pace-history.jsonl"
+DEFAULT_PACE_MS = 12
+PACE_STEPS = (2, 3, 4, 6, 8, 10, 12, 16, 20, 25, 30, 40)
+# Records considered per printer, and how long a failed transfer rules out its pace and faster ones.
+WINDOW = 40
+FAILURE_MEMORY_SEC = 7 * 86400
+PROBE_AFTER = 3
+# The history file is trimmed back to KEEP_RECORDS once it grows past twice that.
+KEEP_RECORDS = 500
+TRANSFER_FAILED = "Print failed or timed out"
+
+
+class Advice(NamedTuple):
+    pace_ms: int
+    reason: str
+
+
+def step_above(pace_ms: int) -> int:
+    return next((step for step in PACE_STEPS if step > pace_ms), PACE_STEPS[-1])
+
+
+def step_below(pace_ms: int) -> int | None:
+    return next((step for step in reversed(PACE_STEPS) if step < pace_ms), None)
+
+
+def parse_print_output(stdout: str, stderr: str = "") -> dict[str, Any]:
+    """Pull device, payload size, transfer time and outcome out of `printdock print` output."""
+    fields: dict[str, Any] = {"device": None, "payload_bytes": None, "transfer_ms": None}
+    for line in stdout.splitlines():
+        key, _, value = line.strip().partition(" ")
+        if key == "DEVICE":
+            fields["device"] = value or None
+        elif key == "PAYLOAD_BYTES" and value.isdigit():
+            fields["payload_bytes"] = int(value)
+        elif key == "TRANSFER_MS" and value.isdigit():
+            fields["transfer_ms"] = int(value)
+
+    lines = {line.strip() for line in stdout.splitlines()}
+    if "PRINT_DONE" in lines:
+        fields["outcome"] = "ok"
+    elif fields["payload_bytes"] is not None and TRANSFER_FAILED in stdout + stderr:
+        fields["outcome"] = "failed"
+    else:
+        # Never reached the transfer (connect, rejection, missing file): not evidence about the pace.
+        fields["outcome"] = "aborted"
+    return fields
+
+
+def load_history(path: Path = DEFAULT_HISTORY_PATH) -> list[dict[str, Any]]:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError:
+        return []
+    records = []
+    for line in text.splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return [r for r in records if isinstance(r, dict) and "pace_ms" in r and "outcome" in r]
+
+
+def _trim(path: Path) -> None:
+    records = load_history(path)
+    if len(records) <= 2 * KEEP_RECORDS:
+        return
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(r) + "\n" for r in records[-KEEP_RECORDS:])
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def record_print(
+    stdout: str,
+    stderr: str,
+    pace_ms: int,
+    wall_ms: float | None = None,
+    path: Path = DEFAULT_HISTORY_PATH,
+    ts: float | None = None,
+) -> dict[str, Any]:
+    """Append one print's outcome to the history; ``wall_ms`` stands in when printdock gave no TRANSFER_MS."""
+    record = {"ts": round(time.time() if ts is None else ts, 3), "host": socket.gethostname(), "pace_ms": int(pace_ms)}
+    record.update(parse_print_output(stdout, stderr))
+    record["timed_by"] = "printer"
+    if record["transfer_ms"] is None:
+        record["transfer_ms"] = round(wall_ms) if wall_ms is not None else None
+        record["timed_by"] = "wall" if wall_ms is not None else None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # O_APPEND keeps lines from concurrent runs intact.
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+        _trim(path)
+    except OSError as exc:
+        print(f"Could not record print pace history: {exc}", file=sys.stderr)
+    return record
+
+
+def relevant_records(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Counted records for the printer and host of the most recent one, newest last."""
+    counted = [r for r in records if r.get("outcome") in ("ok", "failed")]
+    if not counted:
+        return []
+    latest = counted[-1]
+    same = [r for r in counted if r.get("device") == latest.get("device") and r.get("host") == latest.get("host")]
+    return same[-WINDOW:]
+
+
+def advise(records: Iterable[dict[str, Any]], default: int = DEFAULT_PACE_MS, now: float | None = None) -> Advice:
+    history = relevant_records(records)
+    if not history:
+        return Advice(default, "no print history yet")
+    now = time.time() if now is None else now
+
+    # A failed transfer rules out its pace and everything faster until it ages out.
+    floor = max(
+        (r["pace_ms"] for r in history if r["outcome"] == "failed" and now - r.get("ts", 0) < FAILURE_MEMORY_SEC),
+        default=0,
+    )
+    latest = history[-1]
+    if latest["outcome"] == "failed":
+        return Advice(step_above(floor), f"backing off after a failed transfer at {latest['pace_ms']} ms")
+
+    clean = sorted({r["pace_ms"] for r in history if r["outcome"] == "ok" and r["pace_ms"] > floor})
+    if not clean:
+        pace = default if default > floor else step_above(floor)
+        return Advice(pace, f"no clean prints above the {floor} ms failure yet")
+
+    best = clean[0]
+    streak = 0
+    for r in reversed(history):
+        if r["outcome"] != "ok" or r["pace_ms"] != best:
+            break
+        streak += 1
+    faster = step_below(best)
+    if streak >= PROBE_AFTER and faster is not None and faster > floor:
+        return Advice(faster, f"{streak} clean prints in a row at {best} ms; trying {faster} ms")
+    ok_count = sum(1 for r in history if r["outcome"] == "ok" and r["pace_ms"] == best)
+    return Advice(best, f"lowest pace with clean prints ({ok_count} ok at {best} ms)")
+
+
+def summary_rows(records: Iterable[dict[str, Any]]) -> list[str]:
+    by_pace: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for r in relevant_records(records):
+        by_pace[r["pace_ms"]].append(r)
+    rows = [f"{'pace ms':>7} {'ok':>4} {'failed':>6} {'median ms':>10} {'KiB/s':>7}"]
+    for pace in sorted(by_pace):
+        group = by_pace[pace]
+        ok = [r for r in group if r["outcome"] == "ok"]
+        timed = [r for r in ok if r.get("transfer_ms") and r.get("payload_bytes")]
+        median_ms = statistics.median(r["transfer_ms"] for r in timed) if timed else None
+        rate = (
+            statistics.median(r["payload_bytes"] / 1024 / (r["transfer_ms"] / 1000) for r in timed) if timed else None
+        )
+        rows.append(
+            f"{pace:>7} {len(ok):>4} {len(group) - len(ok):>6} "
+            f"{'-' if median_ms is None else f'{median_ms:.0f}':>10} {'-' if rate is None else f'{rate:.1f}':>7}"
+        )
+    return rows
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Choose the BLE pace from recorded print outcomes")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY_PATH), help=f"History file (default: {DEFAULT_HISTORY_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="Per-pace outcomes and the current advice")
+    sub.add_parser("advise", help="Print only the advised pace in milliseconds")
+    ingest = sub.add_parser("ingest", help="Record prints from existing run directories (printdock.stdout.log)")
+    ingest.add_argument("run_dirs", nargs="+")
+    ingest.add_argument("--pace", type=int, default=DEFAULT_PACE_MS, help="Pace those runs used (default: 12)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    history_path = Path(args.history)
+    if args.command == "ingest":
+        for run_dir in map(Path, args.run_dirs):
+            stdout_log = run_dir / "printdock.stdout.log"
+            if not stdout_log.is_file():
+                print(f"{run_dir}: no printdock.stdout.log", file=sys.stderr)
+                continue
+            stderr_log = run_dir / "printdock.stderr.log"
+            stderr = stderr_log.read_text(encoding="utf-8", errors="replace") if stderr_log.is_file() else ""
+            record = record_print(
+                stdout_log.read_text(encoding="utf-8", errors="replace"),
+                stderr,
+                args.pace,
+                path=history_path,
+                ts=stdout_log.stat().st_mtime,
+            )
+            print(f"{run_dir}: {record['outcome']}")
+        return 0
+
+    advice = advise(load_history(history_path))
+    if args.command == "advise":
+        print(advice.pace_ms)
+        return 0
+    print("\n".join(summary_rows(load_history(history_path))))
+    print(f"advice: {advice.pace_ms} ms ({advice.reason})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Crop and resample generated art straight to the Hi-Print payload size.
+
+Placement matches `ImagePipeline.renderToTarget` in PrintDockKit: the image is
+scaled to cover 640x1024 (times ``zoom``, never below 1), centered, shifted by
+``offset`` in target pixels and clamped so it always covers the page.
+Offsets follow CoreGraphics: positive x moves the image right, positive y
+moves it up. Because the result is already 640x1024, the Swift side draws it
+at scale 1 and has nothing left to resample.
+
+    ./skills/surprise-print/scripts/print_prep.py surprise.png surprise_print_ready.png --zoom 1.2 --offset-y 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+# HiPrintConstants.imageWidth / imageHeight
+TARGET_WIDTH = 640
+TARGET_HEIGHT = 1024
+# Let Pillow shrink by whole factors first (JPEG DCT scaling or reduce()) before the Lanczos pass.
+REDUCING_GAP = 3.0
+
+
+class PrintPrepError(ValueError):
+    pass
+
+
+def source_box(src_w: int, src_h: int, zoom: float = 1.0, offset: tuple[float, float] = (0.0, 0.0)) -> tuple[float, float, float, float]:
+    """Return the (left, top, right, bottom) source region that lands on the page."""
+    if src_w <= 0 or src_h <= 0:
+        raise PrintPrepError(f"Invalid source size: {src_w}x{src_h}")
+
+    scale = max(TARGET_WIDTH / src_w, TARGET_HEIGHT / src_h) * max(1.0, zoom)
+    draw_w = src_w * scale
+    draw_h = src_h * scale
+    max_x = max(0.0, (draw_w - TARGET_WIDTH) / 2)
+    max_y = max(0.0, (draw_h - TARGET_HEIGHT) / 2)
+    off_x = min(max(offset[0], -max_x), max_x)
+    off_y = min(max(offset[1], -max_y), max_y)
+
+    # Distance from the drawn image's top-left to the page's; CoreGraphics' y axis points up.
+    left = (draw_w - TARGET_WIDTH) / 2 - off_x
+    top = (draw_h - TARGET_HEIGHT) / 2 + off_y
+    return (
+        left / scale,
+        top / scale,
+        (left + TARGET_WIDTH) / scale,
+        (top + TARGET_HEIGHT) / scale,
+    )
+
+
+def render(src: Path, zoom: float = 1.0, offset: tuple[float, float] = (0.0, 0.0)) -> Image.Image:
+    """Decode ``src`` once and crop+resample it to a validated 640x1024 RGB page."""
+    with Image.open(src) as image:
+        full_w, full_h = image.size
+        box = source_box(full_w, full_h, zoom, offset)
+        # For JPEG sources this decodes at 1/2, 1/4 or 1/8 scale when that still covers the crop.
+        crop_w = box[2] - box[0]
+        crop_h = box[3] - box[1]
+        factor = min(crop_w / TARGET_WIDTH, crop_h / TARGET_HEIGHT)
+        if factor >= 2:
+            image.draft("RGB", (int(full_w / factor), int(full_h / factor)))
+        draft_scale = image.size[0] / full_w
+        box = tuple(v * draft_scale for v in box)
+
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            # renderToTarget draws onto a white page.
+            rgba = image.convert("RGBA")
+            page = Image.new("RGB", rgba.size, "white")
+            page.paste(rgba, mask=rgba.getchannel("A"))
+            image = page
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        out = image.resize((TARGET_WIDTH, TARGET_HEIGHT), Image.Resampling.LANCZOS, box=box, reducing_gap=REDUCING_GAP)
+
+    if out.size != (TARGET_WIDTH, TARGET_HEIGHT) or out.size[0] * 8 != out.size[1] * 5:
+        raise PrintPrepError(f"Invalid print size after resample: {out.size[0]}x{out.size[1]}")
+    return out
+
+
+def prepare(src: Path, dst: Path, zoom: float = 1.0, offset: tuple[float, float] = (0.0, 0.0)) -> tuple[int, int]:
+    """Render ``src`` to the page and write it to ``dst`` once."""
+    page = render(src, zoom, offset)
+    page.save(dst, format="PNG")
+    return page.size
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crop and resample an image to the 640x1024 Hi-Print page")
+    parser.add_argument("src", help="Source image")
+    parser.add_argument("dst", help="Output PNG")
+    parser.add_argument("--zoom", type=float, default=1.0, help="Zoom past cover-fit (>= 1, default: 1)")
+    parser.add_argument("--offset-x", type=float, default=0.0, help="Horizontal shift in page pixels (+ = right)")
+    parser.add_argument("--offset-y", type=float, default=0.0, help="Vertical shift in page pixels (+ = up)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        width, height = prepare(Path(args.src), Path(args.dst), args.zoom, (args.offset_x, args.offset_y))
+    except (OSError, PrintPrepError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"{width}x{height}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Local print spooler: every producer shares one printer connection.
+
+Producers hand print-ready JPEGs to the spool (``submit``, or
+`run_surprise_print.sh --spool`). The spooler daemon prints them one at a
+time, highest priority first and oldest first within a priority. It keeps
+one `printdock serve` session, so only the first job after startup pays for
+the BLE scan and connect; later status polls and sends reuse the link.
+
+Each job has a ticket ``<spool>/jobs/<id>.json``. Its ``state`` goes from
+queued to printing to done or failed, and producers wait on it. Only one
+spooler runs per spool directory, enforced by a lock file. ``--spool`` starts
+one automatically; it exits after ``--idle-exit`` seconds with nothing to do.
+
+    ./skills/surprise-print/scripts/print_spooler.py serve
+    ./skills/surprise-print/scripts/print_spooler.py submit page.jpg --priority 5 --wait
+    ./skills/surprise-print/scripts/print_spooler.py list
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import secrets
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import IO, Any
+
+import pace_advisor
+from atomic_json import write_json_atomic
+from http_cache import DEFAULT_CACHE_ROOT
+from image_cache import link_or_copy
+from printdock_wrapper import (
+    STATUS_ATTEMPTS,
+    STATUS_RETRY_WAIT_SEC,
+    STATUS_TIMEOUT_CAP_SEC,
+    PrintdockError,
+    PrintdockSession,
+    PrintdockWrapper,
+)
+from run_trace import span
+
+SKILL_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SPOOL_DIR = DEFAULT_CACHE_ROOT / "spool"
+DEFAULT_PRINTDOCK_PATH = SKILL_ROOT.parent.parent
+DEFAULT_IDLE_EXIT_SEC = 600.0
+POLL_SEC = 0.5
+# A session that failed to start is retried after this long; queued jobs wait meanwhile.
+SESSION_RETRY_SEC = 30.0
+# Queued jobs not started within this long fail instead of printing hours late.
+DEFAULT_QUEUE_EXPIRY_SEC = 30 * 60.0
+# Finished tickets and their images are removed after this long.
+KEEP_FINISHED_SEC = 7 * 86400
+FINAL_STATES = ("done", "failed")
+# A waiting producer gives up on its job after this many polls in a row with no spooler running.
+SPOOLER_GONE_POLLS = 10
+
+
+class SpoolerError(RuntimeError):
+    pass
+
+
+def jobs_dir(spool_dir: Path) -> Path:
+    return spool_dir / "jobs"
+
+
+def ticket_path(spool_dir: Path, job_id: str) -> Path:
+    return jobs_dir(spool_dir) / f"{job_id}.json"
+
+
+def read_ticket(spool_dir: Path, job_id: str) -> dict[str, Any] | None:
+    try:
+        return json.loads(ticket_path(spool_dir, job_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def update_ticket(spool_dir: Path, ticket: dict[str, Any], **changes: Any) -> dict[str, Any]:
+    ticket.update(changes)
+    write_json_atomic(ticket_path(spool_dir, ticket["id"]), ticket)
+    return ticket
+
+
+def submit(
+    jpeg: Path,
+    spool_dir: Path = DEFAULT_SPOOL_DIR,
+    priority: int = 0,
+    pace_ms: int = 12,
+    timeout: float = 90,
+    name: str | None = None,
+    expiry_sec: float = DEFAULT_QUEUE_EXPIRY_SEC,
+) -> str:
+    """Queue a print-ready JPEG and return its job id (ids sort by arrival)."""
+    directory = jobs_dir(spool_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    job_id = f"{time.time_ns():020d}-{os.getpid()}-{secrets.token_hex(2)}"
+    image = directory / f"{job_id}.jpg"
+    link_or_copy(Path(jpeg), image)
+    write_json_atomic(
+        ticket_path(spool_dir, job_id),
+        {
+            "id": job_id,
+            "name": name or Path(jpeg).name,
+            "state": "queued",
+            "priority": priority,
+            "pace_ms": pace_ms,
+            "timeout": timeout,
+            "image": str(image),
+            "source": str(Path(jpeg).resolve()),
+            "submitted_ts": time.time(),
+            "expires_ts": time.time() + expiry_sec,
+        },
+    )
+    return job_id
+
+
+def wait(job_id: str, spool_dir: Path = DEFAULT_SPOOL_DIR, timeout: float | None = None) -> dict[str, Any]:
+    """Block until the job is done or failed; returns its ticket (still queued/printing on timeout).
+
+    With no spooler running, the job is failed once it expires in the queue or
+    after ``SPOOLER_GONE_POLLS`` polls, so a spooler that never started or died
+    cannot leave the producer waiting forever.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    polls_without_spooler = 0
+    while True:
+        ticket = read_ticket(spool_dir, job_id)
+        if ticket is None:
+            raise SpoolerError(f"Unknown spool job: {job_id}")
+        if ticket["state"] in FINAL_STATES or (deadline is not None and time.monotonic() > deadline):
+            return ticket
+        if spooler_running(spool_dir):
+            polls_without_spooler = 0
+        else:
+            polls_without_spooler += 1
+            expired = ticket["state"] == "queued" and ticket.get("expires_ts", float("inf")) < time.time()
+            if expired or polls_without_spooler >= SPOOLER_GONE_POLLS:
+                failed = _fail_orphaned(spool_dir, job_id, "expired in queue" if expired else None)
+                if failed is not None:
+                    return failed
+        time.sleep(POLL_SEC)
+
+
+def list_tickets(spool_dir: Path) -> list[dict[str, Any]]:
+    tickets = []
+    for path in jobs_dir(spool_dir).glob("*.json"):
+        try:
+            tickets.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return tickets
+
+
+def queue_order(tickets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Queued tickets in print order: priority (high first), then arrival."""
+    queued = [t for t in tickets if t.get("state") == "queued"]
+    return sorted(queued, key=lambda t: (-int(t.get("priority", 0)), t["id"]))
+
+
+def _try_lock(spool_dir: Path) -> IO[str] | None:
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    handle = open(spool_dir / "spooler.lock", "a+", encoding="utf-8")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def spooler_running(spool_dir: Path) -> bool:
+    handle = _try_lock(spool_dir)
+    if handle is None:
+        return True
+    handle.close()
+    return False
+
+
+def _fail_orphaned(spool_dir: Path, job_id: str, error: str | None) -> dict[str, Any] | None:
+    """Fail an unfinished job while holding the spooler lock; None if a spooler took the lock first."""
+    lock = _try_lock(spool_dir)
+    if lock is None:
+        return None
+    try:
+        ticket = read_ticket(spool_dir, job_id)
+        if ticket is None or ticket["state"] in FINAL_STATES:
+            return ticket
+        if error is None:
+            error = "spooler stopped mid-print" if ticket["state"] == "printing" else "no spooler is running"
+        return update_ticket(spool_dir, ticket, state="failed", error=error, finished_ts=time.time())
+    finally:
+        lock.close()
+
+
+def ensure_spooler(spool_dir: Path, printdock_path: Path, idle_exit: float = DEFAULT_IDLE_EXIT_SEC) -> None:
+    """Start a detached spooler for ``spool_dir`` unless one is already running."""
+    if spooler_running(spool_dir):
+        return
+    log = open(spool_dir / "spooler.log", "ab")
+    try:
+        subprocess.Popen(
+            [
+                sys.executable, str(Path(__file__).resolve()),
+                "--spool", str(spool_dir),
+                "serve",
+                "--printdock-path", str(printdock_path),
+                "--idle-exit", f"{idle_exit:g}",
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    finally:
+        log.close()
+
+
+class Spooler:
+    def __init__(self, spool_dir: Path, printdock_path: Path, connect_timeout: float = 12.0) -> None:
+        self.spool_dir = Path(spool_dir)
+        self.wrapper = PrintdockWrapper(Path(printdock_path), self.spool_dir)
+        self.session = PrintdockSession(self.wrapper, self.spool_dir / "session", timeout=connect_timeout)
+        self._session_retry_at = 0.0
+
+    def write_state(self, **fields: Any) -> None:
+        write_json_atomic(
+            self.spool_dir / "spooler.json",
+            {"pid": os.getpid(), "updated_ts": time.time(), "session": self.session.alive, **fields},
+        )
+
+    def recover(self) -> None:
+        """Fail jobs a previous spooler left mid-print; resending could print them twice."""
+        for ticket in list_tickets(self.spool_dir):
+            if ticket.get("state") == "printing":
+                update_ticket(
+                    self.spool_dir, ticket, state="failed", error="spooler stopped mid-print", finished_ts=time.time()
+                )
+
+    def expire(self, tickets: list[dict[str, Any]]) -> None:
+        now = time.time()
+        for ticket in tickets:
+            if ticket.get("state") == "queued" and ticket.get("expires_ts", now) < now:
+                update_ticket(self.spool_dir, ticket, state="failed", error="expired in queue", finished_ts=now)
+
+    def prune(self) -> None:
+        cutoff = time.time() - KEEP_FINISHED_SEC
+        for ticket in list_tickets(self.spool_dir):
+            if ticket.get("state") in FINAL_STATES and ticket.get("finished_ts", 0) < cutoff:
+                Path(ticket.get("image", "")).unlink(missing_ok=True)
+                ticket_path(self.spool_dir, ticket["id"]).unlink(missing_ok=True)
+
+    def ensure_session(self) -> bool:
+        if self.session.alive:
+            return True
+        if time.monotonic() < self._session_retry_at:
+            return False
+        try:
+            self.session.start()
+            return True
+        except (OSError, PrintdockError) as exc:
+            self._session_retry_at = time.monotonic() + SESSION_RETRY_SEC
+            print(f"printdock session failed to start: {exc}", file=sys.stderr)
+            self.write_state(state="waiting", last_error=str(exc))
+            return False
+
+    def wait_ready(self, timeout: float) -> None:
+        status_timeout = min(timeout, STATUS_TIMEOUT_CAP_SEC)
+        for attempt in range(1, STATUS_ATTEMPTS + 1):
+            try:
+                if self.session.is_ready(status_timeout):
+                    return
+            except PrintdockError:
+                if not self.session.alive:
+                    raise
+            if attempt < STATUS_ATTEMPTS:
+                time.sleep(STATUS_RETRY_WAIT_SEC)
+        raise PrintdockError("Printer is not ready for a new job. Skipping print to avoid waste.")
+
+    def print_one(self, ticket: dict[str, Any]) -> None:
+        update_ticket(self.spool_dir, ticket, state="printing", started_ts=time.time(), spooler_pid=os.getpid())
+        self.write_state(state="printing", job=ticket["id"])
+        print(f"==> Printing {ticket['name']} ({ticket['id']}, priority {ticket.get('priority', 0)})")
+        with span("spooler.job", job=ticket["id"], priority=ticket.get("priority", 0)) as attrs:
+            try:
+                self.wait_ready(float(ticket.get("timeout", 90)))
+                self.session.print_jpeg(Path(ticket["image"]), int(ticket.get("pace_ms", 12)), float(ticket.get("timeout", 90)))
+            except PrintdockError as exc:
+                attrs["result"] = "failed"
+                update_ticket(self.spool_dir, ticket, state="failed", error=str(exc), finished_ts=time.time())
+                print(f"[{ticket['id']}] {exc}", file=sys.stderr)
+            else:
+                attrs["result"] = "done"
+                update_ticket(self.spool_dir, ticket, state="done", error=None, finished_ts=time.time())
+
+    def serve(self, idle_exit: float | None = None) -> int:
+        lock = _try_lock(self.spool_dir)
+        if lock is None:
+            raise SpoolerError(f"Another spooler is already serving {self.spool_dir}")
+        try:
+            self.recover()
+            self.prune()
+            self.write_state(state="idle")
+            idle_since = time.monotonic()
+            print(f"Spooling from {jobs_dir(self.spool_dir)}")
+            while True:
+                tickets = list_tickets(self.spool_dir)
+                self.expire(tickets)
+                queue = queue_order(tickets)
+                if not queue:
+                    if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                        return 0
+                    time.sleep(POLL_SEC)
+                    continue
+                if not self.ensure_session():
+                    time.sleep(POLL_SEC)
+                    continue
+                self.print_one(queue[0])
+                self.write_state(state="idle")
+                idle_since = time.monotonic()
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            self.session.close()
+            self.write_state(state="stopped")
+            lock.close()
+
+
+def add_printdock_path(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--printdock-path",
+        default=os.environ.get("PRINTDOCK_PATH") or str(DEFAULT_PRINTDOCK_PATH),
+        help="Path to the printdock Swift package",
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Spool print-ready JPEGs onto one shared printer connection")
+    parser.add_argument("--spool", default=str(DEFAULT_SPOOL_DIR), help=f"Spool directory (default: {DEFAULT_SPOOL_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Run the spooler in the foreground")
+    add_printdock_path(serve)
+    serve.add_argument("--idle-exit", type=float, help="Exit after this many idle seconds (default: run until stopped)")
+    serve.add_argument("--connect-timeout", type=float, default=12.0, help="Printer connect/status timeout (default: 12)")
+
+    submit_cmd = sub.add_parser("submit", help="Queue a print-ready 640x1024 JPEG (starts a spooler if none is running)")
+    submit_cmd.add_argument("jpeg")
+    submit_cmd.add_argument("--priority", type=int, default=0, help="Higher prints first (default: 0)")
+    submit_cmd.add_argument("--pace", type=int, help="BLE pace in milliseconds (default: advised by pace_advisor.py)")
+    submit_cmd.add_argument("--timeout", type=float, default=90, help="Print timeout in seconds (default: 90)")
+    submit_cmd.add_argument("--name", help="Label shown in the queue")
+    submit_cmd.add_argument("--wait", action="store_true", help="Block until the job is done or failed")
+    add_printdock_path(submit_cmd)
+
+    sub.add_parser("list", help="Show queued, printing and finished jobs")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    spool_dir = Path(args.spool)
+    try:
+        if args.command == "serve":
+            return Spooler(spool_dir, Path(args.printdock_path), args.connect_timeout).serve(args.idle_exit)
+        if args.command == "submit":
+            pace = args.pace if args.pace is not None else pace_advisor.advise(pace_advisor.load_history()).pace_ms
+            job_id = submit(Path(args.jpeg), spool_dir, args.priority, pace, args.timeout, args.name)
+            ensure_spooler(spool_dir, Path(args.printdock_path))
+            print(job_id)
+            if not args.wait:
+                return 0
+            ticket = wait(job_id, spool_dir)
+            print(f"{ticket['state']}{': ' + ticket['error'] if ticket.get('error') else ''}")
+            return 0 if ticket["state"] == "done" else 1
+        tickets = list_tickets(spool_dir)
+        queued = queue_order(tickets)
+        for ticket in sorted(tickets, key=lambda t: t["id"]):
+            position = f"#{queued.index(ticket) + 1}" if ticket in queued else ""
+            print(f"{ticket['id']}  {ticket['state']:<8} {position:<4} p{ticket.get('priority', 0):<3} {ticket.get('name', '')}")
+        print(f"spooler: {'running' if spooler_running(spool_dir) else 'not running'}")
+        return 0
+    except (OSError, SpoolerError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,405 @@
+"""Run the `printdock` CLI from inside a minimal `.app` bundle.
+
+macOS only grants Bluetooth access to processes with a bundle Info.plist, so
+the CLI is copied into `printdock-cli.app`, ad-hoc signed, and launched with
+`open -W`. Output is captured to `printdock.stdout.log`/`printdock.stderr.log`
+in the run directory.
+
+Signed wrappers are cached under `.cache/printdock/<binary sha256>/`, and
+`swift build` is skipped while the package sources are unchanged, so repeat
+calls only pay for `open`.
+
+`PrintdockSession` instead keeps one `printdock serve` process (and its
+printer connection) alive across commands. `open` cannot pipe stdin, so
+commands and replies are exchanged as JSON files in a session directory.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pace_advisor
+from http_cache import DEFAULT_CACHE_ROOT
+from run_trace import span
+
+WRAPPER_CACHE_DIR = DEFAULT_CACHE_ROOT / "printdock"
+BUILD_RECORD = "build.json"
+WRAPPER_LOCK = ".wrapper.lock"
+KEEP_WRAPPERS = 3
+SOURCE_GLOBS = ("Package.swift", "Package.resolved", "Sources/**/*")
+
+INFO_PLIST = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+  <key>CFBundleName</key><string>printdock-cli</string>
+  <key>CFBundleDisplayName</key><string>printdock-cli</string>
+  <key>CFBundleIdentifier</key><string>com.printdock.cli.bundle</string>
+  <key>CFBundleVersion</key><string>1</string>
+  <key>CFBundleShortVersionString</key><string>1.0</string>
+  <key>CFBundlePackageType</key><string>APPL</string>
+  <key>CFBundleExecutable</key><string>printdock</string>
+  <key>NSPrincipalClass</key><string>NSApplication</string>
+  <key>NSBluetoothAlwaysUsageDescription</key><string>printdock needs Bluetooth to connect to your Hi-Print printer.</string>
+  <key>NSBluetoothPeripheralUsageDescription</key><string>printdock needs Bluetooth to connect to your Hi-Print printer.</string>
+</dict>
+</plist>
+"""
+
+STATUS_ATTEMPTS = 2
+STATUS_RETRY_WAIT_SEC = 8
+STATUS_TIMEOUT_CAP_SEC = 20
+
+SESSION_START_TIMEOUT_SEC = 30.0
+SESSION_POLL_SEC = 0.05
+# Extra time a session reply may take beyond the command's own timeouts (connect, encode).
+SESSION_REPLY_SLACK_SEC = 30.0
+
+
+class PrintdockError(RuntimeError):
+    pass
+
+
+class PrintdockWrapper:
+    def __init__(self, package_path: Path, out_dir: Path, cache_dir: Path = WRAPPER_CACHE_DIR) -> None:
+        self.package_path = Path(package_path)
+        self.out_dir = Path(out_dir)
+        self.cache_dir = Path(cache_dir)
+        self.stdout_log = self.out_dir / "printdock.stdout.log"
+        self.stderr_log = self.out_dir / "printdock.stderr.log"
+        self._wrapper_app: Path | None = None
+
+    def source_fingerprint(self) -> str:
+        """Cheap stat-based fingerprint of the Swift package inputs."""
+        digest = hashlib.sha256()
+        for pattern in SOURCE_GLOBS:
+            for path in sorted(self.package_path.glob(pattern)):
+                if not path.is_file():
+                    continue
+                st = path.stat()
+                digest.update(f"{path.relative_to(self.package_path)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def _load_build_record(self) -> dict[str, str]:
+        try:
+            return json.loads((self.cache_dir / BUILD_RECORD).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def build(self) -> Path:
+        fingerprint = self.source_fingerprint()
+        record = self._load_build_record()
+        cached_bin = Path(record.get("bin", ""))
+        if (
+            record.get("package") == str(self.package_path.resolve())
+            and record.get("fingerprint") == fingerprint
+            and cached_bin.is_file()
+        ):
+            with span("printdock.build", cached=True):
+                return cached_bin
+
+        with span("printdock.build", cached=False):
+            try:
+                subprocess.run(
+                    ["swift", "build", "--package-path", str(self.package_path), "--product", "printdock"],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                )
+                bin_path = subprocess.run(
+                    ["swift", "build", "--package-path", str(self.package_path), "--show-bin-path"],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout.strip()
+            except (OSError, subprocess.CalledProcessError) as exc:
+                raise PrintdockError(f"swift build failed: {exc}") from exc
+
+        built_bin = Path(bin_path) / "printdock"
+        if not built_bin.is_file():
+            raise PrintdockError(f"Could not find built printdock binary: {built_bin}")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / BUILD_RECORD).write_text(
+            json.dumps({"package": str(self.package_path.resolve()), "fingerprint": fingerprint, "bin": str(built_bin)}),
+            encoding="utf-8",
+        )
+        return built_bin
+
+    @contextlib.contextmanager
+    def _wrapper_lock(self) -> Iterator[None]:
+        """Serialize wrapper publishing and pruning across concurrent runs, batches and the spooler."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / WRAPPER_LOCK, "a+", encoding="utf-8") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            yield
+
+    def make_wrapper(self, built_bin: Path) -> Path:
+        """Return a signed wrapper for ``built_bin``, reusing the cached one for the same binary."""
+        digest = hashlib.sha256()
+        with open(built_bin, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+        entry = self.cache_dir / digest.hexdigest()[:32]
+        wrapper_app = entry / "printdock-cli.app"
+
+        def published() -> bool:
+            return (entry / "signed").exists() and (wrapper_app / "Contents" / "MacOS" / "printdock").is_file()
+
+        if published():
+            os.utime(entry)
+            return wrapper_app
+
+        with self._wrapper_lock():
+            if published():
+                # Another run published it while this one waited for the lock.
+                os.utime(entry)
+                return wrapper_app
+            staging = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".staging-"))
+            staged_app = staging / "printdock-cli.app"
+            stale = self.cache_dir / f".stale-{entry.name}-{os.getpid()}"
+            try:
+                with span("printdock.wrapper"):
+                    (staged_app / "Contents" / "MacOS").mkdir(parents=True)
+                    shutil.copy2(built_bin, staged_app / "Contents" / "MacOS" / "printdock")
+                    (staged_app / "Contents" / "Info.plist").write_text(INFO_PLIST, encoding="utf-8")
+
+                if shutil.which("codesign"):
+                    with span("printdock.codesign"):
+                        subprocess.run(
+                            ["codesign", "--force", "--deep", "--sign", "-", str(staged_app)],
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL,
+                        )
+                (staging / "signed").touch()
+                # A broken entry is renamed aside, never deleted in place, and the new one is
+                # published with one rename, so no run ever resolves a half-written bundle.
+                if entry.exists():
+                    os.replace(entry, stale)
+                os.replace(staging, entry)
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+                shutil.rmtree(stale, ignore_errors=True)
+            self._prune()
+        return wrapper_app
+
+    def _prune(self) -> None:
+        entries = [p for p in self.cache_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in entries[KEEP_WRAPPERS:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+    def wrapper(self) -> Path:
+        """Build (if needed) and wrap once; later calls in this run reuse the same bundle."""
+        if self._wrapper_app is None or not self._wrapper_app.exists():
+            self._wrapper_app = self.make_wrapper(self.build())
+        return self._wrapper_app
+
+    def run(self, *args: str) -> str:
+        """Run ``printdock <args>`` through the wrapper and return its stdout.
+
+        Raises PrintdockError when a `print` does not report PRINT_DONE or a
+        `status` does not report STATUS, mirroring the CLI's own success lines.
+        """
+        cmd = args[0] if args else ""
+        wrapper_app = self.wrapper()
+
+        for log in (self.stdout_log, self.stderr_log):
+            log.unlink(missing_ok=True)
+        started = time.monotonic()
+        with span(f"printdock.run.{cmd or 'unknown'}") as attrs:
+            result = subprocess.run(
+                [
+                    "open", "-W", "-n", str(wrapper_app),
+                    "--stdout", str(self.stdout_log),
+                    "--stderr", str(self.stderr_log),
+                    "--args", *args,
+                ]
+            )
+            attrs["exit_code"] = result.returncode
+
+        stdout = self.stdout_log.read_text(encoding="utf-8", errors="replace") if self.stdout_log.exists() else ""
+        stderr = self.stderr_log.read_text(encoding="utf-8", errors="replace") if self.stderr_log.exists() else ""
+        if stdout:
+            print(stdout, end="")
+        if stderr:
+            print(stderr, end="", file=sys.stderr)
+        if cmd == "print":
+            pace = args[args.index("--pace") + 1] if "--pace" in args[:-1] else pace_advisor.DEFAULT_PACE_MS
+            pace_advisor.record_print(stdout, stderr, int(pace), (time.monotonic() - started) * 1000)
+        if result.returncode != 0:
+            raise PrintdockError(f"open exited {result.returncode}")
+
+        if cmd == "print" and "PRINT_DONE" not in stdout:
+            raise PrintdockError(
+                f"printdock did not report PRINT_DONE; check logs: {self.stdout_log} and {self.stderr_log}"
+            )
+        if cmd == "status" and not any(line.startswith("STATUS ") for line in stdout.splitlines()):
+            raise PrintdockError(
+                f"printdock status did not return STATUS output; check logs: {self.stdout_log} and {self.stderr_log}"
+            )
+        return stdout
+
+    def ensure_ready(self, timeout_sec: float) -> None:
+        status_timeout = min(timeout_sec, STATUS_TIMEOUT_CAP_SEC)
+        for attempt in range(1, STATUS_ATTEMPTS + 1):
+            print(f"==> Checking printer readiness (attempt {attempt}/{STATUS_ATTEMPTS})")
+            retry = attempt < STATUS_ATTEMPTS
+            with span("printer.status_attempt") as attrs:
+                try:
+                    stdout = self.run("status", "--timeout", f"{status_timeout:g}")
+                except PrintdockError as exc:
+                    attrs["result"] = "no status"
+                    if retry:
+                        print(f"{exc}\nUnable to read printer status. Waiting {STATUS_RETRY_WAIT_SEC}s before retry.")
+                    else:
+                        print(exc, file=sys.stderr)
+                else:
+                    if "READY true" in stdout.splitlines():
+                        attrs["result"] = "ready"
+                        return
+                    attrs["result"] = "not ready"
+                    if retry:
+                        print(f"Printer not ready yet. Waiting {STATUS_RETRY_WAIT_SEC}s before retry.")
+            if retry:
+                time.sleep(STATUS_RETRY_WAIT_SEC)
+
+        raise PrintdockError("Printer is not ready for a new job. Skipping print to avoid waste.")
+
+
+class PrintdockSession:
+    """One long-lived `printdock serve` process; status polls and prints reuse its connection."""
+
+    def __init__(self, wrapper: PrintdockWrapper, session_dir: Path, timeout: float = 12.0) -> None:
+        self.wrapper = wrapper
+        self.session_dir = Path(session_dir)
+        self.timeout = timeout
+        self.stdout_log = self.session_dir / "serve.stdout.log"
+        self.stderr_log = self.session_dir / "serve.stderr.log"
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._seq = 0
+        self.last_reply: dict[str, object] = {}
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        wrapper_app = self.wrapper.wrapper()
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+        self.session_dir.mkdir(parents=True)
+        self._seq = 0
+        with span("printdock.session_start"):
+            self._proc = subprocess.Popen(
+                [
+                    "open", "-W", "-n", str(wrapper_app),
+                    "--stdout", str(self.stdout_log),
+                    "--stderr", str(self.stderr_log),
+                    "--args", "serve",
+                    "--session", str(self.session_dir),
+                    "--owner-pid", str(os.getpid()),
+                    "--timeout", f"{self.timeout:g}",
+                ]
+            )
+            deadline = time.monotonic() + SESSION_START_TIMEOUT_SEC
+            while not (self.session_dir / "ready.json").exists():
+                if not self.alive:
+                    raise PrintdockError(f"printdock serve exited early; check logs in {self.session_dir}")
+                if time.monotonic() > deadline:
+                    self._stop()
+                    raise PrintdockError(f"printdock serve did not start within {SESSION_START_TIMEOUT_SEC:g}s")
+                time.sleep(SESSION_POLL_SEC)
+
+    def request(self, command: dict[str, object], timeout: float) -> list[str]:
+        """Send one command and return its output lines; raises PrintdockError if it fails."""
+        if not self.alive:
+            raise PrintdockError("printdock session is not running")
+        self._seq += 1
+        name = f"{self._seq:08d}"
+        reply_path = self.session_dir / f"{name}.reply.json"
+        staged = self.session_dir / f".{name}.cmd.tmp"
+        staged.write_text(json.dumps(command), encoding="utf-8")
+        os.replace(staged, self.session_dir / f"{name}.cmd.json")
+
+        deadline = time.monotonic() + timeout
+        while not reply_path.exists():
+            if not self.alive:
+                raise PrintdockError(f"printdock session exited; check logs in {self.session_dir}")
+            if time.monotonic() > deadline:
+                # The command may still be running on the printer; don't reuse this session.
+                self._stop()
+                raise PrintdockError(f"printdock session gave no reply to '{command.get('cmd')}' within {timeout:g}s")
+            time.sleep(SESSION_POLL_SEC)
+        reply = json.loads(reply_path.read_text(encoding="utf-8"))
+        reply_path.unlink(missing_ok=True)
+
+        lines = [str(line) for line in reply.get("lines", [])]
+        self.last_reply = reply
+        if not reply.get("ok"):
+            raise PrintdockError(str(reply.get("error") or f"printdock {command.get('cmd')} failed"))
+        return lines
+
+    def status(self, timeout: float) -> list[str]:
+        with span("printdock.session.status"):
+            return self.request({"cmd": "status", "timeout": timeout}, timeout * 2 + SESSION_REPLY_SLACK_SEC)
+
+    def is_ready(self, timeout: float) -> bool:
+        return "READY true" in self.status(timeout)
+
+    def print_jpeg(self, jpeg: Path, pace_ms: int, timeout: float) -> list[str]:
+        """Send a print-ready JPEG as-is (`--raw-jpeg`) and wait for PRINT_DONE."""
+        with span("printdock.session.print", pace_ms=pace_ms) as attrs:
+            self.last_reply = {}
+            started = time.monotonic()
+            try:
+                lines = self.request(
+                    {"cmd": "print", "path": str(Path(jpeg).resolve()), "raw_jpeg": True, "pace": pace_ms, "timeout": timeout},
+                    max(timeout, 90) + self.timeout + SESSION_REPLY_SLACK_SEC,
+                )
+            finally:
+                if self.last_reply:
+                    pace_advisor.record_print(
+                        "\n".join(str(line) for line in self.last_reply.get("lines", [])),  # type: ignore[union-attr]
+                        str(self.last_reply.get("error") or ""),
+                        pace_ms,
+                        (time.monotonic() - started) * 1000,
+                    )
+            attrs["lines"] = len(lines)
+        if "PRINT_DONE" not in lines:
+            raise PrintdockError(f"printdock did not report PRINT_DONE; check logs in {self.session_dir}")
+        return lines
+
+    def close(self) -> None:
+        if self.alive:
+            try:
+                self.request({"cmd": "quit"}, 5.0)
+            except PrintdockError:
+                pass
+        self._stop()
+
+    def _stop(self) -> None:
+        if self._proc is not None:
+            # Stopping `open` does not stop the app; the session exits on its own once this process is gone.
+            if self._proc.poll() is None:
+                self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+
+    def __enter__(self) -> "PrintdockSession":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""Retention for the run output tree (`output/surprise-print/`).
+
+Each run leaves a directory of images, logs and, in older runs, a copied
+`printdock-cli.app`. A retention pass does the following, in order:
+
+1. Deletes runs older than ``max_age_days``.
+2. Compacts runs older than ``compress_after_days`` into
+   ``archive/<run>.tar.gz``. The copied wrapper bundle is left out, since
+   the signed wrapper is cached under `.cache/printdock/`.
+3. Deduplicates the remaining runs. Every file of at least
+   ``MIN_DEDUPE_BYTES`` is hashed, and identical files become hardlinks to
+   one copy under ``.store/``. Store copies no run links to any more are
+   removed.
+4. Deletes the oldest runs until the tree fits ``max_bytes``.
+
+The newest ``keep_recent`` runs, runs written to within the last hour and
+runs restored within the last day are never touched. ``index.json`` records one small entry per run (mode,
+headline, themes, a few titles, size, live or archived), so `list` and
+`search` read one file instead of walking every run. Runs trigger a
+background pass at most every 6 hours.
+
+    ./skills/surprise-print/scripts/retention.py apply --dry-run
+    ./skills/surprise-print/scripts/retention.py search volcano
+    ./skills/surprise-print/scripts/retention.py restore 20250101-083000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Any, Iterator, NamedTuple
+
+from atomic_json import write_json_atomic
+
+SKILL_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT_ROOT = SKILL_ROOT / "output" / "surprise-print"
+INDEX_NAME = "index.json"
+STORE_DIR = ".store"
+ARCHIVE_DIR = "archive"
+LOCK_NAME = ".retention.lock"
+
+DEFAULT_MAX_AGE_DAYS = 90.0
+DEFAULT_MAX_BYTES = 2 * 1024**3
+DEFAULT_COMPRESS_AFTER_DAYS = 7.0
+DEFAULT_KEEP_RECENT = 10
+# Runs written to this recently may still be in progress.
+ACTIVE_GRACE_SEC = 3600
+# A restored run stays live this long before passes may archive it again.
+RESTORE_HOLD_SEC = 86400
+MIN_DEDUPE_BYTES = 4096
+MAINTAIN_INTERVAL_SEC = 6 * 3600
+# Build products left in older runs; the signed wrapper is cached under .cache/printdock/.
+ARCHIVE_EXCLUDE = ("printdock-cli.app",)
+TITLES_PER_RUN = 5
+RUN_NAME_FORMAT = "%Y%m%d-%H%M%S"
+
+
+class Policy(NamedTuple):
+    max_age_days: float = DEFAULT_MAX_AGE_DAYS
+    max_bytes: int = DEFAULT_MAX_BYTES
+    compress_after_days: float = DEFAULT_COMPRESS_AFTER_DAYS
+    keep_recent: int = DEFAULT_KEEP_RECENT
+
+
+class PassReport(NamedTuple):
+    indexed: int
+    deleted: list[str]
+    archived: list[str]
+    deduped_files: int
+    saved_bytes: int
+    total_bytes: int
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _walk_files(root: Path) -> Iterator[Path]:
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            if not path.is_symlink():
+                yield path
+
+
+def _newest_mtime(run_dir: Path) -> float:
+    """Latest mtime anywhere in a run, including batch job subdirectories."""
+    newest = run_dir.stat().st_mtime
+    for dirpath, dirnames, _ in os.walk(run_dir):
+        for name in dirnames:
+            newest = max(newest, (Path(dirpath) / name).stat().st_mtime)
+    for path in _walk_files(run_dir):
+        newest = max(newest, path.stat().st_mtime)
+    return newest
+
+
+def _safe_members(tar: tarfile.TarFile, name: str) -> list[tarfile.TarInfo]:
+    """Members of a run archive, refusing anything outside ``name/`` or other than plain files and directories."""
+    def inside(member_name: str) -> bool:
+        parts = Path(member_name).parts
+        return not Path(member_name).is_absolute() and ".." not in parts and parts[:1] == (name,)
+
+    members = tar.getmembers()
+    for member in members:
+        if not inside(member.name):
+            raise ValueError(f"Archive member outside the run: {member.name}")
+        # Deduplicated runs hardlink identical files, which tar stores as links to the first copy.
+        if member.islnk() and not inside(member.linkname):
+            raise ValueError(f"Archive link points outside the run: {member.name}")
+        if not (member.isfile() or member.isdir() or member.islnk()):
+            raise ValueError(f"Archive member is not a plain file or directory: {member.name}")
+    return members
+
+
+def _read_json(path: Path) -> Any:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def describe_run(run_dir: Path) -> dict[str, Any]:
+    """Index entry for a live run directory."""
+    try:
+        created = dt.datetime.strptime(run_dir.name, RUN_NAME_FORMAT).timestamp()
+    except ValueError:
+        created = run_dir.stat().st_mtime
+    is_batch = (run_dir / "manifest.json").is_file()
+    fact_path = run_dir / "fact.json"
+    if not fact_path.is_file():
+        fact_path = next(iter(sorted(run_dir.glob("*/fact.json"))), fact_path)
+    fact = _read_json(fact_path) if fact_path.is_file() else None
+    fact = fact if isinstance(fact, dict) else {}
+
+    files = 0
+    size = 0
+    for path in _walk_files(run_dir):
+        files += 1
+        size += path.stat().st_size
+    return {
+        "run": run_dir.name,
+        "created_ts": round(created, 3),
+        "state": "live",
+        "mode": "batch" if is_batch else fact.get("mode"),
+        "headline": fact.get("headline"),
+        "summary": fact.get("fact"),
+        "themes": fact.get("themes", []),
+        "titles": [item.get("title") for item in fact.get("headlines", [])[:TITLES_PER_RUN] if isinstance(item, dict)],
+        "files": files,
+        "bytes": size,
+        "deduped": False,
+        "indexed_ts": round(time.time(), 3),
+    }
+
+
+def entry_matches(entry: dict[str, Any], query: str) -> bool:
+    query = query.lower()
+    fields = [entry.get("run"), entry.get("mode"), entry.get("headline"), entry.get("summary")]
+    fields += entry.get("themes") or []
+    fields += entry.get("titles") or []
+    return any(query in str(field).lower() for field in fields if field)
+
+
+class OutputTree:
+    def __init__(self, root: Path | str | None = None) -> None:
+        self.root = Path(root) if root else DEFAULT_OUTPUT_ROOT
+        self.store = self.root / STORE_DIR
+        self.archive_dir = self.root / ARCHIVE_DIR
+        self.index_path = self.root / INDEX_NAME
+        self.index = self._load_index()
+
+    def _load_index(self) -> dict[str, Any]:
+        index = _read_json(self.index_path)
+        if not isinstance(index, dict) or not isinstance(index.get("runs"), dict):
+            index = {"version": 1, "last_pass_ts": 0, "runs": {}}
+        return index
+
+    def save_index(self) -> None:
+        write_json_atomic(self.index_path, self.index)
+
+    @property
+    def runs(self) -> dict[str, dict[str, Any]]:
+        return self.index["runs"]
+
+    def run_dirs(self) -> list[Path]:
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            p for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".") and p.name != ARCHIVE_DIR
+        )
+
+    def archive_path(self, name: str) -> Path:
+        return self.archive_dir / f"{name}.tar.gz"
+
+    def scan(self) -> int:
+        """Add unindexed runs and archives, drop entries whose files are gone; returns how many were added."""
+        added = 0
+        live = {p.name: p for p in self.run_dirs()}
+        for name, path in live.items():
+            entry = self.runs.get(name, {})
+            # Re-describe runs first indexed while they may still have been writing files.
+            settled = entry.get("indexed_ts", 0) - entry.get("created_ts", 0) > ACTIVE_GRACE_SEC
+            if entry.get("state") != "live" or not settled:
+                self.runs[name] = describe_run(path)
+                added += 1
+        if self.archive_dir.is_dir():
+            for archive in self.archive_dir.glob("*.tar.gz"):
+                name = archive.name[: -len(".tar.gz")]
+                if name not in self.runs and name not in live:
+                    self.runs[name] = {
+                        "run": name,
+                        "created_ts": archive.stat().st_mtime,
+                        "state": "archived",
+                        "archive_bytes": archive.stat().st_size,
+                    }
+                    added += 1
+        for name, entry in list(self.runs.items()):
+            exists = name in live if entry["state"] == "live" else self.archive_path(name).is_file()
+            if not exists:
+                del self.runs[name]
+        return added
+
+    def protected(self, now: float, keep_recent: int) -> set[str]:
+        ordered = sorted(self.runs.values(), key=lambda e: e["created_ts"], reverse=True)
+        keep = {e["run"] for e in ordered[: max(0, keep_recent)]}
+        keep.update(e["run"] for e in ordered if now - e.get("restored_ts", 0) < RESTORE_HOLD_SEC)
+        for path in self.run_dirs():
+            try:
+                newest = _newest_mtime(path)
+            except OSError:
+                continue
+            if now - newest < ACTIVE_GRACE_SEC:
+                keep.add(path.name)
+        return keep
+
+    def dedupe(self, name: str) -> tuple[int, int]:
+        """Hardlink a live run's files to shared store copies; returns (files linked, bytes freed)."""
+        linked = freed = 0
+        for path in _walk_files(self.root / name):
+            stat = path.stat()
+            if stat.st_size < MIN_DEDUPE_BYTES:
+                continue
+            digest = file_digest(path)
+            stored = self.store / digest[:2] / digest
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if not stored.exists():
+                    os.link(path, stored)
+                    continue
+                if stored.stat().st_ino == stat.st_ino:
+                    continue
+                staged = path.with_name(f".{path.name}.dedupe")
+                staged.unlink(missing_ok=True)
+                os.link(stored, staged)
+                os.replace(staged, path)
+            except OSError as exc:
+                print(f"warning: could not deduplicate {path}: {exc}", file=sys.stderr)
+                continue
+            linked += 1
+            if stat.st_nlink == 1:
+                freed += stat.st_size
+        return linked, freed
+
+    def gc_store(self) -> None:
+        """Drop store copies that no run links to any more."""
+        if not self.store.is_dir():
+            return
+        for path in self.store.glob("??/*"):
+            try:
+                if path.stat().st_nlink <= 1:
+                    path.unlink()
+            except OSError:
+                continue
+        for prefix in self.store.glob("??"):
+            with_contents = any(prefix.iterdir())
+            if not with_contents:
+                prefix.rmdir()
+
+    def archive(self, name: str) -> None:
+        run_dir = self.root / name
+        target = self.archive_path(name)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        def keep(info: tarfile.TarInfo) -> tarfile.TarInfo | None:
+            parts = Path(info.name).parts
+            return None if any(part in ARCHIVE_EXCLUDE for part in parts) else info
+
+        fd, tmp = tempfile.mkstemp(dir=self.archive_dir, prefix=f".{name}.", suffix=".tar.gz")
+        os.close(fd)
+        try:
+            with tarfile.open(tmp, "w:gz") as tar:
+                tar.add(run_dir, arcname=name, filter=keep)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        shutil.rmtree(run_dir)
+        entry = self.runs[name]
+        entry.update(state="archived", archive_bytes=target.stat().st_size, deduped=False)
+
+    def delete(self, name: str) -> None:
+        shutil.rmtree(self.root / name, ignore_errors=True)
+        self.archive_path(name).unlink(missing_ok=True)
+        self.runs.pop(name, None)
+
+    def disk_bytes(self) -> int:
+        """Bytes the tree occupies, counting hardlinked files once."""
+        seen: set[tuple[int, int]] = set()
+        total = 0
+        for path in _walk_files(self.root):
+            stat = path.stat()
+            key = (stat.st_dev, stat.st_ino)
+            if key not in seen:
+                seen.add(key)
+                total += stat.st_size
+        return total
+
+    def restore(self, name: str) -> Path:
+        entry = self.runs.get(name)
+        if entry is None or entry["state"] != "archived":
+            raise ValueError(f"No archived run named {name}")
+        with tarfile.open(self.archive_path(name), "r:gz") as tar:
+            if hasattr(tarfile, "data_filter"):
+                tar.extractall(self.root, filter="data")
+            else:
+                # Pythons without extraction filters (macOS /usr/bin/python3 is 3.9): check members by hand.
+                tar.extractall(self.root, members=_safe_members(tar, name))
+        self.archive_path(name).unlink()
+        self.runs[name] = {**describe_run(self.root / name), "restored_ts": round(time.time(), 3)}
+        self.save_index()
+        return self.root / name
+
+    def apply(self, policy: Policy, dry_run: bool = False, now: float | None = None) -> PassReport:
+        now = time.time() if now is None else now
+        indexed = self.scan()
+        keep = self.protected(now, policy.keep_recent)
+        oldest_first = sorted(self.runs.values(), key=lambda e: e["created_ts"])
+
+        deleted = [
+            e["run"] for e in oldest_first
+            if e["run"] not in keep and now - e["created_ts"] > policy.max_age_days * 86400
+        ]
+        archived = [
+            e["run"] for e in oldest_first
+            if e["run"] not in keep and e["run"] not in deleted and e["state"] == "live"
+            and now - e["created_ts"] > policy.compress_after_days * 86400
+        ]
+        if dry_run:
+            total = self.disk_bytes()
+            return PassReport(indexed, deleted, archived, 0, 0, total)
+
+        for name in deleted:
+            self.delete(name)
+        for name in archived:
+            self.archive(name)
+        deduped_files = saved = 0
+        for entry in list(self.runs.values()):
+            if entry["state"] == "live" and not entry.get("deduped"):
+                files, freed = self.dedupe(entry["run"])
+                deduped_files += files
+                saved += freed
+                entry["deduped"] = True
+        self.gc_store()
+
+        total = self.disk_bytes()
+        for entry in sorted(self.runs.values(), key=lambda e: e["created_ts"]):
+            if total <= policy.max_bytes:
+                break
+            if entry["run"] in keep:
+                continue
+            self.delete(entry["run"])
+            deleted.append(entry["run"])
+            self.gc_store()
+            total = self.disk_bytes()
+
+        self.index["last_pass_ts"] = round(now, 3)
+        self.save_index()
+        return PassReport(indexed, deleted, archived, deduped_files, saved, total)
+
+
+def _try_lock(root: Path) -> IO[str] | None:
+    root.mkdir(parents=True, exist_ok=True)
+    handle = open(root / LOCK_NAME, "a+", encoding="utf-8")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def maybe_maintain(root: Path | None = None, interval_sec: float = MAINTAIN_INTERVAL_SEC) -> None:
+    """Start a detached retention pass if the last one is older than ``interval_sec``."""
+    root = Path(root) if root else DEFAULT_OUTPUT_ROOT
+    index = _read_json(root / INDEX_NAME)
+    last = index.get("last_pass_ts", 0) if isinstance(index, dict) else 0
+    if time.time() - last < interval_sec:
+        return
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--root", str(root), "apply", "--quiet"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as exc:
+        print(f"warning: could not start background retention pass: {exc}", file=sys.stderr)
+
+
+def format_entry(entry: dict[str, Any]) -> str:
+    created = dt.datetime.fromtimestamp(entry["created_ts"]).strftime("%Y-%m-%d %H:%M")
+    size = entry.get("bytes") if entry["state"] == "live" else entry.get("archive_bytes")
+    size_text = f"{(size or 0) / 1024 / 1024:7.1f} MiB"
+    return f"{entry['run']:<24} {created}  {entry['state']:<8} {size_text}  {entry.get('mode') or '-':<14} {entry.get('headline') or ''}"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prune, deduplicate, archive and index surprise-print runs")
+    parser.add_argument("--root", default=str(DEFAULT_OUTPUT_ROOT), help=f"Output tree (default: {DEFAULT_OUTPUT_ROOT})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    apply = sub.add_parser("apply", help="Run one retention pass")
+    apply.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS, help="Delete runs older than this (default: 90)")
+    apply.add_argument("--max-gb", type=float, default=DEFAULT_MAX_BYTES / 1024**3, help="Size cap for the tree in GiB (default: 2)")
+    apply.add_argument(
+        "--compress-after-days",
+        type=float,
+        default=DEFAULT_COMPRESS_AFTER_DAYS,
+        help="Archive runs older than this into archive/<run>.tar.gz (default: 7)",
+    )
+    apply.add_argument("--keep-recent", type=int, default=DEFAULT_KEEP_RECENT, help="Never touch the newest N runs (default: 10)")
+    apply.add_argument("--dry-run", action="store_true", help="Report what would be deleted or archived")
+    apply.add_argument("--quiet", action="store_true", help="No report (background passes)")
+
+    listing = sub.add_parser("list", help="List indexed runs, newest first")
+    listing.add_argument("--limit", type=int, default=20)
+    search = sub.add_parser("search", help="Find runs whose headline, themes or titles contain the text")
+    search.add_argument("query")
+    restore = sub.add_parser("restore", help="Unpack an archived run back into the tree")
+    restore.add_argument("run")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    root = Path(args.root)
+    try:
+        if args.command in ("list", "search"):
+            # Read-only: new runs are described in memory; the next pass records them.
+            tree = OutputTree(root)
+            tree.scan()
+            entries = sorted(tree.runs.values(), key=lambda e: e["created_ts"], reverse=True)
+            if args.command == "search":
+                entries = [e for e in entries if entry_matches(e, args.query)]
+            else:
+                entries = entries[: args.limit]
+            for entry in entries:
+                print(format_entry(entry))
+            return 0
+
+        lock = _try_lock(root)
+        if lock is None:
+            print(f"Another retention pass is running on {root}", file=sys.stderr)
+            return 0 if getattr(args, "quiet", False) else 1
+        try:
+            tree = OutputTree(root)
+            if args.command == "restore":
+                print(tree.restore(args.run))
+                return 0
+            policy = Policy(args.max_age_days, int(args.max_gb * 1024**3), args.compress_after_days, args.keep_recent)
+            report = tree.apply(policy, dry_run=args.dry_run)
+        finally:
+            lock.close()
+    except (OSError, ValueError, tarfile.TarError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        prefix = "would " if args.dry_run else ""
+        print(f"indexed {report.indexed} run(s)")
+        print(f"{prefix}delete: {', '.join(report.deleted) or '-'}")
+        print(f"{prefix}archive: {', '.join(report.archived) or '-'}")
+        if not args.dry_run:
+            print(f"deduplicated {report.deduped_files} file(s), freed {report.saved_bytes / 1024 / 1024:.1f} MiB")
+        print(f"tree size: {report.total_bytes / 1024 / 1024:.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
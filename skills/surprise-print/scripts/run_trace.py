@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Trace spans and optional profiling for surprise-print runs.
+
+Every stage appends one JSON line per span to the file named by
+``SURPRISE_PRINT_TRACE`` (the runner points it at ``<out-dir>/trace.jsonl``):
+``name``, ``parent``, ``start``/``end`` (epoch seconds), ``duration_ms``,
+``outcome`` and free-form attributes. With no trace file configured, spans
+are no-ops.
+
+``SURPRISE_PRINT_PROFILE=cprofile,tracemalloc`` additionally profiles Python
+stages and writes the reports next to the trace file.
+
+Print a summary table of a finished run:
+
+    ./skills/surprise-print/scripts/run_trace.py summary output/surprise-print/<run>/trace.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+TRACE_ENV = "SURPRISE_PRINT_TRACE"
+PARENT_ENV = "SURPRISE_PRINT_TRACE_PARENT"
+PROFILE_ENV = "SURPRISE_PRINT_PROFILE"
+
+_write_lock = threading.Lock()
+_local = threading.local()
+
+
+def trace_path() -> Path | None:
+    value = os.environ.get(TRACE_ENV)
+    return Path(value) if value else None
+
+
+def _stack() -> list[str]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def emit(record: dict[str, Any]) -> None:
+    path = trace_path()
+    if path is None:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _write_lock:
+        # O_APPEND keeps lines from concurrent processes intact.
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(line)
+
+
+@contextlib.contextmanager
+def span(name: str, parent: str | None = None, **attrs: Any) -> Iterator[dict[str, Any]]:
+    """Record a span around the block; attributes added to the yielded dict are kept.
+
+    ``parent`` defaults to the enclosing span on this thread, or to the
+    runner stage that launched this process.
+    """
+    stack = _stack()
+    if parent is None:
+        parent = stack[-1] if stack else os.environ.get(PARENT_ENV) or None
+    start = time.time()
+    outcome = "ok"
+    stack.append(name)
+    try:
+        yield attrs
+    except BaseException as exc:
+        outcome = f"error: {type(exc).__name__}: {exc}"[:300]
+        raise
+    finally:
+        stack.pop()
+        end = time.time()
+        emit(
+            {
+                "name": name,
+                "parent": parent,
+                "start": round(start, 6),
+                "end": round(end, 6),
+                "duration_ms": round((end - start) * 1000, 3),
+                "outcome": outcome,
+                "pid": os.getpid(),
+                "thread": threading.current_thread().name,
+                **({"attrs": attrs} if attrs else {}),
+            }
+        )
+
+
+@contextlib.contextmanager
+def profiled(stage: str) -> Iterator[None]:
+    """Run the block under cProfile and/or tracemalloc when ``SURPRISE_PRINT_PROFILE`` asks for it."""
+    modes = {m.strip() for m in os.environ.get(PROFILE_ENV, "").split(",") if m.strip()}
+    if "all" in modes:
+        modes = {"cprofile", "tracemalloc"}
+    path = trace_path()
+    if not modes or path is None:
+        yield
+        return
+
+    out_dir = path.parent / "profile"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    profiler = None
+    if "cprofile" in modes:
+        import cProfile
+
+        profiler = cProfile.Profile()
+    if "tracemalloc" in modes:
+        import tracemalloc
+
+        tracemalloc.start(10)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(out_dir / f"{stage}.prof"))
+        if "tracemalloc" in modes:
+            import tracemalloc
+
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"current={current} peak={peak}", ""]
+            lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:25])
+            (out_dir / f"{stage}.tracemalloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            emit({"name": f"{stage}.memory", "parent": stage, "current_bytes": current, "peak_bytes": peak})
+
+
+def load(path: Path) -> list[dict[str, Any]]:
+    records = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return [r for r in records if "start" in r and "end" in r]
+
+
+def summarize(records: list[dict[str, Any]]) -> str:
+    if not records:
+        return "(no spans recorded)"
+    records.sort(key=lambda r: r["start"])
+    run_start = records[0]["start"]
+    run_end = max(r["end"] for r in records)
+    total_ms = max(1e-9, (run_end - run_start) * 1000)
+
+    names = {r["name"] for r in records}
+    depth_cache: dict[str, int] = {}
+
+    def depth(record: dict[str, Any]) -> int:
+        parent = record.get("parent")
+        if not parent or parent not in names:
+            return 0
+        if parent not in depth_cache:
+            parent_record = next(r for r in records if r["name"] == parent)
+            depth_cache[parent] = depth(parent_record) if parent_record is not record else 0
+        return depth_cache[parent] + 1
+
+    rows = [f"{'stage':<44} {'offset ms':>10} {'duration ms':>12} {'share':>6}  outcome"]
+    for record in records:
+        label = "  " * depth(record) + record["name"]
+        feed = (record.get("attrs") or {}).get("feed")
+        if feed:
+            label += f" [{feed}]"
+        rows.append(
+            f"{label[:44]:<44} {(record['start'] - run_start) * 1000:>10.0f} {record['duration_ms']:>12.1f} "
+            f"{record['duration_ms'] / total_ms:>6.0%}  {record['outcome']}"
+        )
+    rows.append(f"{'total wall time':<44} {'':>10} {total_ms:>12.1f}")
+    return "\n".join(rows)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect surprise-print trace files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="Print a per-stage timing table")
+    summary.add_argument("trace", help="Path to trace.jsonl")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "summary":
+        path = Path(args.trace)
+        if not path.exists():
+            print(f"Trace file not found: {path}", file=sys.stderr)
+            return 1
+        print(summarize(load(path)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
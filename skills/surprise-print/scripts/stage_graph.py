@@ -0,0 +1,87 @@
+"""Run pipeline stages as a dependency graph instead of strictly in sequence.
+
+Each stage names the stages it needs (``after``). A stage starts on its own
+thread as soon as all of those have finished, so independent work overlaps:
+the printdock build and readiness check run while research and the image
+API call are in flight, and wall time approaches the critical path instead of
+the sum of all stages.
+
+If a stage fails, no new stages start, except those marked
+``after_failure`` whose own dependencies all succeeded. That keeps work that
+is worth saving for a retry, such as the print-ready JPEG when only the printer
+check failed. Stages already running are allowed to finish (threads cannot be
+interrupted), and then the first error is re-raised unchanged, so callers keep
+handling RunError/PrintdockError as before.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, NamedTuple
+
+from run_trace import span
+
+
+class Stage(NamedTuple):
+    """``run`` gets the attribute dict of the stage's trace span."""
+
+    name: str
+    run: Callable[[dict[str, Any]], Any]
+    after: tuple[str, ...] = ()
+    after_failure: bool = False
+
+
+def check_graph(stages: list[Stage]) -> None:
+    """Raise ValueError on duplicate names, unknown dependencies or cycles."""
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate stage names: {names}")
+    known = set(names)
+    for stage in stages:
+        missing = [dep for dep in stage.after if dep not in known]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+    remaining = {stage.name: set(stage.after) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Stage graph has a cycle among: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_stages(stages: list[Stage], parent: str | None = None) -> dict[str, Any]:
+    """Run every stage once its dependencies are done; returns each stage's return value by name."""
+    check_graph(stages)
+    results: dict[str, Any] = {}
+    waiting = list(stages)
+    error: BaseException | None = None
+
+    def traced(stage: Stage) -> Any:
+        # Pool threads have no enclosing span, so attach stages to the caller's.
+        with span(stage.name, parent=parent) as attrs:
+            return stage.run(attrs)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(stages)), thread_name_prefix="stage") as pool:
+        running: dict[Future[Any], Stage] = {}
+        while waiting or running:
+            startable = [s for s in waiting if error is None or s.after_failure]
+            for stage in [s for s in startable if all(dep in results for dep in s.after)]:
+                waiting.remove(stage)
+                running[pool.submit(traced, stage)] = stage
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name] = future.result()
+                except BaseException as exc:
+                    if error is None:
+                        error = exc
+    if error is not None:
+        raise error
+    return results
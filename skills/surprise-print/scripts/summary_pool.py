@@ -0,0 +1,119 @@
+"""Local pool of pre-fetched, pre-validated random Wikipedia summaries.
+
+`fetch_surprise_fact.py --refill-pool` fetches summaries in parallel, keeps
+the ones that pass the length/quality filters, and stores them here.
+`random-summary` mode pops one instantly (deterministically for a given seed
+and pool state) and triggers a background refill below the low-water mark.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from http_cache import DEFAULT_CACHE_ROOT
+
+DEFAULT_POOL_PATH = DEFAULT_CACHE_ROOT / "summary-pool.sqlite"
+DEFAULT_POOL_TARGET = 60
+LOW_WATER = 15
+REFILL_COOLDOWN_SEC = 600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL UNIQUE,
+    candidate TEXT NOT NULL,
+    fetched_ts REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS used (
+    title TEXT PRIMARY KEY,
+    used_ts REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SummaryPool:
+    def __init__(self, path: Path | str = DEFAULT_POOL_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SummaryPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the pool's lock file so concurrent runs and batch jobs read-modify-write one at a time."""
+        with open(self.path.with_name(self.path.name + ".lock"), "a+", encoding="utf-8") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            with self.conn:
+                yield
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def add(self, candidates: Iterable[dict[str, Any]]) -> int:
+        """Store candidates not already pooled or printed before; returns how many were new."""
+        now = time.time()
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO summaries (title, candidate, fetched_ts)
+                SELECT ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM used WHERE title = ?)
+                """,
+                (
+                    (c["source_title"], json.dumps(c, ensure_ascii=False), now, c["source_title"])
+                    for c in candidates
+                ),
+            )
+        return self.conn.total_changes - before
+
+    def pop(self, seed: int | None) -> dict[str, Any] | None:
+        """Remove and return one summary: seeded pick by pool position, else the oldest."""
+        with self._locked():
+            count = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            if not count:
+                return None
+            offset = random.Random(seed).randrange(count) if seed is not None else 0
+            row = self.conn.execute(
+                "SELECT id, title, candidate FROM summaries ORDER BY id LIMIT 1 OFFSET ?",
+                (offset,),
+            ).fetchone()
+            self.conn.execute("DELETE FROM summaries WHERE id = ?", (row["id"],))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO used (title, used_ts) VALUES (?, ?)",
+                (row["title"], time.time()),
+            )
+        return json.loads(row["candidate"])
+
+    def claim_refill(self, cooldown_sec: float = REFILL_COOLDOWN_SEC) -> bool:
+        """Record a background refill start; False if another one started within the cooldown."""
+        now = time.time()
+        with self._locked():
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'refill_started_ts'").fetchone()
+            if row and now - float(row["value"]) < cooldown_sec:
+                return False
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('refill_started_ts', ?)", (str(now),))
+        return True
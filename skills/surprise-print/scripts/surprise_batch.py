@@ -0,0 +1,297 @@
+"""Batch mode: several surprise prints from one invocation.
+
+Driven by `run_surprise_print.sh --batch jobs.json`. The jobs file is a JSON
+list (or JSON lines) of objects whose keys override the command-line options
+for that job:
+
+    [
+      {"name": "news", "mode": "news-digest"},
+      {"name": "news-low", "mode": "news-digest", "quality": "low", "print": false},
+      {"name": "history", "mode": "on-this-day", "seed": 7}
+    ]
+
+Research runs once per (mode, date, seed) and is shared by every job with
+that key. Image generation runs for up to ``--image-concurrency`` jobs at a
+time, and each image is cropped and encoded as soon as it lands. Prints go out
+one at a time, in job order, over a single printdock wrapper (or through the
+print spooler with `--spool`; a job's "priority" key sets its spool priority).
+Each job gets its own directory and `manifest.json` lists every artifact.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+import surprise_print
+from atomic_json import write_json_atomic
+from image_cache import ImageCache
+from printdock_wrapper import PrintdockError, PrintdockWrapper
+from run_trace import span
+
+# Job keys and the option they override; "print" maps to --print/--no-print.
+JOB_KEYS = {
+    "name": None,
+    "mode": "mode",
+    "seed": "seed",
+    "news_max_items": "news_max_items",
+    "model": "model",
+    "size": "size",
+    "quality": "quality",
+    "zoom": "zoom",
+    "offset_x": "offset_x",
+    "offset_y": "offset_y",
+    "jpeg_max_kb": "jpeg_max_kb",
+    "send_budget_sec": "send_budget_sec",
+    "pace": "pace",
+    "timeout": "timeout",
+    "print": "do_print",
+    "priority": "spool_priority",
+}
+FACT_MODES = ("on-this-day", "random-summary")
+
+
+class Job:
+    def __init__(self, index: int, name: str, args: argparse.Namespace, out_dir: Path) -> None:
+        self.index = index
+        self.name = name
+        self.args = args
+        self.out_dir = out_dir
+        self.status = "pending"
+        self.error: str | None = None
+        self.fact: dict[str, Any] | None = None
+        self.encode: dict[str, Any] | None = None
+        self.printed = False
+        self.image_key: str | None = None
+        self.image_cached = False
+
+    @property
+    def research_key(self) -> tuple[Any, ...]:
+        # Fact modes pick by seed; the news digest only depends on how many headlines it analyzes.
+        variant = self.args.seed if self.args.mode in FACT_MODES else self.args.news_max_items
+        return (self.args.mode, dt.date.today().isoformat(), variant)
+
+    def path(self, name: str) -> Path:
+        return self.out_dir / name
+
+    def manifest_entry(self) -> dict[str, Any]:
+        artifacts = {
+            key: str(self.path(filename))
+            for key, filename in (
+                ("fact", "fact.json"),
+                ("prompt", "prompt.txt"),
+                ("summary", "summary.md"),
+                ("image", "surprise.png"),
+                ("print_ready", "surprise_print_ready.png"),
+                ("print_jpeg", "surprise_print_ready.jpg"),
+            )
+            if self.path(filename).exists()
+        }
+        return {
+            "index": self.index,
+            "name": self.name,
+            "mode": self.args.mode,
+            "seed": self.args.seed,
+            "model": self.args.model,
+            "quality": self.args.quality,
+            "print": self.args.do_print,
+            "status": self.status,
+            "error": self.error,
+            "headline": (self.fact or {}).get("headline"),
+            "dir": str(self.out_dir),
+            "artifacts": artifacts,
+            "image_cached": self.image_cached,
+            "encode": self.encode,
+            "printed": self.printed,
+        }
+
+
+def load_job_specs(path: Path) -> list[dict[str, Any]]:
+    try:
+        text = path.read_text(encoding="utf-8").strip()
+        if text.startswith("["):
+            specs = json.loads(text)
+        else:
+            specs = [json.loads(line) for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    except (OSError, ValueError) as exc:
+        raise surprise_print.RunError(f"Could not read batch file {path}: {exc}") from exc
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise surprise_print.RunError(f"Batch file must be a JSON list of job objects: {path}")
+    if not specs:
+        raise surprise_print.RunError(f"Batch file has no jobs: {path}")
+    return specs
+
+
+def make_jobs(base: argparse.Namespace, specs: list[dict[str, Any]], batch_dir: Path) -> list[Job]:
+    jobs = []
+    for index, spec in enumerate(specs, start=1):
+        unknown = sorted(set(spec) - set(JOB_KEYS))
+        if unknown:
+            raise surprise_print.RunError(f"Job {index}: unknown keys {', '.join(unknown)}")
+        args = argparse.Namespace(**vars(base))
+        for key, value in spec.items():
+            if JOB_KEYS[key]:
+                setattr(args, JOB_KEYS[key], value)
+        if args.mode not in ("news-digest", *FACT_MODES):
+            raise surprise_print.RunError(f"Job {index}: invalid mode {args.mode!r}")
+        if base.dry_run or not base.do_print:
+            args.do_print = False
+        name = str(spec.get("name") or f"{args.mode}-{index}")
+        safe = "".join(c if c.isalnum() or c in "-_" else "-" for c in name)
+        job_dir = batch_dir / f"{index:02d}-{safe}"
+        job_dir.mkdir(parents=True, exist_ok=True)
+        args.out_dir = str(job_dir)
+        jobs.append(Job(index, name, args, job_dir))
+    return jobs
+
+
+def write_manifest(batch_dir: Path, jobs: list[Job], started: dt.datetime) -> Path:
+    manifest = batch_dir / "manifest.json"
+    write_json_atomic(
+        manifest,
+        {
+            "started_at": started.isoformat(timespec="seconds"),
+            "updated_at": dt.datetime.now().astimezone().isoformat(timespec="seconds"),
+            "jobs": [job.manifest_entry() for job in jobs],
+        },
+    )
+    return manifest
+
+
+def research_all(jobs: list[Job]) -> None:
+    groups: dict[tuple[Any, ...], list[Job]] = {}
+    for job in jobs:
+        groups.setdefault(job.research_key, []).append(job)
+
+    for key, group in groups.items():
+        lead = group[0]
+        with span("batch.research", mode=key[0], jobs=len(group)):
+            try:
+                fact = surprise_print.research(lead.args, lead.path("fact.json"))
+            except (Exception, SystemExit) as exc:
+                # The research scripts report "no items" and similar with SystemExit; fail only this group.
+                for job in group:
+                    job.status, job.error = "failed", f"research: {exc}"
+                continue
+        for job in group:
+            if job is not lead:
+                shutil.copyfile(lead.path("fact.json"), job.path("fact.json"))
+            job.fact = fact
+            surprise_print.write_prompt_and_summary(fact, job.path("prompt.txt"), job.path("summary.md"))
+            job.status = "researched"
+
+
+def generate(job: Job, python: str, cache: ImageCache) -> None:
+    with span("batch.image", parent="batch.images", job=job.name) as attrs:
+        job.image_key, job.image_cached = surprise_print.generate_or_reuse_image(
+            job.args, python, job.path("prompt.txt"), job.path("surprise.png"), cache
+        )
+        attrs["cached"] = job.image_cached
+
+
+def prepare(job: Job, cache: ImageCache) -> None:
+    report = surprise_print.prepare_print_image(
+        job.args,
+        job.path("surprise.png"),
+        job.path("surprise_print_ready.png"),
+        job.path("surprise_print_ready.jpg"),
+        cache,
+        job.image_key,
+    )
+    job.encode = report._asdict()
+    print(
+        f"[{job.name}] encoded {report.bytes} bytes, quality {report.quality} {report.subsampling}, "
+        f"{report.packets} packets, ~{report.send_sec:.1f}s at {report.pace_ms} ms pace"
+    )
+
+
+def print_job(job: Job, printer: PrintdockWrapper) -> None:
+    args = job.args
+    with span("batch.print", job=job.name):
+        if args.spool:
+            surprise_print.spool_print(args, job.path("surprise_print_ready.jpg"), f"{job.out_dir.parent.name}/{job.name}")
+        else:
+            printer.ensure_ready(args.timeout)
+            print(f"==> [{job.name}] Sending image to Hi-Print")
+            printer.run(
+                "print", str(job.path("surprise_print_ready.jpg")), "--raw-jpeg",
+                "--pace", str(args.pace), "--timeout", str(args.timeout),
+            )
+    job.printed = True
+    surprise_print.record_digest_printed(job.fact or {})
+
+
+def run_batch(base: argparse.Namespace) -> int:
+    batch_dir = Path(base.out_dir)
+    started = dt.datetime.now().astimezone()
+    jobs = make_jobs(base, load_job_specs(Path(base.batch)), batch_dir)
+    print(f"==> Batch of {len(jobs)} jobs in {batch_dir}")
+
+    if not Path(base.imagegen_script).is_file():
+        raise surprise_print.RunError(f"imagegen script not found: {base.imagegen_script}")
+    python = base.runtime_python
+    cache = ImageCache(enabled=not base.no_cache)
+
+    research_all(jobs)
+    write_manifest(batch_dir, jobs, started)
+
+    printer: PrintdockWrapper | None = None
+    if any(job.args.do_print for job in jobs):
+        if not Path(base.printdock_path).is_dir():
+            raise surprise_print.RunError(f"printdock package path not found: {base.printdock_path}")
+        printer = PrintdockWrapper(Path(base.printdock_path), batch_dir)
+
+    ready = [job for job in jobs if job.status == "researched"]
+    print_queue = [job for job in ready if job.args.do_print]
+    next_print = 0
+
+    def drain_prints() -> None:
+        # Prints go out strictly in job order; stop at the first job whose image is not ready yet.
+        nonlocal next_print
+        while next_print < len(print_queue) and print_queue[next_print].status in ("prepared", "failed"):
+            job = print_queue[next_print]
+            next_print += 1
+            if job.status != "prepared" or printer is None:
+                continue
+            try:
+                print_job(job, printer)
+                job.status = "printed"
+            except PrintdockError as exc:
+                job.status, job.error = "failed", f"print: {exc}"
+                print(f"[{job.name}] {exc}", file=sys.stderr)
+            write_manifest(batch_dir, jobs, started)
+
+    with span("batch.images", jobs=len(ready), concurrency=base.image_concurrency):
+        with ThreadPoolExecutor(max_workers=max(1, base.image_concurrency), thread_name_prefix="imagegen") as pool:
+            pending: dict[Future[None], Job] = {pool.submit(generate, job, python, cache): job for job in ready}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    try:
+                        future.result()
+                        if base.dry_run:
+                            job.status = "previewed"
+                        else:
+                            with span("batch.prepare", job=job.name):
+                                prepare(job, cache)
+                            job.status = "prepared"
+                    except Exception as exc:
+                        job.status, job.error = "failed", str(exc)
+                        print(f"[{job.name}] {exc}", file=sys.stderr)
+                    write_manifest(batch_dir, jobs, started)
+                drain_prints()
+    drain_prints()
+
+    manifest = write_manifest(batch_dir, jobs, started)
+    failed = [job for job in jobs if job.status == "failed"]
+    for job in jobs:
+        print(f"- {job.name}: {job.status}{f' ({job.error})' if job.error else ''}")
+    print(f"Batch done: {len(jobs) - len(failed)}/{len(jobs)} ok. Manifest: {manifest}")
+    return 1 if failed else 0
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""Run the whole surprise-print flow in one Python process.
+
+Research, prompt/summary writing, the print-ready crop and the printer steps
+all run in-process; only the external image generator and `printdock` are
+separate programs. `run_surprise_print.sh` is a thin wrapper around this.
+
+Stages run as a dependency graph (see `stage_graph.py`): the printdock build
+and readiness check overlap research and image generation, and the print
+starts as soon as both the JPEG and the printer are ready.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import venv
+from pathlib import Path
+from typing import Any
+
+import fetch_news_digest
+import fetch_surprise_fact
+import pace_advisor
+import print_spooler
+import retention
+import run_trace
+from atomic_json import write_json_atomic
+from http_cache import DEFAULT_CACHE_ROOT
+from image_cache import ImageCache, content_key
+from printdock_wrapper import PrintdockError, PrintdockWrapper
+from run_trace import span
+from stage_graph import Stage, run_stages
+
+SKILL_ROOT = Path(__file__).resolve().parent.parent
+REPO_ROOT = SKILL_ROOT.parent.parent
+IMAGEGEN_SCRIPT_DEFAULT = Path.home() / ".codex" / "skills" / "imagegen" / "scripts" / "image_gen.py"
+SKILL_VENV = SKILL_ROOT / ".venv"
+# Interpreter known to have the image dependencies; the shell wrapper execs it directly.
+RUNTIME_PYTHON_FILE = DEFAULT_CACHE_ROOT / "runtime-python"
+RUNTIME_DEPS = ("openai", "PIL")
+REEXEC_ENV = "SURPRISE_PRINT_REEXEC"
+
+WATCH_DIR = fetch_news_digest.WATCH_DIR
+IMAGE_CONSTRAINTS = "No text, no letters, no numbers, no logos, no watermark."
+IMAGE_USE_CASE = "stylized-concept"
+DEFAULT_PROMPT = "Create a beautiful vertical editorial illustration with no text."
+
+
+class RunError(RuntimeError):
+    """A stage failed; the message is shown to the user and the run exits 1."""
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="run_surprise_print.sh",
+        description="Research a surprise, generate an image, fit it to the 640x1024 page and print it",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["news-digest", "on-this-day", "random-summary"],
+        default="news-digest",
+        help="Surprise source mode (default: news-digest)",
+    )
+    parser.add_argument("--news-max-items", type=int, default=12, help="Number of headlines to analyze in news mode (default: 12)")
+    parser.add_argument(
+        "--watch-max-age",
+        type=float,
+        default=30,
+        help="Reuse a running --watch digest polled within this many minutes (default: 30)",
+    )
+    parser.add_argument("--fresh-research", action="store_true", help="Ignore any --watch digest and research inline")
+    parser.add_argument("--seed", type=int, help="Deterministic seed (fact modes only)")
+    parser.add_argument("--out-dir", help="Output directory for artifacts")
+    parser.add_argument("--print", dest="do_print", action="store_true", default=True, help="Force sending to printer")
+    parser.add_argument("--no-print", dest="do_print", action="store_false", help="Skip sending to printer")
+    parser.add_argument("--dry-run", action="store_true", help="Research + prompt only (no API image call, no print)")
+    parser.add_argument(
+        "--pace",
+        type=int,
+        help="BLE pace in milliseconds (default: chosen by pace_advisor.py from past prints, 12 with no history)",
+    )
+    parser.add_argument("--timeout", type=int, default=90, help="printdock timeout seconds (default: 90)")
+    parser.add_argument(
+        "--spool",
+        action="store_true",
+        help="Queue the print on the local print spooler (started if needed) instead of connecting directly",
+    )
+    parser.add_argument("--spool-priority", type=int, default=0, help="Spooler priority; higher prints first (default: 0)")
+    parser.add_argument("--zoom", type=float, default=1.0, help="Zoom past cover-fit when placing on the page (default: 1)")
+    parser.add_argument("--offset-x", type=float, default=0.0, help="Horizontal placement shift in page pixels (+ = right)")
+    parser.add_argument("--offset-y", type=float, default=0.0, help="Vertical placement shift in page pixels (+ = up)")
+    parser.add_argument(
+        "--jpeg-max-kb",
+        type=int,
+        default=160,
+        help="Byte budget for the JPEG sent over BLE, in KiB (default: 160)",
+    )
+    parser.add_argument("--send-budget-sec", type=float, help="Cap predicted BLE send time at this many seconds")
+    parser.add_argument("--model", default="gpt-image-1.5", help="Image model (default: gpt-image-1.5)")
+    parser.add_argument("--size", default="1024x1536", help="Image size (default: 1024x1536)")
+    parser.add_argument("--quality", default="high", help="low|medium|high|auto (default: high)")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Regenerate the image even if an identical request is cached (the new image replaces it)",
+    )
+    parser.add_argument(
+        "--python-bin",
+        default=os.environ.get("PYTHON_BIN"),
+        help="Python binary for the image generator (default: this interpreter)",
+    )
+    parser.add_argument(
+        "--printdock-path",
+        default=os.environ.get("PRINTDOCK_PATH") or str(REPO_ROOT),
+        help="Path to the printdock Swift package",
+    )
+    parser.add_argument(
+        "--imagegen-script",
+        default=os.environ.get("IMAGEGEN_SCRIPT") or str(IMAGEGEN_SCRIPT_DEFAULT),
+        help="Path to image_gen.py",
+    )
+    parser.add_argument("--batch", help="Run every job in this JSON jobs file (see surprise_batch.py)")
+    parser.add_argument(
+        "--image-concurrency",
+        type=int,
+        default=3,
+        help="Batch mode: image generations in flight at once (default: 3)",
+    )
+    parser.add_argument("--trace-summary", action="store_true", help="Print a per-stage timing table at the end")
+    parser.add_argument(
+        "--profile",
+        help="Profile the Python research stage: cprofile, tracemalloc or all (reports go to <out-dir>/profile/)",
+    )
+    args = parser.parse_args(argv)
+    if args.dry_run:
+        args.do_print = False
+    return args
+
+
+def has_runtime_deps() -> bool:
+    return all(importlib.util.find_spec(name) for name in RUNTIME_DEPS)
+
+
+def probe_python(python: str) -> bool:
+    check = "import importlib.util as u, sys; sys.exit(0 if all(u.find_spec(n) for n in %r) else 1)" % (RUNTIME_DEPS,)
+    try:
+        return subprocess.run([python, "-c", check], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+
+def remember_runtime(python: str) -> None:
+    try:
+        RUNTIME_PYTHON_FILE.parent.mkdir(parents=True, exist_ok=True)
+        RUNTIME_PYTHON_FILE.write_text(python + "\n", encoding="utf-8")
+    except OSError:
+        pass
+
+
+def ensure_runtime(args: argparse.Namespace) -> str:
+    """Return a Python with openai + Pillow, bootstrapping the skill venv if needed.
+
+    The probe result is cached in `.cache/runtime-python`, which the shell
+    wrapper uses to start the right interpreter directly next time.
+    """
+    if args.python_bin:
+        python = args.python_bin
+        if probe_python(python):
+            return python
+        print(f"Python deps missing in {python}; falling back to the skill venv", file=sys.stderr)
+    elif has_runtime_deps():
+        remember_runtime(sys.executable)
+        return sys.executable
+
+    venv_python = SKILL_VENV / "bin" / "python"
+    if not (venv_python.exists() and probe_python(str(venv_python))):
+        print(f"Python deps missing; bootstrapping local venv at {SKILL_VENV}")
+        venv.EnvBuilder(with_pip=True).create(SKILL_VENV)
+        subprocess.run([str(SKILL_VENV / "bin" / "pip"), "install", "--quiet", "openai", "pillow"], check=True)
+    remember_runtime(str(venv_python))
+    return str(venv_python)
+
+
+def resolve_runtime(args: argparse.Namespace, argv: list[str]) -> str:
+    """Pick the run's Python and re-execute this run under it if it is not the current one.
+
+    Called before the run's spans open: execv replaces the process, and any
+    span still open at that point would never be written.
+    """
+    if args.dry_run:
+        return args.python_bin or sys.executable
+    with span("runtime.ensure_python"):
+        python = ensure_runtime(args)
+    if python != sys.executable and os.environ.get(REEXEC_ENV) != "1":
+        # Pillow is needed in-process for the crop, so continue the run under the chosen
+        # interpreter, whether it came from --python-bin or the skill venv.
+        os.environ[REEXEC_ENV] = "1"
+        executable = shutil.which(python) or python
+        os.execv(executable, [executable, str(Path(__file__).resolve()), *argv])
+    return python
+
+
+def find_watch_digest(args: argparse.Namespace) -> Path | None:
+    """The digest of the most recently polled watcher built with this run's headline count."""
+    wanted = fetch_news_digest.effective_max_items(args.news_max_items)
+    found: tuple[float, Path] | None = None
+    for state_path in WATCH_DIR.glob("watch-state*.json"):
+        try:
+            polled_age_min = (time.time() - state_path.stat().st_mtime) / 60
+            state = json.loads(state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if polled_age_min > args.watch_max_age or state.get("max_items") != wanted:
+            continue
+        digest = Path(state.get("digest") or "")
+        if digest.is_file() and digest.stat().st_size > 0 and (found is None or polled_age_min < found[0]):
+            found = (polled_age_min, digest)
+    return found[1] if found else None
+
+
+def use_watch_digest(args: argparse.Namespace, fact_json: Path) -> dict[str, Any] | None:
+    digest = None if args.fresh_research else find_watch_digest(args)
+    if digest is None:
+        return None
+    # A resident `fetch_news_digest.py --watch` keeps this current; no need to research inline.
+    print(f"==> Using watched news digest: {digest}")
+    shutil.copyfile(digest, fact_json)
+    return json.loads(fact_json.read_text(encoding="utf-8"))
+
+
+def research(args: argparse.Namespace, fact_json: Path) -> dict[str, Any]:
+    """Write and return the fact payload; news headlines are recorded as printed only after the print."""
+    if args.mode == "news-digest":
+        watched = use_watch_digest(args, fact_json)
+        if watched is not None:
+            return watched
+        news_argv = ["--max-items", str(args.news_max_items)]
+        payload = fetch_news_digest.digest_from_args(fetch_news_digest.parse_args(news_argv))
+    else:
+        fact_argv = ["--mode", args.mode]
+        if args.seed is not None:
+            fact_argv += ["--seed", str(args.seed)]
+        payload = fetch_surprise_fact.fact_from_args(fetch_surprise_fact.parse_args(fact_argv))
+
+    write_json_atomic(fact_json, payload)
+    return payload
+
+
+def write_prompt_and_summary(fact: dict[str, Any], prompt_path: Path, summary_path: Path) -> str:
+    prompt = fact.get("prompt", DEFAULT_PROMPT)
+    prompt_path.write_text(prompt + "\n", encoding="utf-8")
+
+    lines = [
+        f"# {fact.get('headline', 'Surprise Print')}\n",
+        f"- Mode: {fact.get('mode', 'unknown')}",
+        f"- Date: {fact.get('date', 'N/A')}",
+        f"- Summary: {fact.get('theme_summary') or fact.get('fact', 'N/A')}",
+        f"- Source: {fact.get('source_title', 'N/A')} ({fact.get('source_url', 'N/A')})",
+        "",
+    ]
+
+    headlines = fact.get("headlines") or []
+    if headlines:
+        lines.extend(["## Headlines Used", ""])
+        for item in headlines:
+            title = item.get("title", "(untitled)")
+            source = item.get("source", "Unknown")
+            link = item.get("link", "")
+            lines.append(f"- {title} ({source})")
+            if link:
+                lines.append(f"  Link: {link}")
+        lines.append("")
+
+    lines.extend(["## Image Prompt", "", prompt, ""])
+    summary_path.write_text("\n".join(lines), encoding="utf-8")
+    return prompt
+
+
+def generate_image(args: argparse.Namespace, python: str, prompt_path: Path, image_out: Path) -> None:
+    cmd = [
+        python, args.imagegen_script, "generate",
+        "--prompt-file", str(prompt_path),
+        "--model", args.model,
+        "--size", args.size,
+        "--quality", args.quality,
+        "--output-format", "png",
+        "--out", str(image_out),
+        "--force",
+        "--use-case", IMAGE_USE_CASE,
+        "--constraints", IMAGE_CONSTRAINTS,
+    ]
+    if args.dry_run:
+        cmd.append("--dry-run")
+    result = subprocess.run(cmd)
+    if result.returncode != 0:
+        raise RunError(f"Image generation failed (exit {result.returncode})")
+
+
+def image_request(args: argparse.Namespace, prompt: str) -> dict[str, Any]:
+    """Everything passed to the image generator that shapes the image; the image cache key."""
+    return {
+        "prompt": prompt,
+        "model": args.model,
+        "size": args.size,
+        "quality": args.quality,
+        "constraints": IMAGE_CONSTRAINTS,
+        "use_case": IMAGE_USE_CASE,
+        "output_format": "png",
+    }
+
+
+def generate_or_reuse_image(
+    args: argparse.Namespace,
+    python: str,
+    prompt_path: Path,
+    image_out: Path,
+    cache: ImageCache,
+) -> tuple[str | None, bool]:
+    """Generate the image unless an identical request is cached.
+
+    Returns the cache key (None for dry runs, which never touch the cache)
+    and whether the image came from the cache.
+    """
+    if args.dry_run:
+        generate_image(args, python, prompt_path, image_out)
+        return None, False
+
+    request = image_request(args, prompt_path.read_text(encoding="utf-8").rstrip("\n"))
+    key = content_key(**request)
+    with cache.lock(key):
+        if cache.restore(key, image_out):
+            print(f"==> Reusing cached image {key[:12]} (--no-cache to regenerate)")
+            return key, True
+        if not os.environ.get("OPENAI_API_KEY"):
+            raise RunError("OPENAI_API_KEY is not set. Export it or use --dry-run.")
+        print("==> Generating surprise image")
+        generate_image(args, python, prompt_path, image_out)
+        try:
+            cache.store(key, image_out, request)
+        except OSError as exc:
+            print(f"Could not cache the generated image: {exc}", file=sys.stderr)
+    return key, False
+
+
+def prepare_print_image(
+    args: argparse.Namespace,
+    src: Path,
+    png_out: Path,
+    jpeg_out: Path,
+    cache: ImageCache | None = None,
+    image_key: str | None = None,
+) -> Any:
+    """Write the 640x1024 page preview and the budgeted JPEG that is actually sent.
+
+    With an ``image_key``, both files are reused from the image cache when the
+    same image was prepared with the same placement and budget before.
+    """
+    # Pillow is only needed from here on, so dry runs work without it.
+    import jpeg_budget
+    import print_prep
+
+    budget = args.jpeg_max_kb * 1024
+    if args.send_budget_sec is not None:
+        budget = min(budget, jpeg_budget.budget_from_send_time(args.send_budget_sec, args.pace))
+    variant = content_key(zoom=args.zoom, offset_x=args.offset_x, offset_y=args.offset_y, budget=budget, pace=args.pace)[:16]
+    outputs = {"page.png": png_out, "page.jpg": jpeg_out}
+    if cache is not None and image_key:
+        cached = cache.restore_derived(image_key, variant, outputs)
+        if cached is not None:
+            return jpeg_budget.EncodeReport(**cached)
+
+    try:
+        with span("print_prep.crop"):
+            page = print_prep.render(src, args.zoom, (args.offset_x, args.offset_y))
+            page.save(png_out, format="PNG")
+        with span("print_prep.encode") as attrs:
+            data, report = jpeg_budget.encode(page, budget, args.pace)
+            jpeg_out.write_bytes(data)
+            attrs.update(report._asdict())
+    except (OSError, ValueError) as exc:
+        raise RunError(f"Print prep failed: {exc}") from exc
+    if cache is not None and image_key:
+        try:
+            cache.store_derived(image_key, variant, outputs, report._asdict())
+        except OSError as exc:
+            print(f"Could not cache the print-ready files: {exc}", file=sys.stderr)
+    return report
+
+
+def spool_print(args: argparse.Namespace, jpeg: Path, name: str) -> None:
+    """Queue ``jpeg`` on the print spooler and wait for it; raises PrintdockError if the job fails."""
+    if not Path(args.printdock_path).is_dir():
+        raise RunError(f"printdock package path not found: {args.printdock_path}")
+    spool_dir = print_spooler.DEFAULT_SPOOL_DIR
+    with span("printer.spool", priority=args.spool_priority) as attrs:
+        job_id = print_spooler.submit(jpeg, spool_dir, args.spool_priority, args.pace, args.timeout, name)
+        print_spooler.ensure_spooler(spool_dir, Path(args.printdock_path))
+        print(f"==> Queued on the print spooler as {job_id}")
+        ticket = print_spooler.wait(job_id, spool_dir)
+        attrs["job"] = job_id
+        attrs["result"] = ticket["state"]
+    if ticket["state"] != "done":
+        raise PrintdockError(f"Spooled print failed: {ticket.get('error') or ticket['state']}")
+
+
+def record_digest_printed(fact: dict[str, Any]) -> None:
+    """After PRINT_DONE, down-rank a news digest's headlines for the next runs."""
+    if fact.get("mode") != "news-digest":
+        return
+    try:
+        store = fetch_news_digest.HeadlineStore()
+        try:
+            fetch_news_digest.record_printed(store, fact)
+        finally:
+            store.close()
+    except Exception as exc:
+        print(f"Could not record printed headlines: {exc}", file=sys.stderr)
+
+
+def run(args: argparse.Namespace) -> int:
+    out_dir = Path(args.out_dir)
+    fact_json = out_dir / "fact.json"
+    prompt_txt = out_dir / "prompt.txt"
+    image_out = out_dir / "surprise.png"
+    print_ready = out_dir / "surprise_print_ready.png"
+    print_jpeg = out_dir / "surprise_print_ready.jpg"
+    summary_md = out_dir / "summary.md"
+
+    if not Path(args.imagegen_script).is_file():
+        raise RunError(f"imagegen script not found: {args.imagegen_script}")
+
+    python = args.runtime_python
+
+    printer: PrintdockWrapper | None = None
+    if args.do_print:
+        if not Path(args.printdock_path).is_dir():
+            raise RunError(f"printdock package path not found: {args.printdock_path}")
+        if not args.spool:
+            printer = PrintdockWrapper(Path(args.printdock_path), out_dir)
+
+    cache = ImageCache(enabled=not args.no_cache)
+    fact: dict[str, Any] = {}
+    image_key: str | None = None
+
+    def research_stage(attrs: dict[str, Any]) -> None:
+        nonlocal fact
+        attrs["mode"] = args.mode
+        fact = research(args, fact_json)
+
+    def prompt_stage(attrs: dict[str, Any]) -> None:
+        write_prompt_and_summary(fact, prompt_txt, summary_md)
+        if args.dry_run:
+            print("==> Dry run: image generation request preview")
+
+    def image_stage(attrs: dict[str, Any]) -> None:
+        nonlocal image_key
+        image_key, attrs["cached"] = generate_or_reuse_image(args, python, prompt_txt, image_out, cache)
+
+    def prep_stage(attrs: dict[str, Any]) -> None:
+        # Crop and resample straight to the 640x1024 (5:8) printer payload, then encode it under the budget.
+        report = prepare_print_image(args, image_out, print_ready, print_jpeg, cache, image_key)
+        print(f"Prepared printer-ready image at exact 5:8 ratio: {print_ready} (640x1024)")
+        print(
+            f"Encoded {print_jpeg.name}: {report.bytes} bytes, quality {report.quality} {report.subsampling}, "
+            f"{report.packets} packets, ~{report.send_sec:.1f}s at {report.pace_ms} ms pace"
+        )
+        if not report.within_budget:
+            print(f"JPEG exceeds the {report.budget_bytes}-byte budget even at the lowest quality; sending anyway.", file=sys.stderr)
+
+    def print_stage(attrs: dict[str, Any]) -> None:
+        if printer is None:
+            spool_print(args, print_jpeg, out_dir.name)
+        else:
+            print("==> Sending image to Hi-Print")
+            printer.run(
+                "print", str(print_jpeg), "--raw-jpeg", "--pace", str(args.pace), "--timeout", str(args.timeout)
+            )
+        record_digest_printed(fact)
+
+    # The printdock build and readiness check only need the printer, so they run alongside
+    # research and image generation; the print starts once both the JPEG and the printer are ready.
+    # A printer failure still lets an in-flight image finish into a print-ready JPEG for the retry.
+    stages = [
+        Stage("research", research_stage),
+        Stage("prompt", prompt_stage, ("research",)),
+        Stage("image.generate", image_stage, ("prompt",)),
+    ]
+    if not args.dry_run:
+        stages.append(Stage("print_prep", prep_stage, ("image.generate",), after_failure=True))
+    if printer is not None:
+        stages += [
+            Stage("printer.warmup", lambda attrs: printer.wrapper()),
+            Stage("printer.ready_check", lambda attrs: printer.ensure_ready(args.timeout), ("printer.warmup",)),
+            Stage("printer.print", print_stage, ("print_prep", "printer.ready_check")),
+        ]
+    elif args.do_print:
+        stages.append(Stage("printer.print", print_stage, ("print_prep",)))
+    run_stages(stages, parent="run")
+
+    if args.dry_run:
+        print(f"Dry run complete. Artifacts written to: {out_dir}")
+        for path in (fact_json, prompt_txt, summary_md):
+            print(f"- {path}")
+        return 0
+    if not args.do_print:
+        print("Image generated. Printing skipped (--no-print).")
+        print(f"Printer-ready image: {print_ready}")
+
+    print(f"Done. Artifacts in: {out_dir}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = parse_args(argv)
+
+    out_dir = Path(args.out_dir) if args.out_dir else None
+    if out_dir is None:
+        out_dir = retention.DEFAULT_OUTPUT_ROOT / dt.datetime.now().strftime(retention.RUN_NAME_FORMAT)
+        args.out_dir = str(out_dir)
+        # Keep the same directory if the run re-executes under the venv interpreter.
+        argv += ["--out-dir", args.out_dir]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if args.pace is None:
+        advice = pace_advisor.advise(pace_advisor.load_history())
+        args.pace = advice.pace_ms
+        argv += ["--pace", str(args.pace)]
+        if args.do_print:
+            print(f"==> BLE pace {advice.pace_ms} ms ({advice.reason})")
+
+    trace_file = out_dir / "trace.jsonl"
+    os.environ[run_trace.TRACE_ENV] = str(trace_file)
+    if args.profile:
+        os.environ[run_trace.PROFILE_ENV] = args.profile
+
+    exit_code = 0
+    try:
+        args.runtime_python = resolve_runtime(args, argv)
+        if args.batch:
+            import surprise_batch
+
+            with span("batch", jobs_file=args.batch):
+                exit_code = surprise_batch.run_batch(args)
+        else:
+            with span("run", mode=args.mode):
+                exit_code = run(args)
+    except RuntimeError as exc:
+        # RunError and PrintdockError; batch mode raises them via the imported module.
+        print(exc, file=sys.stderr)
+        exit_code = 1
+    except SystemExit as exc:
+        if exc.code not in (None, 0):
+            print(exc.code if isinstance(exc.code, str) else f"exit {exc.code}", file=sys.stderr)
+            exit_code = exc.code if isinstance(exc.code, int) else 1
+    finally:
+        if args.trace_summary and trace_file.exists():
+            print()
+            print(run_trace.summarize(run_trace.load(trace_file)))
+        if out_dir.resolve().parent == retention.DEFAULT_OUTPUT_ROOT.resolve():
+            # Prune, deduplicate and archive the default output tree in the background.
+            retention.maybe_maintain()
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())